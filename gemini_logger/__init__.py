@@ -0,0 +1,6 @@
+"""Gemini Workload Logger: a Tk app and command line tools for AI-formatted work logs.
+
+The command line lives in gemini_logger.cli (the `gemini-logger` script, or
+`python -m gemini_logger`); the other modules are the pieces it and the GUI
+share, such as the translator, the logging daemon and log rotation.
+"""
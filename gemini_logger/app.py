@@ -0,0 +1,26 @@
+"""Launcher for the GUI.
+
+Forwards the launch to a window that is already running (see single_instance)
+before paying for Tk and Gemini; only a launch that becomes the instance
+imports gemini_logger.gui.
+"""
+import sys
+
+from . import single_instance
+
+
+def main(argv=None):
+    launch_args = single_instance.parse_launch_args(sys.argv[1:] if argv is None else argv)
+    instance_server = None
+    if single_instance.enabled() and not launch_args.new_instance:
+        if single_instance.forward_launch(launch_args.files):
+            return 0
+        instance_server = single_instance.listen()
+
+    from . import gui  # Tk, the Gemini SDK and the rest of the app
+
+    return gui.run(launch_args, instance_server)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
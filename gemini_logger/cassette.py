@@ -0,0 +1,202 @@
+"""Record/replay of Gemini traffic for offline, deterministic runs.
+
+In record mode CassetteModel wraps a real GenerativeModel and appends every
+request and its response (text, token usage, finish reason, streamed chunks
+and their timing, or the error raised) to a JSON Lines cassette. In replay
+mode it serves those responses from the cassette without a network or API
+key, sleeping for the recorded latency divided by `speed` (0 replays
+instantly).
+
+Requests are matched on model, system instruction, text and output budget.
+Identical requests recorded several times are replayed in recorded order,
+cycling once they run out.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import types
+
+MODES = ("record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+class ReplayedError(RuntimeError):
+    """A recorded request that failed fails the same way on replay"""
+
+
+def request_key(model_name, system_instruction, text, max_output_tokens):
+    payload = json.dumps([model_name, system_instruction, text, max_output_tokens])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _response_object(text, usage, finish_reason):
+    """Something shaped enough like a GenerateContentResponse for translator.py"""
+    return types.SimpleNamespace(
+        text=text,
+        usage_metadata=types.SimpleNamespace(
+            prompt_token_count=usage.get("prompt_tokens", 0),
+            candidates_token_count=usage.get("output_tokens", 0),
+        ),
+        candidates=[types.SimpleNamespace(finish_reason=finish_reason)],
+    )
+
+
+def _describe(response):
+    usage = getattr(response, "usage_metadata", None)
+    try:
+        reason = response.candidates[0].finish_reason
+        reason = getattr(reason, "name", reason)
+    except (AttributeError, IndexError, TypeError):
+        reason = None
+    return {
+        "text": response.text,
+        "usage": {
+            "prompt_tokens": getattr(usage, "prompt_token_count", 0),
+            "output_tokens": getattr(usage, "candidates_token_count", 0),
+        },
+        "finish_reason": reason,
+    }
+
+
+class Cassette:
+    def __init__(self, path, mode, speed=1.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.records = {}  # key -> recorded interactions, in order
+        self.positions = {}  # key -> next one to replay
+        if mode == "replay":
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.records.setdefault(record["key"], []).append(record)
+
+    def append(self, record):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def next_record(self, key):
+        with self.lock:
+            records = self.records.get(key)
+            if not records:
+                raise CassetteMiss(f"Request not found in cassette {self.path}; record it again")
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            return records[position % len(records)]
+
+    def sleep(self, seconds):
+        if self.speed > 0 and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+
+class _RecordingStream:
+    """Pass a streamed response through while noting each chunk and when it arrived"""
+
+    def __init__(self, response, on_done, started):
+        self._response = response
+        self._on_done = on_done
+        self._started = started
+
+    def __iter__(self):
+        chunks = []
+        for chunk in self._response:
+            chunks.append({"text": chunk.text, "at": round(time.perf_counter() - self._started, 4)})
+            yield chunk
+        self._on_done(self._response, chunks)
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class _ReplayStream:
+    """Yield recorded chunks at their recorded offsets; .text etc. describe the whole response"""
+
+    def __init__(self, cassette, record):
+        self._cassette = cassette
+        self._record = record
+        response = record["response"]
+        whole = _response_object(response["text"], response["usage"], response["finish_reason"])
+        self.text = whole.text
+        self.usage_metadata = whole.usage_metadata
+        self.candidates = whole.candidates
+
+    def __iter__(self):
+        previous = 0.0
+        for chunk in self._record.get("chunks") or [{"text": self.text, "at": self._record["seconds"]}]:
+            self._cassette.sleep(chunk["at"] - previous)
+            previous = chunk["at"]
+            yield _response_object(chunk["text"], {}, None)
+
+
+class CassetteModel:
+    """Stands in for genai.GenerativeModel: records through `model`, or replays without one"""
+
+    def __init__(self, cassette, model_name, system_instruction=None, model=None):
+        self.cassette = cassette
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.model = model
+        if cassette.mode == "record" and model is None:
+            raise ValueError("Recording needs a real model to record from")
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        max_output_tokens = (generation_config or {}).get("max_output_tokens")
+        key = request_key(self.model_name, self.system_instruction, contents, max_output_tokens)
+        if self.cassette.mode == "replay":
+            return self._replay(key, stream)
+        return self._record(key, contents, max_output_tokens, generation_config, stream, kwargs)
+
+    def _replay(self, key, stream):
+        record = self.cassette.next_record(key)
+        if stream and "error" not in record:
+            return _ReplayStream(self.cassette, record)
+        self.cassette.sleep(record["seconds"])
+        if "error" in record:
+            raise ReplayedError(record["error"])
+        response = record["response"]
+        return _response_object(response["text"], response["usage"], response["finish_reason"])
+
+    def _record(self, key, contents, max_output_tokens, generation_config, stream, kwargs):
+        record = {
+            "key": key,
+            "model": self.model_name,
+            "request": {"text": contents, "max_output_tokens": max_output_tokens, "stream": stream},
+        }
+        started = time.perf_counter()
+        try:
+            response = self.model.generate_content(contents, generation_config=generation_config, stream=stream, **kwargs)
+        except Exception as e:
+            record["seconds"] = round(time.perf_counter() - started, 4)
+            record["error"] = f"{type(e).__name__}: {e}"
+            self.cassette.append(record)
+            raise
+        if not stream:
+            record["seconds"] = round(time.perf_counter() - started, 4)
+            record["response"] = _describe(response)
+            self.cassette.append(record)
+            return response
+
+        def finished(whole, chunks):
+            record["seconds"] = round(time.perf_counter() - started, 4)
+            record["chunks"] = chunks
+            record["response"] = _describe(whole)
+            self.cassette.append(record)
+
+        return _RecordingStream(response, finished, started)
@@ -0,0 +1,464 @@
+"""Command line entry point for Gemini Workload Logger.
+
+    gemini-logger                      Start the GUI
+    gemini-logger ingest [FILE ...]    Translate entries headlessly from files or stdin
+    gemini-logger export LOG -o OUT    Export a log to JSON Lines, CSV, Markdown or HTML
+    gemini-logger summarize LOG        Summarize a log with Gemini
+    gemini-logger grep PATTERN LOG     Print the lines of a log matching a regex
+    gemini-logger similar LOG TEXT     List the entries most similar to some text
+    gemini-logger log TEXT             Log an entry in the running window
+    gemini-logger open FILE ...        Open logs in the running window
+    gemini-logger daemon               Run the local logging daemon
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import log_daemon
+from . import log_export
+from . import log_rotation
+
+WRITE_CHUNK = 64  # Entries buffered before each write to the output
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+# --- Ingest ---
+def read_entries(paths):
+    """Yield one entry per non-blank line from the given files, or stdin for none or '-'"""
+    for path in paths or ["-"]:
+        if path == "-":
+            stream, close = sys.stdin, False
+        else:
+            stream, close = open(path, "r"), True
+        try:
+            for line in stream:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if close:
+                stream.close()
+
+
+class EntryWriter:
+    """Write translated entries in chunks to stdout, the daemon or a file"""
+
+    def __init__(self, output, policy=None):
+        self.output = output
+        self.policy = policy
+        self.pending = []
+        self.unconfirmed = 0  # Entries the daemon may or may not have written
+        self.client = None
+        self.stream = None
+        if output is None:
+            self.stream = sys.stdout
+        elif log_daemon.is_listening(log_daemon.default_address()):
+            self.client = log_daemon.DaemonClient()
+        else:
+            self.stream = open(output, "a")
+
+    def write(self, text):
+        self.pending.append(text)
+        if len(self.pending) >= WRITE_CHUNK:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Taken out first, so close() after a failed flush never sends the same batch again
+        batch, self.pending = self.pending, []
+        if self.client is not None:
+            try:
+                self.client.append_many(self.output, batch, self.policy)
+                return
+            except log_daemon.DaemonTimeout as e:
+                # Most likely committed; writing them again would duplicate them
+                self.unconfirmed += len(batch)
+                print(f"Logging daemon: {e}; {len(batch)} entries unconfirmed", file=sys.stderr)
+                return
+            except (log_daemon.DaemonRefused, FileNotFoundError) as e:
+                # Not an allowed path (or no token to read): nothing was written, so write it ourselves
+                print(f"Logging daemon: {e}; writing {self.output} directly", file=sys.stderr)
+                self.client.close()
+                self.client = None
+                self.stream = open(self.output, "a")
+        data = "".join(text + "\n" for text in batch)
+        if self.stream is not sys.stdout and log_rotation.should_rotate(self.output, self.policy, len(data)):
+            self.stream.close()
+            log_rotation.rotate(self.output)
+            self.stream = open(self.output, "a")
+        if self.stream is not sys.stdout and log_rotation.needs_day_marker(self.output):
+            data = log_rotation.day_marker() + "\n" + data
+        self.stream.write(data)
+        self.stream.flush()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self.client is not None:
+                self.client.close()
+            elif self.stream is not sys.stdout:
+                self.stream.close()
+                log_rotation.wait_for_compression()
+
+
+def ingest(entries, writer, jobs, retries, translate, fallback):
+    """Translate entries with at most `jobs` requests in flight and write them in input order.
+
+    Only a window of 2 * jobs entries is held at any time, so memory stays bounded
+    no matter how long the input stream is.
+    """
+    stats = {"entries": 0, "fallbacks": 0, "latencies": []}
+    stats_lock = threading.Lock()
+
+    def work(text):
+        started = time.perf_counter()
+        result = None
+        for attempt in range(retries + 1):
+            try:
+                result = translate(text)
+                break
+            except Exception as e:
+                if attempt == retries:
+                    print(f"Error in translation: {e}", file=sys.stderr)
+                else:
+                    time.sleep(0.5 * 2 ** attempt)
+        latency = time.perf_counter() - started
+        with stats_lock:
+            stats["latencies"].append(latency)
+            if result is None:
+                stats["fallbacks"] += 1
+        return result if result is not None else fallback(text)
+
+    window = deque()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for text in entries:
+            window.append(executor.submit(work, text))
+            if len(window) >= jobs * 2:
+                writer.write(window.popleft().result())
+                stats["entries"] += 1
+        while window:
+            writer.write(window.popleft().result())
+            stats["entries"] += 1
+    writer.flush()
+    return stats
+
+
+def print_ingest_stats(stats, elapsed, jobs, usage=None):
+    latencies = sorted(stats["latencies"])
+    count = stats["entries"]
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Ingested {count} entries in {elapsed:.2f}s ({rate:.1f} entries/s, {jobs} in flight)", file=sys.stderr)
+    print(f"Fallbacks: {stats['fallbacks']}", file=sys.stderr)
+    if latencies:
+        print(
+            "Latency: p50 {:.0f}ms  p90 {:.0f}ms  p99 {:.0f}ms  max {:.0f}ms".format(
+                percentile(latencies, 0.50) * 1000,
+                percentile(latencies, 0.90) * 1000,
+                percentile(latencies, 0.99) * 1000,
+                latencies[-1] * 1000,
+            ),
+            file=sys.stderr,
+        )
+    if usage and usage["entries"]:
+        print(
+            "Tokens: {} in, {} out ({:.1f} / {:.1f} per entry)".format(
+                usage["prompt_tokens"],
+                usage["output_tokens"],
+                usage["prompt_tokens"] / usage["entries"],
+                usage["output_tokens"] / usage["entries"],
+            ),
+            file=sys.stderr,
+        )
+
+
+def command_ingest(args):
+    from . import translator  # Deferred so the daemon and GUI commands don't pay for the Gemini import
+
+    translator.USAGE_LOG = args.usage_log
+    if not translator.init_gemini():
+        print("Error: Gemini is unavailable (is GOOGLE_API_KEY set?)", file=sys.stderr)
+        return 1
+    policy = log_rotation.RotationPolicy(max_bytes=args.max_bytes, daily=args.daily)
+    writer = EntryWriter(args.output, policy)
+    started = time.perf_counter()
+    try:
+        stats = ingest(read_entries(args.files), writer, args.jobs, args.retries, translator.translate_entry, translator.fallback_format)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+        if writer.unconfirmed:
+            print(f"Unconfirmed: {writer.unconfirmed} entries; check {args.output} before ingesting them again", file=sys.stderr)
+    print_ingest_stats(stats, time.perf_counter() - started, args.jobs, translator.usage_totals)
+    return 0
+
+
+# --- Export ---
+def command_export(args):
+    started = time.perf_counter()
+    try:
+        count = log_export.export_log(
+            args.log,
+            args.output,
+            fmt=args.format,
+            since=args.since,
+            until=args.until,
+            tags=args.tag,
+            search=args.search,
+            include_segments=not args.active_only,
+        )
+    except KeyboardInterrupt:
+        print("Export cancelled", file=sys.stderr)
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"Error exporting log: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {count} entries to {args.output} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+# --- Summary ---
+def command_summarize(args):
+    from . import summarize
+    from . import translator
+
+    if not translator.init_gemini() or translator.model is None:
+        print("Error: Gemini is unavailable (is GOOGLE_API_KEY set?)", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    try:
+        summary, stats = summarize.summarize_log(
+            args.log,
+            translator.summarize,
+            since=args.since,
+            until=args.until,
+            period=args.period,
+            include_segments=not args.active_only,
+            cache_dir=args.cache_dir,
+            jobs=args.jobs,
+        )
+    except KeyboardInterrupt:
+        print("Summary cancelled", file=sys.stderr)
+        return 130
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error summarizing log: {e}", file=sys.stderr)
+        return 1
+    if summary is None:
+        print("No entries to summarize", file=sys.stderr)
+        return 1
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(summary + "\n")
+    else:
+        print(summary)
+    print(
+        "{} chunks ({} cached), {} reduce steps ({} cached) in {:.2f}s".format(
+            stats["chunks"], stats["cached"],
+            stats["reduce_cached"] + stats["reduce_summarized"], stats["reduce_cached"],
+            time.perf_counter() - started,
+        ),
+        file=sys.stderr,
+    )
+    return 0
+
+
+# --- Filter ---
+def command_grep(args):
+    from . import log_filter
+
+    grep_args = [args.pattern, args.log, "--jobs", str(args.jobs)]
+    if args.ignore_case:
+        grep_args.append("-i")
+    if args.active_only:
+        grep_args.append("--active-only")
+    if args.jsonl:
+        grep_args.append("--jsonl")
+    return log_filter.main(grep_args)
+
+
+# --- Similar Entries ---
+def command_similar(args):
+    from . import similarity
+
+    if not similarity.available():
+        print("Error: finding similar entries needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    try:
+        index = similarity.open_index(args.log, args.cache_dir)
+        stats = similarity.sync_log(index, args.log)
+        results = index.query(args.text, args.top)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    except OSError as e:
+        print(f"Error indexing log: {e}", file=sys.stderr)
+        return 1
+    for text, matches in zip(args.text, results):
+        if len(args.text) > 1:
+            print(f"== {text}")
+        for score, entry in matches:
+            print(f"{score:.3f}  {' '.join(entry.split())}")
+    print(
+        "{} entries indexed ({} new) in {:.2f}s".format(len(index), stats["added"], time.perf_counter() - started),
+        file=sys.stderr,
+    )
+    return 0
+
+
+# --- Other Commands ---
+def command_daemon(args):
+    daemon_args = []
+    if args.socket:
+        daemon_args += ["--socket", args.socket]
+    if args.no_fsync:
+        daemon_args.append("--no-fsync")
+    if args.metrics_port:
+        daemon_args += ["--metrics-port", str(args.metrics_port)]
+    for path in args.allow or []:
+        daemon_args += ["--allow", path]
+    return log_daemon.main(daemon_args)
+
+
+def command_gui(args):
+    from . import app
+
+    argv = list(getattr(args, "files", []))
+    if getattr(args, "new_instance", False):
+        argv.append("--new-instance")
+    return app.main(argv)
+
+
+# --- Running Instance ---
+def command_open(args):
+    from . import single_instance
+
+    if single_instance.enabled() and single_instance.forward_launch(args.files):
+        return 0
+    return command_gui(args)  # Nothing running; this becomes the instance
+
+
+def command_log(args):
+    from . import single_instance
+
+    request = {"op": "log", "text": " ".join(args.text)}
+    if args.file:
+        request["path"] = os.path.abspath(args.file)
+    try:
+        replies = single_instance.send([request])
+    except (OSError, ValueError, single_instance.InstanceError) as e:
+        print(f"Error handing the entry to the running window: {e}", file=sys.stderr)
+        return 1
+    if replies is None:
+        print("Error: no Gemini Workload Logger window is running (use `gemini-logger ingest` without one)", file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gemini-logger", description="Gemini Workload Logger")
+    parser.add_argument("--cassette", help="Record Gemini traffic to, or replay it from, this JSON Lines file")
+    parser.add_argument("--cassette-mode", choices=("record", "replay"), default="replay", help="Cassette mode (default: replay)")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay latency divisor; 0 replays instantly (default: 1)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    ingest_parser = subparsers.add_parser("ingest", help="Translate entries from files or stdin without the GUI")
+    ingest_parser.add_argument("files", nargs="*", help="Input files, one entry per line (default: stdin)")
+    ingest_parser.add_argument("-o", "--output", help="Log file to append to (default: stdout)")
+    ingest_parser.add_argument("-j", "--jobs", type=int, default=8, help="Concurrent translation requests (default: 8)")
+    ingest_parser.add_argument("--retries", type=int, default=2, help="Retries per entry before falling back (default: 2)")
+    ingest_parser.add_argument("--usage-log", help="Append per-entry token accounting to this JSON Lines file")
+    ingest_parser.add_argument("--max-bytes", type=int, help="Rotate the output file once it would exceed this size")
+    ingest_parser.add_argument("--daily", action="store_true", help="Rotate the output file when the day changes")
+    ingest_parser.set_defaults(handler=command_ingest)
+
+    export_parser = subparsers.add_parser("export", help="Export a log to JSON Lines, CSV, Markdown or HTML")
+    export_parser.add_argument("log", help="Log file to export (rotated segments are included)")
+    export_parser.add_argument("-o", "--output", required=True, help="Output file")
+    export_parser.add_argument("-f", "--format", choices=sorted(log_export.FORMATS), help="Output format (default: from the extension)")
+    export_parser.add_argument("--since", help="Only entries on or after this date (YYYY-MM-DD)")
+    export_parser.add_argument("--until", help="Only entries on or before this date (YYYY-MM-DD)")
+    export_parser.add_argument("--tag", action="append", help="Only entries carrying this #tag (repeatable)")
+    export_parser.add_argument("--search", help="Only entries containing this text")
+    export_parser.add_argument("--active-only", action="store_true", help="Skip rotated segments")
+    export_parser.set_defaults(handler=command_export)
+
+    summarize_parser = subparsers.add_parser("summarize", help="Summarize a log with cached map-reduce over Gemini")
+    summarize_parser.add_argument("log", help="Log file to summarize (rotated segments are included)")
+    summarize_parser.add_argument("-o", "--output", help="Write the summary here (default: stdout)")
+    summarize_parser.add_argument("--since", help="Only entries on or after this date (YYYY-MM-DD)")
+    summarize_parser.add_argument("--until", help="Only entries on or before this date (YYYY-MM-DD)")
+    summarize_parser.add_argument("--period", choices=("day", "week", "month"), default="week", help="Calendar period chunks are aligned to (default: week)")
+    summarize_parser.add_argument("-j", "--jobs", type=int, default=4, help="Concurrent summary requests (default: 4)")
+    summarize_parser.add_argument("--cache-dir", help="Digest cache folder (default: cache/summaries)")
+    summarize_parser.add_argument("--active-only", action="store_true", help="Skip rotated segments")
+    summarize_parser.set_defaults(handler=command_summarize)
+
+    grep_parser = subparsers.add_parser("grep", help="Print log lines matching a regex, scanning chunks in parallel")
+    grep_parser.add_argument("pattern", help="Python regular expression")
+    grep_parser.add_argument("log", help="Log file to search (rotated segments are included)")
+    grep_parser.add_argument("-i", "--ignore-case", action="store_true", help="Case-insensitive match")
+    grep_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: one per CPU)")
+    grep_parser.add_argument("--active-only", action="store_true", help="Skip rotated segments")
+    grep_parser.add_argument("--jsonl", action="store_true", help="Write one JSON object per matching line")
+    grep_parser.set_defaults(handler=command_grep)
+
+    similar_parser = subparsers.add_parser("similar", help="List the entries most similar to some text, offline")
+    similar_parser.add_argument("log", help="Log file to search (rotated segments are included)")
+    similar_parser.add_argument("text", nargs="+", help="Text to find similar entries for (several are ranked in one batch)")
+    similar_parser.add_argument("-k", "--top", type=int, default=10, help="Entries to list per text (default: 10)")
+    similar_parser.add_argument("--cache-dir", help="Index folder (default: cache/similarity)")
+    similar_parser.set_defaults(handler=command_similar)
+
+    daemon_parser = subparsers.add_parser("daemon", help="Run the local logging daemon")
+    daemon_parser.add_argument("--socket", help="Unix socket path (or host:port without AF_UNIX)")
+    daemon_parser.add_argument("--no-fsync", action="store_true", help="Acknowledge after flush instead of fsync")
+    daemon_parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on 127.0.0.1 at this port")
+    daemon_parser.add_argument("--allow", action="append", metavar="PATH", help="Log file or directory clients may append to (repeatable)")
+    daemon_parser.set_defaults(handler=command_daemon)
+
+    log_parser = subparsers.add_parser("log", help="Log an entry in the running window, as if it was typed there")
+    log_parser.add_argument("text", nargs="+", help="Entry text")
+    log_parser.add_argument("-f", "--file", help="Log file to write to (default: the window's current tab)")
+    log_parser.set_defaults(handler=command_log)
+
+    open_parser = subparsers.add_parser("open", help="Open logs in the running window, starting one if needed")
+    open_parser.add_argument("files", nargs="+", help="Log files to open in tabs")
+    open_parser.set_defaults(handler=command_open)
+
+    gui_parser = subparsers.add_parser("gui", help="Start the GUI (the default)")
+    gui_parser.add_argument("files", nargs="*", help="Log files to open in tabs")
+    gui_parser.add_argument("--new-instance", action="store_true", help="Start a separate window even if one is running")
+    gui_parser.set_defaults(handler=command_gui)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "jobs", 1) < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        return 2
+    if args.cassette:
+        from . import translator
+
+        translator.configure_cassette(args.cassette, args.cassette_mode, args.replay_speed)
+    handler = getattr(args, "handler", command_gui)
+    return handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
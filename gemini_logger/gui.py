@@ -0,0 +1,2271 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import os
+import platform
+import subprocess
+import json
+import pickle
+import queue
+import re
+import threading
+import time
+import locale
+import datetime
+import sys
+from . import highlighter, log_daemon, log_export, log_filter, log_rotation, metrics, similarity, sinks, speculation, stall_watchdog, summarize, translator
+from .translator import translate_to_console_style
+
+# Global variables
+file_path = None  # Initialize the file path variable
+launch_args = None  # Set by run()
+instance_server = None
+APP_VERSION = "1.0.0"
+
+# --- Dark Mode Toggle Functions ---
+def toggle_dark_mode():
+    if is_dark_mode.get():
+        # Animate transition to dark mode
+        animate_theme_transition("Windows 11 Blue", "Dark", 200)
+    else:
+        # Animate transition to light mode
+        animate_theme_transition("Dark", "Windows 11 Blue", 200)
+    save_dark_mode_preference(is_dark_mode.get())
+
+def hex_to_int(hex_color):
+    """Convert hex color string to RGB integer values"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def int_to_hex(rgb):
+    """Convert RGB integer values to hex color string"""
+    return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+
+def interpolate_color(start_color, end_color, ratio):
+    """Interpolate between two colors based on ratio (0-1)"""
+    start_rgb = hex_to_int(start_color)
+    end_rgb = hex_to_int(end_color)
+    
+    interpolated_rgb = tuple(
+        int(start_rgb[i] + (end_rgb[i] - start_rgb[i]) * ratio)
+        for i in range(3)
+    )
+    
+    return int_to_hex(interpolated_rgb)
+
+def animate_theme_transition(start_theme, end_theme, duration=200, steps=10):
+    """Animate the transition between two themes over the specified duration"""
+    # Ensure UI widgets are initialized
+    if 'root' not in globals() or not root.winfo_exists():
+        # If UI isn't ready, just apply the theme directly
+        apply_theme(end_theme)
+        return
+        
+    # Calculate time per step
+    step_duration = duration // steps
+    
+    # Store all the widgets we'll update (safely check if they exist)
+    widgets = {}
+    
+    # Only add widgets that exist and are accessible
+    if 'root' in globals() and root.winfo_exists():
+        widgets["root"] = (root, "bg", "bg_color")
+        
+    for widget_name, widget_var in [
+        ("input_frame", "input_frame"), 
+        ("file_frame", "file_frame"),
+        ("file_label", "file_label"),
+        ("log_frame", "log_frame"),
+        ("log_display", "log_display"),
+        ("text_entry", "text_entry"),
+        ("update_button", "update_button"),
+        ("save_file_button", "save_file_button"),
+        ("change_file_button", "change_file_button"),
+        ("clear_button", "clear_button")
+    ]:
+        if widget_var in globals() and globals()[widget_var].winfo_exists():
+            widget = globals()[widget_var]
+            if widget_name == "file_label":
+                widgets[f"{widget_name}_bg"] = (widget, "bg", "frame_bg")
+                widgets[f"{widget_name}_fg"] = (widget, "fg", "text_color")
+            elif widget_name in ["log_display", "text_entry"]:
+                widgets[f"{widget_name}_bg"] = (widget, "bg", f"{widget_name.split('_')[0]}_bg")
+                widgets[f"{widget_name}_fg"] = (widget, "fg", f"{widget_name.split('_')[0]}_fg")
+            elif widget_name.endswith("_button"):
+                widgets[f"{widget_name}_bg"] = (widget, "bg", "button_bg")
+                widgets[f"{widget_name}_fg"] = (widget, "fg", "button_fg")
+            else:
+                widgets[widget_name] = (widget, "bg", "bg_color" if "frame" not in widget_name else "frame_bg")
+    
+    # If no widgets found, just apply theme directly
+    if not widgets:
+        apply_theme(end_theme)
+        return
+    
+    # Function for each animation step
+    def run_animation_step(current_step):
+        if current_step > steps:
+            # Animation complete, update to final theme
+            apply_theme(end_theme)
+            return
+            
+        # Calculate current ratio (0 to 1)
+        ratio = current_step / steps
+        
+        # Update each widget with interpolated colors
+        for widget_name, (widget, property_name, theme_key) in widgets.items():
+            # Skip if widget was destroyed during animation
+            if not widget.winfo_exists():
+                continue
+                
+            start_color = themes[start_theme][theme_key]
+            end_color = themes[end_theme][theme_key]
+            
+            # Only animate colors that start with # (hex colors)
+            if start_color.startswith('#') and end_color.startswith('#'):
+                try:
+                    interpolated_color = interpolate_color(start_color, end_color, ratio)
+                    widget.config(**{property_name: interpolated_color})
+                except Exception as e:
+                    print(f"Error updating {widget_name}: {e}")
+        
+        # Schedule next step
+        root.after(step_duration, run_animation_step, current_step + 1)
+    
+    # Start animation from step 1
+    run_animation_step(1)
+
+def save_dark_mode_preference(is_dark):
+    """Save dark mode preference to a pickle file"""
+    try:
+        with open(DARK_MODE_FILE, 'wb') as f:
+            pickle.dump(is_dark, f)
+    except Exception as e:
+        print(f"Error saving dark mode preference: {e}")
+
+def load_dark_mode_preference():
+    """Load dark mode preference from pickle file"""
+    try:
+        if os.path.exists(DARK_MODE_FILE):
+            with open(DARK_MODE_FILE, 'rb') as f:
+                return pickle.load(f)
+    except Exception as e:
+        print(f"Error loading dark mode preference: {e}")
+    return False  # Default to light mode
+
+def detect_system_dark_mode():
+    """Detect if the system is using dark mode"""
+    system = platform.system()
+    
+    if system == "Windows":
+        try:
+            # Windows 10 & 11
+            import winreg
+            registry = winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER)
+            key = winreg.OpenKey(registry, r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize")
+            value, _ = winreg.QueryValueEx(key, "AppsUseLightTheme")
+            return value == 0  # 0 means dark mode is enabled
+        except Exception as e:
+            print(f"Error detecting Windows dark mode: {e}")
+            return False
+            
+    elif system == "Darwin":  # macOS
+        try:
+            # Use applescript to check dark mode
+            cmd = 'defaults read -g AppleInterfaceStyle'
+            result = subprocess.run(cmd, shell=True, text=True, capture_output=True)
+            return result.stdout.strip() == 'Dark'
+        except Exception as e:
+            print(f"Error detecting macOS dark mode: {e}")
+            return False
+            
+    elif system == "Linux":
+        try:
+            # Try to detect for GNOME desktop environment
+            cmd = 'gsettings get org.gnome.desktop.interface color-scheme'
+            result = subprocess.run(cmd, shell=True, text=True, capture_output=True)
+            return 'dark' in result.stdout.lower()
+        except Exception as e:
+            print(f"Error detecting Linux dark mode: {e}")
+            return False
+            
+    return False  # Default to light mode if we can't detect
+
+# --- Color Palettes ---
+themes = {
+    "Windows 11 Blue": {
+        "bg_color": "#f0f8ff",
+        "frame_bg": "#e6f0ff",
+        "button_bg": "#d0e0ff",
+        "button_fg": "#333333",
+        "button_hover": "#c0d0ef",
+        "text_color": "#000000",
+        "entry_bg": "#ffffff",
+        "entry_fg": "#000000",
+        "scroll_bg": "#c0d0ef",
+        "scroll_fg": "#333333",
+        "hl_method": "#0057b8",
+        "hl_error": "#c62828",
+        "hl_string": "#2e7d32",
+        "hl_log": "#6a1b9a",
+        "hl_fence": "#757575",
+    },
+    "Light Gray": {
+        "bg_color": "#f0f0f0",
+        "frame_bg": "#e0e0e0",
+        "button_bg": "#e0e0e0",
+        "button_fg": "#333333",
+        "button_hover": "#d0d0d0",
+        "text_color": "#333333",
+        "entry_bg": "#ffffff",
+        "entry_fg": "#000000",
+        "scroll_bg": "#d0d0d0",
+        "scroll_fg": "#333333",
+        "hl_method": "#0057b8",
+        "hl_error": "#c62828",
+        "hl_string": "#2e7d32",
+        "hl_log": "#6a1b9a",
+        "hl_fence": "#707070",
+    },
+     "Dark": {
+        "bg_color": "#2b2b2b",  # Dark gray background
+        "frame_bg": "#333333",  # Darker gray frame background
+        "button_bg": "#444444",  # Slightly lighter dark gray for buttons
+        "button_fg": "#ffffff",  # White for button text
+        "button_hover": "#555555",  # Lighten on hover
+        "text_color": "#ffffff",  # White text
+        "entry_bg": "#444444",  # Dark gray for entry
+        "entry_fg": "#ffffff",  # White foreground for entry
+        "scroll_bg": "#555555", # Dark gray for scrollbar
+        "scroll_fg": "#ffffff",  # White for scrollbar
+        "hl_method": "#82aaff",  # Highlighting: console.* calls
+        "hl_error": "#ff6b6b",  # console.error and new Error
+        "hl_string": "#c3e88d",  # String literals
+        "hl_log": "#c792ea",  # [Log] fallback prefix
+        "hl_fence": "#a0a0a0",  # Markdown code fences
+    },
+    "High Contrast": {
+        "bg_color": "#000000",  # Black background
+        "frame_bg": "#222222",  # Slightly lighter black frame background
+        "button_bg": "#ffff00",  # Bright yellow for buttons
+        "button_fg": "#000000",  # Black for button text
+        "button_hover": "#bbbb00",  # Darker yellow on hover
+        "text_color": "#ffffff",  # White for text
+        "entry_bg": "#ffffff",  # White background for entry
+        "entry_fg": "#000000",  # Black foreground for entry
+        "scroll_bg": "#ffff00",  # Bright yellow for scrollbar
+        "scroll_fg": "#000000", # Black for scrollbar
+        "hl_method": "#00ffff",  # Highlighting: console.* calls
+        "hl_error": "#ff6060",  # console.error and new Error
+        "hl_string": "#ffff00",  # String literals
+        "hl_log": "#ff80ff",  # [Log] fallback prefix
+        "hl_fence": "#c0c0c0",  # Markdown code fences
+    }
+}
+
+# Default Theme
+current_theme = "Windows 11 Blue"
+
+# --- Cache Directory ---
+CACHE_DIR = "cache"
+if not os.path.exists(CACHE_DIR):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+    except Exception as e:
+        print(f"Warning: Could not create cache directory: {e}")
+        # Use a temp directory as fallback
+        CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gemini-workload-logger")
+        os.makedirs(CACHE_DIR, exist_ok=True)
+CACHE_FILE = os.path.join(CACHE_DIR, "previous_file.json")
+THEME_FILE = os.path.join(CACHE_DIR, "previous_theme.json")
+DARK_MODE_FILE = os.path.join(CACHE_DIR, "dark_mode_preference.pkl")
+ROTATION_FILE = os.path.join(CACHE_DIR, "rotation_policy.json")
+STALL_LOG_FILE = os.path.join(CACHE_DIR, "stalls.log")
+SUMMARY_CACHE_DIR = os.path.join(CACHE_DIR, "summaries")
+SIMILARITY_DIR = os.path.join(CACHE_DIR, "similarity")
+SINKS_FILE = os.path.join(CACHE_DIR, "sinks.json")
+SPECULATION_FILE = os.path.join(CACHE_DIR, "speculation_preference.json")
+translator.USAGE_LOG = os.path.join(CACHE_DIR, "token_usage.jsonl")
+
+# --- Loading Indicators ---
+loading_bar = None
+gemini_loading_label = None
+
+# --- Loading Indicator Functions ---
+def show_loading_bar(message):
+    global loading_bar
+    if loading_bar is None:
+        loading_bar = ttk.Progressbar(root, mode='indeterminate')
+        loading_bar.pack(pady=10)
+        tk.Label(root, text=message).pack()
+    loading_bar.start()
+    root.update_idletasks() # Forces immediate redraw
+
+def hide_loading_bar():
+    global loading_bar
+    if loading_bar:
+        loading_bar.stop()
+        loading_bar.destroy()
+        loading_bar = None
+        for widget in root.winfo_children():
+            if isinstance(widget, tk.Label) and widget.cget("text") in ["Saving File...", "Opening File...", "Loading File..."]:
+                widget.destroy()
+
+def show_gemini_loading():
+    global gemini_loading_label
+    if gemini_loading_label is None:
+        gemini_loading_label = tk.Label(root, text="Generating text...", font=("TkDefaultFont", 10))
+        gemini_loading_label.pack(pady=5)
+        root.update_idletasks()  # Forces the label to be shown immediately.
+
+def hide_gemini_loading():
+    global gemini_loading_label
+    if gemini_loading_label:
+        gemini_loading_label.destroy()
+        gemini_loading_label = None
+
+def save_log(log_text, file_path):
+    try:
+        with metrics.timed("file_io_seconds", op="save_log"):
+            policy = current_rotation_policy()
+            # Hand the entry to the logging daemon when one is running, otherwise append directly
+            try:
+                appended = log_daemon.try_append(file_path, log_text, policy)
+            except log_daemon.DaemonTimeout as e:
+                # Most likely committed; writing it again (or asking the user to retry) would duplicate it
+                update_status(f"The logging daemon didn't confirm this entry ({e}); check the log before logging it again")
+                appended = True
+            if not appended:
+                log_rotation.rotate_if_needed(file_path, policy, len(log_text) + 1)
+                with open(file_path, "a") as f:
+                    if log_rotation.needs_day_marker(file_path):
+                        f.write(log_rotation.day_marker() + "\n")
+                    f.write(log_text + "\n")
+        metrics.counter("file_io_bytes_total", op="save_log").inc(len(log_text) + 1)
+        index_logged_entry(file_path, log_text)
+        return True
+    except Exception as e:
+        messagebox.showerror("Error", f"Error saving log: {e}")
+        return False
+
+def update_log():
+    """Add text from the entry field to the log display and save to file"""
+    text = text_entry.get()
+    if not text:
+         messagebox.showerror("Error", "Please enter text to log.")
+         return
+    if log_entry(text):
+        text_entry.delete(0, tk.END)
+        text_entry.focus_set()
+
+def log_entry(text):
+    """Translate text, append it to the current log and show it; returns True once saved"""
+    if not file_path:
+        if messagebox.askyesno("Save File", "No file is currently opened. Do you want to save as a new file?"):
+          save_as_file()
+          if not file_path:  # If user canceled save dialog
+              return False
+        else:
+           return False
+
+    # Show loading indicator
+    show_gemini_loading()
+    previous_usage = translator.last_usage
+    translated_text = None
+    if is_speculating.get() and translator.is_available():
+        translated_text = speculator.take(text)
+    if translated_text is None:
+        translated_text = translate_to_console_style(text)
+    hide_gemini_loading()
+    usage = translator.last_usage
+    if usage is not None and usage is not previous_usage:
+        update_status(f"Generated in {usage['seconds']:.2f}s ({usage['prompt_tokens']} tokens in, {usage['output_tokens']} out)")
+
+    log_text = f"{translated_text}"
+
+    if save_log(log_text, file_path):
+        if sink_pipeline is not None:
+            sink_pipeline.publish(log_text, input=text, file=os.path.abspath(file_path))
+        if is_following.get() and follow_tail is not None:
+            # The tail picks up this entry along with anything other writers appended
+            poll_follow_now()
+        elif current_tab.tail is not None:
+            # Read the entry back, with its day marker, and start over if the append rotated the file
+            status, tail_text = current_tab.tail.poll()
+            show_tail_update(current_tab, status, tail_text)
+        else:
+            current_tab.append(log_text + '\n')
+        return True
+    messagebox.showerror("Error", "Failed to update log file.")
+    return False
+
+def save_file():
+    if file_path:
+      if current_tab.diverged or (current_tab.tail is not None and current_tab.tail.replaced()):
+          # The tab still holds entries that now live in a rotated segment; saving them would copy them into the new file
+          if messagebox.askyesno("Log Changed", f"{os.path.basename(file_path)} was rotated or rewritten since it was loaded. Reload it instead of saving? Edits in this tab will be lost (use Save as File to keep them)."):
+              current_tab.load()
+              reset_follow()
+          return
+      update_status(f"Saving file {os.path.basename(file_path)}...")
+      show_loading_bar("Saving File...")
+      try:
+        content = log_display.get("1.0", tk.END)
+        with metrics.timed("file_io_seconds", op="save_file"):
+            with open(file_path, "w") as f:
+               f.write(content)
+        metrics.counter("file_io_bytes_total", op="save_file").inc(len(content))
+        log_display.edit_modified(False)
+        reset_follow()
+        update_status(f"File saved: {os.path.basename(file_path)}")
+      except Exception as e:
+         messagebox.showerror("Error", f"Error saving file: {e}")
+         update_status("Error saving file")
+      hide_loading_bar()
+    else:
+        save_as_file()
+
+def save_as_file():
+    global file_path
+    update_status("Saving file as...")
+    show_loading_bar("Saving File...")
+    file_path_selected = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+    if file_path_selected:  # Check if user didn't cancel
+        file_path = file_path_selected
+        current_tab.file_path = file_path
+        update_tab_title(current_tab)
+        update_file_label()
+        save_previous_file(file_path)
+        # Save current content
+        try:
+            content = log_display.get("1.0", tk.END)
+            with metrics.timed("file_io_seconds", op="save_file"):
+                with open(file_path, "w") as f:
+                   f.write(content)
+            metrics.counter("file_io_bytes_total", op="save_file").inc(len(content))
+            current_tab.size = len(content)
+            current_tab.diverged = False
+            log_display.edit_modified(False)
+            reset_follow()
+            update_status(f"File saved: {os.path.basename(file_path)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving file: {e}")
+            update_status("Error saving file")
+    else:
+        update_status("Save canceled")
+    hide_loading_bar()
+
+def change_file():
+    """Open a log in its own tab, or switch to its tab if it is already open"""
+    update_status("Opening file...")
+    show_loading_bar("Opening File...")
+    file_path_selected = filedialog.askopenfilename(filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+    if file_path_selected:
+        try:
+            open_log_tab(file_path_selected)
+            update_status(f"File opened: {os.path.basename(file_path_selected)}")
+        except Exception as e:
+             messagebox.showerror("Error", f"Error loading file contents: {e}")
+             update_status("Error opening file")
+    else:
+        update_status("Open canceled")
+    hide_loading_bar()
+
+def update_file_label():
+    """Update the file label and status bar with current file path"""
+    file_label.config(text=f"Current File: {file_path}")
+    update_file_status()  # Update the status bar too
+
+def on_button_enter(event):
+    event.widget.config(bg=themes[current_theme]["button_hover"])
+
+def on_button_leave(event):
+    event.widget.config(bg=themes[current_theme]["button_bg"])
+
+def on_enter_key(event):
+    cancel_speculation_timer()
+    update_log()
+
+def clear_text_entry():
+    text_entry.delete(0, tk.END)
+    text_entry.focus_set()
+
+# --- Persistent File Handling ---
+def load_previous_file():
+    if os.path.exists(CACHE_FILE):
+        try:
+            with open(CACHE_FILE, "r") as f:
+                cache_data = json.load(f)
+                return cache_data.get("previous_file")
+        except (json.JSONDecodeError, KeyError):
+            return None
+    return None
+
+def load_previous_tabs():
+    """Files that were open in tabs last time, oldest tab first"""
+    if os.path.exists(CACHE_FILE):
+        try:
+            with open(CACHE_FILE, "r") as f:
+                return json.load(f).get("open_files", [])
+        except (json.JSONDecodeError, AttributeError):
+            return []
+    return []
+
+def save_previous_file(file_path):
+    try:
+        open_files = [tab.file_path for tab in tabs if tab.file_path]
+        with open(CACHE_FILE, "w") as f:
+            json.dump({"previous_file": file_path, "open_files": open_files}, f)
+    except Exception as e:
+         messagebox.showerror("Error", f"Error saving file to cache: {e}")
+
+def file_menu_save():
+    save_file()
+
+def file_menu_open():
+    change_file()
+
+def file_menu_view():
+    if file_path:
+        try:
+            show_loading_bar("Loading File...")
+            # Includes rotated segments, compressed or not, ahead of the active file
+            with metrics.timed("file_io_seconds", op="view"):
+                content = log_rotation.read_all(file_path)
+            metrics.counter("file_io_bytes_total", op="view").inc(len(content))
+            view_window = tk.Toplevel(root)
+            view_window.title(f"Viewing {os.path.basename(file_path)}")
+            view_text = tk.Text(view_window, wrap=tk.WORD, bg=themes[current_theme]["bg_color"], fg=themes[current_theme]["text_color"], borderwidth=0)
+            view_text.insert(tk.END, content)
+            view_text.config(state=tk.DISABLED)
+            view_text.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+
+            scrollbar = tk.Scrollbar(view_window, command=view_text.yview, bg=themes[current_theme]["scroll_bg"], activebackground=themes[current_theme]["scroll_fg"])
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            view_text.config(yscrollcommand=scrollbar.set)
+            hide_loading_bar()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error viewing file: {e}")
+            hide_loading_bar()
+    else:
+        messagebox.showerror("Error", "No file opened to view.")
+
+# --- Export ---
+EXPORT_FILETYPES = [
+    ("JSON Lines", "*.jsonl"),
+    ("CSV", "*.csv"),
+    ("Markdown", "*.md"),
+    ("HTML", "*.html"),
+]
+export_job = None
+
+def show_export_dialog():
+    """Ask for filters and a destination, then export the log on a background thread"""
+    if not file_path:
+        messagebox.showerror("Error", "No file opened to export.")
+        return
+    if export_job is not None and not export_job.done:
+        messagebox.showinfo("Export", "An export is already running.")
+        return
+
+    export_window = tk.Toplevel(root)
+    export_window.title("Export Log")
+    export_window.resizable(False, False)
+    export_window.transient(root)
+
+    content_frame = tk.Frame(export_window, padx=20, pady=20)
+    content_frame.pack(fill=tk.BOTH, expand=True)
+
+    fields = {}
+    for row, (key, label) in enumerate([
+        ("since", "From date (YYYY-MM-DD):"),
+        ("until", "To date (YYYY-MM-DD):"),
+        ("tags", "Tags (space separated):"),
+        ("search", "Containing text:"),
+    ]):
+        tk.Label(content_frame, text=label, anchor=tk.W).grid(row=row, column=0, sticky=tk.W, pady=2)
+        fields[key] = tk.Entry(content_frame, width=30)
+        fields[key].grid(row=row, column=1, pady=2)
+
+    include_segments = tk.BooleanVar(value=True)
+    tk.Checkbutton(content_frame, text="Include rotated segments", variable=include_segments).grid(
+        row=4, column=0, columnspan=2, sticky=tk.W, pady=(5, 10))
+
+    def start_export():
+        options = {
+            "since": fields["since"].get().strip() or None,
+            "until": fields["until"].get().strip() or None,
+            "tags": fields["tags"].get().split() or None,
+            "search": fields["search"].get().strip() or None,
+            "include_segments": include_segments.get(),
+        }
+        try:
+            log_export.parse_date(options["since"])
+            log_export.parse_date(options["until"])
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format.", parent=export_window)
+            return
+        output = filedialog.asksaveasfilename(parent=export_window, defaultextension=".jsonl", filetypes=EXPORT_FILETYPES)
+        if not output:
+            return
+        export_window.destroy()
+        start_export_job(output, options)
+
+    button_frame = tk.Frame(content_frame)
+    button_frame.grid(row=5, column=0, columnspan=2)
+    tk.Button(button_frame, text="Export...", command=start_export).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Close", command=export_window.destroy).pack(side=tk.LEFT, padx=5)
+
+def start_export_job(output, options):
+    global export_job
+    options["fmt"] = log_export.format_for_path(output)
+    export_job = log_export.ExportJob(file_path, output, **options).start()
+    file_menu.entryconfig("Cancel Export", state=tk.NORMAL)
+    update_status(f"Exporting to {os.path.basename(output)}...")
+    root.after(200, poll_export_job)
+
+def poll_export_job():
+    """Report export progress in the status bar until the job finishes"""
+    if export_job is None:
+        return
+    if not export_job.done:
+        update_status(f"Exporting to {os.path.basename(export_job.output)}... {export_job.exported} entries")
+        root.after(200, poll_export_job)
+        return
+    file_menu.entryconfig("Cancel Export", state=tk.DISABLED)
+    if export_job.cancelled:
+        update_status("Export canceled")
+    elif export_job.error is not None:
+        messagebox.showerror("Error", f"Error exporting log: {export_job.error}")
+        update_status("Error exporting log")
+    else:
+        update_status(f"Exported {export_job.result} entries to {os.path.basename(export_job.output)}")
+
+def cancel_export():
+    if export_job is not None and not export_job.done:
+        export_job.cancel()
+
+# --- Speculative Translation ---
+SPECULATION_DELAY = 700  # ms the entry text must stay unchanged before translating it
+speculator = speculation.Speculator(lambda text: translator.generate(text, "speculative"))
+speculation_job = None
+
+def load_speculation_preference():
+    if os.path.exists(SPECULATION_FILE):
+        try:
+            with open(SPECULATION_FILE, "r") as f:
+                return bool(json.load(f).get("enabled", False))
+        except (json.JSONDecodeError, AttributeError):
+            return False
+    return False
+
+def toggle_speculation():
+    try:
+        with open(SPECULATION_FILE, "w") as f:
+            json.dump({"enabled": is_speculating.get()}, f)
+    except Exception as e:
+        print(f"Error saving speculation preference: {e}")
+    if not is_speculating.get():
+        cancel_speculation_timer()
+        speculator.discard()
+
+def cancel_speculation_timer():
+    global speculation_job
+    if speculation_job is not None:
+        root.after_cancel(speculation_job)
+        speculation_job = None
+
+def on_entry_key_release(event):
+    """Debounce typing: speculate only once the text has been stable for a moment"""
+    global speculation_job
+    if not is_speculating.get() or not translator.is_available() or event.keysym == "Return":
+        return
+    speculator.discard_if_stale(text_entry.get())
+    cancel_speculation_timer()
+    speculation_job = root.after(SPECULATION_DELAY, run_speculation)
+
+def run_speculation():
+    global speculation_job
+    speculation_job = None
+    if is_speculating.get():
+        speculator.speculate(text_entry.get())
+
+# --- Workload Summary ---
+# Range -> (days back, or None for everything; calendar period the chunks are aligned to)
+SUMMARY_RANGES = {
+    "Last 7 days": (7, "day"),
+    "Last 30 days": (30, "week"),
+    "Last 365 days": (365, "month"),
+    "Entire log": (None, "month"),
+}
+summary_job = None
+summary_range_label = None
+
+def show_summary_dialog():
+    """Pick a date range, then summarize the log on a background thread"""
+    if not file_path:
+        messagebox.showerror("Error", "No file opened to summarize.")
+        return
+    if translator.model is None:
+        messagebox.showerror("Error", "Summaries need the Gemini model (is GOOGLE_API_KEY set?).")
+        return
+    if summary_job is not None and not summary_job.done:
+        messagebox.showinfo("Summary", "A summary is already running.")
+        return
+
+    summary_window = tk.Toplevel(root)
+    summary_window.title("Summarize Workload")
+    summary_window.resizable(False, False)
+    summary_window.transient(root)
+
+    content_frame = tk.Frame(summary_window, padx=20, pady=20)
+    content_frame.pack(fill=tk.BOTH, expand=True)
+
+    summary_range = tk.StringVar(value="Last 7 days")
+    for label in SUMMARY_RANGES:
+        tk.Radiobutton(content_frame, text=label, variable=summary_range, value=label, anchor=tk.W).pack(fill=tk.X)
+
+    def start():
+        summary_window.destroy()
+        start_summary_job(summary_range.get())
+
+    button_frame = tk.Frame(content_frame)
+    button_frame.pack(pady=(10, 0))
+    tk.Button(button_frame, text="Summarize", command=start).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Close", command=summary_window.destroy).pack(side=tk.LEFT, padx=5)
+
+def start_summary_job(range_label):
+    global summary_job, summary_range_label
+    days, period = SUMMARY_RANGES[range_label]
+    since = datetime.date.today() - datetime.timedelta(days=days - 1) if days else None
+    summary_job = summarize.SummaryJob(
+        file_path, translator.summarize, since=since, period=period, cache_dir=SUMMARY_CACHE_DIR)
+    summary_range_label = range_label
+    summary_job.start()
+    tools_menu.entryconfig("Cancel Summary", state=tk.NORMAL)
+    update_status(f"Summarizing {range_label.lower()}...")
+    root.after(200, poll_summary_job)
+
+def poll_summary_job():
+    """Report map-reduce progress in the status bar until the summary is ready"""
+    if summary_job is None:
+        return
+    if not summary_job.done:
+        done, total = summary_job.progress
+        update_status(f"Summarizing {summary_range_label.lower()}... {done}/{total} steps")
+        root.after(200, poll_summary_job)
+        return
+    tools_menu.entryconfig("Cancel Summary", state=tk.DISABLED)
+    if summary_job.cancelled:
+        update_status("Summary canceled")
+    elif summary_job.error is not None:
+        messagebox.showerror("Error", f"Error summarizing log: {summary_job.error}")
+        update_status("Error summarizing log")
+    elif summary_job.result is None:
+        update_status(f"No entries in {summary_range_label.lower()}")
+    else:
+        stats = summary_job.stats
+        update_status(f"Summary ready: {stats['chunks']} chunks, {stats['cached']} from cache")
+        show_summary(summary_range_label, summary_job.result)
+
+def show_summary(range_label, text):
+    summary_window = tk.Toplevel(root)
+    summary_window.title(f"Workload Summary - {range_label}")
+    summary_window.geometry("700x450")
+
+    summary_text = tk.Text(summary_window, wrap=tk.WORD, padx=10, pady=10, borderwidth=0)
+    summary_text.pack(fill=tk.BOTH, expand=True)
+    summary_text.insert(tk.END, text)
+    summary_text.config(state=tk.DISABLED)
+
+    def copy():
+        root.clipboard_clear()
+        root.clipboard_append(text)
+
+    button_frame = tk.Frame(summary_window)
+    button_frame.pack(pady=10)
+    tk.Button(button_frame, text="Copy", command=copy).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Close", command=summary_window.destroy).pack(side=tk.LEFT, padx=5)
+
+def cancel_summary():
+    if summary_job is not None and not summary_job.done:
+        summary_job.cancel()
+
+# --- Log Filter ---
+FILTER_MAX_ROWS = 10000  # Rows shown in the filter pane; the scan keeps counting past this
+FILTER_BATCH = 500  # Rows moved into the pane per poll, so a flood of hits can't freeze the UI
+filter_job = None
+filter_window = None
+filter_results = None
+filter_status = None
+filter_hits = []  # (source, line) behind each row of filter_results
+
+def show_filter_pane():
+    """Open (or raise) the pane that searches the current log and its segments with a regex"""
+    global filter_window, filter_results, filter_status
+    if filter_window is not None and filter_window.winfo_exists():
+        filter_window.lift()
+        return
+
+    filter_window = tk.Toplevel(root)
+    filter_window.title("Filter Log")
+    filter_window.geometry("800x450")
+
+    options_frame = tk.Frame(filter_window, padx=10, pady=10)
+    options_frame.pack(fill=tk.X)
+    tk.Label(options_frame, text="Pattern:").pack(side=tk.LEFT)
+    pattern_entry = tk.Entry(options_frame)
+    pattern_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    ignore_case = tk.BooleanVar(value=False)
+    include_segments = tk.BooleanVar(value=True)
+    tk.Checkbutton(options_frame, text="Ignore case", variable=ignore_case).pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="Rotated segments", variable=include_segments).pack(side=tk.LEFT)
+
+    def search():
+        start_filter_job(pattern_entry.get(), ignore_case.get(), include_segments.get())
+
+    tk.Button(options_frame, text="Search", command=search).pack(side=tk.LEFT, padx=5)
+    tk.Button(options_frame, text="Cancel", command=cancel_filter).pack(side=tk.LEFT)
+    pattern_entry.bind("<Return>", lambda event: search())
+
+    results_frame = tk.Frame(filter_window, padx=10)
+    results_frame.pack(fill=tk.BOTH, expand=True)
+    results_scrollbar = tk.Scrollbar(results_frame)
+    results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    filter_results = tk.Listbox(results_frame, yscrollcommand=results_scrollbar.set, font=("Courier", 10), activestyle=tk.NONE)
+    filter_results.pack(fill=tk.BOTH, expand=True)
+    results_scrollbar.config(command=filter_results.yview)
+    filter_results.bind("<Double-Button-1>", lambda event: jump_to_filter_hit())
+    filter_results.bind("<Return>", lambda event: jump_to_filter_hit())
+
+    filter_status = tk.Label(filter_window, text="Double-click a result to show it in the log", anchor=tk.W, padx=10, pady=5)
+    filter_status.pack(fill=tk.X)
+
+    def close():
+        cancel_filter()
+        filter_window.destroy()
+
+    filter_window.protocol("WM_DELETE_WINDOW", close)
+    pattern_entry.focus_set()
+
+def start_filter_job(pattern, ignore_case, include_segments):
+    global filter_job
+    if not file_path:
+        messagebox.showerror("Error", "No file opened to filter.", parent=filter_window)
+        return
+    if not pattern:
+        return
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        messagebox.showerror("Error", f"Invalid pattern: {e}", parent=filter_window)
+        return
+    cancel_filter()
+    filter_results.delete(0, tk.END)
+    filter_hits.clear()
+    filter_job = log_filter.FilterProcess(file_path, pattern, ignore_case, include_segments)
+    filter_status.config(text="Searching...")
+    root.after(50, poll_filter_job, filter_job)
+
+def poll_filter_job(job):
+    """Move hits from the scan into the pane as they arrive"""
+    if job is not filter_job or filter_results is None or not filter_results.winfo_exists():
+        return
+    rows = []
+    while len(rows) < FILTER_BATCH:
+        try:
+            hit = job.results.get_nowait()
+        except queue.Empty:
+            break
+        if len(filter_hits) < FILTER_MAX_ROWS:
+            filter_hits.append((hit["source"], hit["line"]))
+            rows.append(f"{os.path.basename(hit['source'])}:{hit['line']}: {hit['text'][:500]}")
+    if rows:
+        filter_results.insert(tk.END, *rows)
+    if not job.done or not job.results.empty():
+        filter_status.config(text=f"Searching... {job.count} matching lines")
+        root.after(50, poll_filter_job, job)
+        return
+    if job.cancelled:
+        filter_status.config(text=f"Canceled after {job.count} matching lines")
+    elif job.error is not None:
+        filter_status.config(text=f"Error filtering log: {job.error}")
+    else:
+        metrics.histogram("filter_seconds").observe(job.elapsed)
+        metrics.counter("filter_hits_total").inc(job.count)
+        shown = f" (showing the first {FILTER_MAX_ROWS})" if job.count > FILTER_MAX_ROWS else ""
+        filter_status.config(text=f"{job.count} matching lines in {job.elapsed:.2f}s{shown}")
+
+def jump_to_filter_hit():
+    """Show the selected hit in its tab; lines in compressed segments can only be listed"""
+    selection = filter_results.curselection()
+    if not selection:
+        return
+    source, line = filter_hits[selection[0]]
+    if source.endswith(".gz"):
+        filter_status.config(text=f"{os.path.basename(source)} is compressed; its lines can't be opened in a tab")
+        return
+    try:
+        open_log_tab(source)
+    except Exception as e:
+        messagebox.showerror("Error", f"Error opening file: {e}", parent=filter_window)
+        return
+    log_display.tag_remove("sel", "1.0", tk.END)
+    log_display.tag_add("sel", f"{line}.0", f"{line}.end")
+    log_display.see(f"{line}.0")
+    log_highlighter.schedule_viewport()
+
+def cancel_filter():
+    if filter_job is not None and not filter_job.done:
+        filter_job.cancel()
+
+# --- Find Similar ---
+SIMILAR_RESULTS = 20
+similarity_indexes = {}  # Log path -> (index, log size when last synced); loaded on first use
+similarity_job = None
+
+def index_logged_entry(path, text):
+    """Keep an already loaded similarity index current as entries are logged"""
+    loaded = similarity_indexes.get(os.path.abspath(path))
+    if loaded is None:
+        return  # The next Find Similar syncs it from the file
+    try:
+        loaded[0].add(text)
+        similarity_indexes[os.path.abspath(path)] = (loaded[0], os.path.getsize(path))
+    except Exception as e:
+        print(f"Error indexing entry: {e}")
+
+def find_similar():
+    """Rank past entries by similarity to the selection, the entry field, or the line at the cursor"""
+    global similarity_job
+    if not similarity.available():
+        messagebox.showerror("Error", "Find Similar needs NumPy (pip install numpy).")
+        return
+    if not file_path:
+        messagebox.showerror("Error", "No file opened to search.")
+        return
+    if similarity_job is not None and not similarity_job.done:
+        messagebox.showinfo("Find Similar", "Still indexing the log, please wait.")
+        return
+    try:
+        query = log_display.get("sel.first", "sel.last").strip()
+    except tk.TclError:
+        query = ""
+    query = query or text_entry.get().strip() or log_display.get("insert linestart", "insert lineend").strip()
+    if not query:
+        messagebox.showerror("Error", "Select an entry or type some text to find similar entries.")
+        return
+
+    path = os.path.abspath(file_path)
+    index, synced_size = similarity_indexes.get(path, (None, None))
+    try:
+        stale = synced_size != os.path.getsize(path)  # Written to by another process, rotated or saved
+    except OSError:
+        stale = True
+    similarity_job = similarity.SimilarityJob(
+        path, [query], SIMILAR_RESULTS, cache_dir=SIMILARITY_DIR, index=index, sync=stale).start()
+    if stale:
+        update_status("Indexing entries...")
+    root.after(50, poll_similarity_job, similarity_job, query)
+
+def poll_similarity_job(job, query):
+    if not job.done:
+        entries, added = job.progress
+        update_status(f"Indexing entries... {entries} read, {added} new")
+        root.after(200, poll_similarity_job, job, query)
+        return
+    if job.cancelled:
+        update_status("Indexing canceled")
+    elif job.error is not None:
+        messagebox.showerror("Error", f"Error finding similar entries: {job.error}")
+        update_status("Error finding similar entries")
+    else:
+        if job.sync:
+            similarity_indexes[job.log_path] = (job.index, os.path.getsize(job.log_path))
+        update_status(f"Compared with {len(job.index)} indexed entries")
+        show_similar(query, job.result[0])
+
+def show_similar(query, results):
+    similar_window = tk.Toplevel(root)
+    similar_window.title("Similar Entries")
+    similar_window.geometry("800x400")
+
+    tk.Label(similar_window, text=f"Entries similar to: {query.splitlines()[0][:100]}", anchor=tk.W, padx=10, pady=5).pack(fill=tk.X)
+    results_frame = tk.Frame(similar_window, padx=10)
+    results_frame.pack(fill=tk.BOTH, expand=True)
+    results_scrollbar = tk.Scrollbar(results_frame)
+    results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    results_list = tk.Listbox(results_frame, yscrollcommand=results_scrollbar.set, font=("Courier", 10), activestyle=tk.NONE)
+    results_list.pack(fill=tk.BOTH, expand=True)
+    results_scrollbar.config(command=results_list.yview)
+    for score, text in results:
+        results_list.insert(tk.END, f"{score:.2f}  {' '.join(text.split())[:300]}")
+
+    def show_entry(event=None):
+        selection = results_list.curselection()
+        if not selection:
+            return
+        first_line = results[selection[0]][1].splitlines()[0]
+        position = log_display.search(first_line, "1.0", stopindex=tk.END, exact=True)
+        if not position:
+            update_status("That entry is in a rotated segment; File > View shows the whole log")
+            return
+        log_display.tag_remove("sel", "1.0", tk.END)
+        log_display.tag_add("sel", position, f"{position} lineend")
+        log_display.see(position)
+        log_highlighter.schedule_viewport()
+
+    results_list.bind("<Double-Button-1>", show_entry)
+    results_list.bind("<Return>", show_entry)
+    tk.Button(similar_window, text="Close", command=similar_window.destroy).pack(pady=10)
+
+# --- Sinks ---
+def load_sink_pipeline():
+    """Start mirroring entries to the sinks listed in sinks.json, if any"""
+    try:
+        return sinks.load_pipeline(SINKS_FILE)
+    except Exception as e:
+        print(f"Error loading sinks: {e}")
+        return None
+
+sink_pipeline = None  # Loaded by run()
+
+# --- Single Instance ---
+INSTANCE_POLL_INTERVAL = 100  # ms between checks for requests from later launches
+
+def poll_instance_requests():
+    """Carry out requests forwarded by later launches and the CLI, on the Tk thread"""
+    while True:
+        try:
+            request = instance_server.requests.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            handle_instance_request(request)
+        except Exception as e:
+            print(f"Error handling forwarded request: {e}")
+    root.after(INSTANCE_POLL_INTERVAL, poll_instance_requests)
+
+def handle_instance_request(request):
+    root.deiconify()
+    root.lift()
+    root.focus_force()
+    path = request.get("path")
+    if path:
+        try:
+            open_log_tab(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading file contents: {e}")
+            return
+    if request["op"] == "log":
+        if log_entry(request["text"]):
+            update_status(f"Logged entry from another process to {os.path.basename(file_path)}")
+
+# --- Log Rotation ---
+ROTATION_CHOICES = {
+    "Off": log_rotation.RotationPolicy(),
+    "Daily": log_rotation.RotationPolicy(daily=True),
+    "Over 10 MB": log_rotation.RotationPolicy(max_bytes=log_rotation.DEFAULT_MAX_BYTES),
+    "Daily or Over 10 MB": log_rotation.RotationPolicy(max_bytes=log_rotation.DEFAULT_MAX_BYTES, daily=True),
+}
+
+def load_rotation_choice():
+    if os.path.exists(ROTATION_FILE):
+        try:
+            with open(ROTATION_FILE, "r") as f:
+                choice = json.load(f).get("rotation", "Off")
+                return choice if choice in ROTATION_CHOICES else "Off"
+        except (json.JSONDecodeError, KeyError, AttributeError):
+            return "Off"
+    return "Off"
+
+def save_rotation_choice(choice):
+    try:
+        with open(ROTATION_FILE, "w") as f:
+            json.dump({"rotation": choice}, f)
+    except Exception as e:
+        messagebox.showerror("Error", f"Error saving rotation policy: {e}")
+
+def current_rotation_policy():
+    """Rotation policy selected in the File > Rotation menu"""
+    return ROTATION_CHOICES.get(rotation_choice.get(), ROTATION_CHOICES["Off"])
+
+def apply_rotation_choice():
+    save_rotation_choice(rotation_choice.get())
+    update_status(f"Log rotation: {rotation_choice.get()}")
+
+# --- Live Tail (Follow Mode) ---
+TAIL_MIN_INTERVAL = 250  # ms between polls while the file is changing
+TAIL_MAX_INTERVAL = 4000  # ms between polls once the file has gone idle
+TAIL_ENCODING = locale.getpreferredencoding(False)  # Matches the default used by open()
+
+class LogTail:
+    """Track a read offset into a log file so only newly appended bytes are read"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.identity = None
+        self.mtime = None
+
+    def reset(self):
+        """Treat everything currently in the file as already displayed"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self.offset, self.identity, self.mtime = 0, None, None
+            return
+        self.offset = stat.st_size
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.mtime = stat.st_mtime_ns
+
+    def replaced(self):
+        """True if the file was renamed away (rotated) and replaced since it was read"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False  # Deleted: saving recreates it
+        return self.identity is not None and (stat.st_dev, stat.st_ino) != self.identity
+
+    def poll(self):
+        """Return (status, text) where status is idle, missing, append, rotated or truncated"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return "missing", ""
+        identity = (stat.st_dev, stat.st_ino)
+        if identity == self.identity and stat.st_size == self.offset and stat.st_mtime_ns == self.mtime:
+            return "idle", ""
+
+        status = "append"
+        if self.identity is not None and identity != self.identity:
+            # The file was renamed away and replaced: follow the new file from the start
+            status = "rotated"
+            self.offset = 0
+        elif stat.st_size < self.offset or (stat.st_size == self.offset and self.mtime is not None):
+            # Shrunk, or rewritten in place: the display has to be rebuilt
+            status = "truncated"
+            self.offset = 0
+        self.identity = identity
+        self.mtime = stat.st_mtime_ns
+
+        if stat.st_size <= self.offset:
+            return status, ""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        # Only hand over complete lines; a half-written line is picked up on the next poll
+        end = data.rfind(b"\n")
+        if end < 0:
+            if status != "append":
+                return status, ""
+            return "idle", ""
+        data = data[:end + 1]
+        self.offset += len(data)
+        return status, data.decode(TAIL_ENCODING, errors="replace")
+
+follow_tail = None
+follow_job = None
+
+def reset_follow():
+    """Point the tail at the current file and skip what is already displayed"""
+    global follow_tail
+    if file_path:
+        follow_tail = LogTail(file_path)
+        follow_tail.reset()
+    else:
+        follow_tail = None
+    if current_tab is not None:
+        current_tab.tail = follow_tail
+
+def toggle_follow():
+    """Start or stop following the current file"""
+    global follow_job
+    if follow_job is not None:
+        root.after_cancel(follow_job)
+        follow_job = None
+    if is_following.get():
+        if not file_path:
+            messagebox.showerror("Error", "No file opened to follow.")
+            is_following.set(False)
+            return
+        reset_follow()
+        poll_follow()
+        update_status(f"Following {os.path.basename(file_path)}")
+    else:
+        update_status("Stopped following file")
+
+def show_tail_update(tab, status, text):
+    """Add what a tab's tail read; a rotated or rewritten file replaces the tab's text"""
+    if tab.diverged:
+        return  # Kept its edits over a replaced file; it no longer mirrors the file
+    if status in ("truncated", "rotated"):
+        change = "rotated" if status == "rotated" else "rewritten"
+        if tab.modified and not messagebox.askyesno(
+            "Log Changed",
+            f"{tab.title} was {change} on disk, but this tab has unsaved edits. Discard them and show the new file?",
+        ):
+            tab.diverged = True
+            update_status(f"{tab.title} was {change}; this tab keeps your edits and no longer follows the file")
+            return
+        # Rotated entries are in a segment now (File > View); kept here, the next save would duplicate them
+        tab.clear()
+        if status == "rotated":
+            update_status("Log rotated; earlier entries are under File > View")
+    if text:
+        at_bottom = tab.display.yview()[1] >= 1.0
+        tab.append(text)
+        if at_bottom:
+            tab.display.see(tk.END)
+
+def poll_follow(interval=TAIL_MIN_INTERVAL):
+    """Append new lines from the followed file, backing off while it stays idle"""
+    global follow_job
+    follow_job = None
+    if not is_following.get() or follow_tail is None:
+        return
+    try:
+        status, text = follow_tail.poll()
+        if text:
+            metrics.counter("file_io_bytes_total", op="follow").inc(len(text))
+    except Exception as e:
+        print(f"Error following file: {e}")
+        status, text = "missing", ""
+
+    show_tail_update(current_tab, status, text)
+    if status == "rotated" and not current_tab.diverged:
+        update_status(f"Log rotated, following new {os.path.basename(follow_tail.path)}")
+
+    if status in ("idle", "missing"):
+        interval = min(interval * 2, TAIL_MAX_INTERVAL)
+    else:
+        interval = TAIL_MIN_INTERVAL
+    follow_job = root.after(interval, poll_follow, interval)
+
+def poll_follow_now():
+    """Read pending lines immediately instead of waiting for the next poll"""
+    if follow_job is not None:
+        root.after_cancel(follow_job)
+    poll_follow()
+
+# --- Tabs ---
+# Characters of log text kept in all tabs together; least recently used background tabs are evicted beyond it
+TAB_MEMORY_BUDGET = int(os.getenv("GEMINI_LOGGER_TAB_BUDGET_MB", "64")) * 1024 * 1024
+
+class LogTab:
+    """One open log: its text widget, highlighter, tail and saved scroll position.
+
+    An evicted tab keeps only its path and scroll position; its text is read
+    back from the file when the tab is selected again.
+    """
+
+    def __init__(self, path):
+        self.file_path = path
+        self.frame = tk.Frame(log_notebook, borderwidth=0)
+        self.display = tk.Text(self.frame, height=15, wrap=tk.WORD, borderwidth=0)
+        self.display.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = tk.Scrollbar(self.frame, command=self.display.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Highlight console-style entries as they are inserted or scrolled into view
+        self.highlighter = highlighter.Highlighter(self.display, themes[current_theme])
+        self.display.config(yscrollcommand=self.on_scroll)
+        self.display.bind("<KeyRelease>", lambda event: self.highlighter.edited())
+        self.tail = None
+        self.diverged = False  # Kept unsaved edits when the file was rotated or rewritten under it
+        self.size = 0  # Characters currently in the widget
+        self.resident = True
+        self.saved_view = 0.0
+        self.last_used = time.monotonic()
+
+    @property
+    def title(self):
+        return os.path.basename(self.file_path) if self.file_path else "Untitled"
+
+    @property
+    def modified(self):
+        """True once the text was edited by hand; such tabs are never evicted"""
+        return bool(self.display.edit_modified())
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.highlighter.schedule_viewport()
+
+    def load(self):
+        with metrics.timed("file_io_seconds", op="change_file"):
+            with open(self.file_path, "r") as f:
+                content = f.read()
+            self.display.delete("1.0", tk.END)
+            self.display.insert(tk.END, content)
+        metrics.counter("file_io_bytes_total", op="change_file").inc(len(content))
+        self.display.edit_modified(False)
+        self.highlighter.reset()
+        self.size = len(content)
+        self.resident = True
+        self.diverged = False
+        self.tail = LogTail(self.file_path)
+        self.tail.reset()
+
+    def append(self, text):
+        was_modified = self.display.edit_modified()
+        start = self.display.index("end-1c")
+        self.display.insert(tk.END, text)
+        self.display.edit_modified(was_modified)
+        self.highlighter.inserted(start, "end-1c")
+        self.size += len(text)
+
+    def clear(self):
+        self.display.delete("1.0", tk.END)
+        self.display.edit_modified(False)
+        self.highlighter.reset()
+        self.size = 0
+
+    def evict(self):
+        self.saved_view = self.display.yview()[0]
+        self.clear()
+        self.resident = False
+        metrics.counter("tab_evictions_total").inc()
+
+    def rehydrate(self):
+        with metrics.timed("tab_rehydrate_seconds"):
+            self.load()
+        # Scroll back once the widget has laid the text out
+        self.display.after_idle(self.display.yview_moveto, self.saved_view)
+
+tabs = []
+current_tab = None
+metrics.gauge("tab_resident_chars", lambda: sum(tab.size for tab in tabs if tab.resident))
+
+def apply_tab_colors(tab, theme_name):
+    colors = themes[theme_name]
+    tab.frame.config(bg=colors["bg_color"])
+    tab.display.config(bg=colors["bg_color"], fg=colors["text_color"])
+    tab.scrollbar.config(bg=colors["scroll_bg"], activebackground=colors["scroll_fg"])
+    tab.highlighter.apply_colors(colors)
+
+def create_tab(path):
+    tab = LogTab(path)
+    apply_tab_colors(tab, current_theme)
+    tabs.append(tab)
+    log_notebook.add(tab.frame, text=tab.title)
+    return tab
+
+def update_tab_title(tab):
+    log_notebook.tab(tab.frame, text=tab.title)
+
+def find_tab(path):
+    for tab in tabs:
+        if tab.file_path and os.path.abspath(tab.file_path) == os.path.abspath(path):
+            return tab
+    return None
+
+def activate_tab(tab):
+    """Point the single-file globals at `tab`, reading its text back in if it was evicted"""
+    global current_tab, file_path, log_display, scrollbar, log_highlighter, follow_tail
+    current_tab = tab
+    file_path = tab.file_path
+    log_display = tab.display
+    scrollbar = tab.scrollbar
+    log_highlighter = tab.highlighter
+    tab.last_used = time.monotonic()
+    if not tab.resident and tab.file_path:
+        try:
+            tab.rehydrate()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading file contents: {e}")
+    follow_tail = tab.tail
+    update_file_label()
+    enforce_tab_budget()
+    if is_following.get() and follow_tail is not None:
+        poll_follow_now()  # Catch up on lines appended while the tab was in the background
+
+def on_tab_changed(event):
+    selected = log_notebook.select()
+    for tab in tabs:
+        if str(tab.frame) == selected and tab is not current_tab:
+            activate_tab(tab)
+
+def enforce_tab_budget():
+    """Evict least recently used background tabs until the resident text fits the budget"""
+    resident = sum(tab.size for tab in tabs if tab.resident)
+    candidates = [tab for tab in tabs if tab.resident and tab is not current_tab and tab.file_path and not tab.modified]
+    for tab in sorted(candidates, key=lambda tab: tab.last_used):
+        if resident <= TAB_MEMORY_BUDGET:
+            break
+        resident -= tab.size
+        tab.evict()
+
+def open_log_tab(path):
+    """Show `path` in its tab, opening one unless the current tab is an empty Untitled tab; raises on read errors"""
+    tab = find_tab(path)
+    if tab is None:
+        reuse = current_tab is not None and current_tab.file_path is None and current_tab.size == 0 and not current_tab.modified
+        tab = current_tab if reuse else create_tab(path)
+        tab.file_path = path
+        try:
+            tab.load()
+        except Exception:
+            if reuse:
+                tab.file_path = None
+            else:
+                close_tab(tab)
+            raise
+        update_tab_title(tab)
+        log_rotation.compress_pending_segments(path)
+    log_notebook.select(tab.frame)
+    activate_tab(tab)
+    save_previous_file(path)
+    return tab
+
+def close_tab(tab=None):
+    tab = tab or current_tab
+    if tab.modified and not messagebox.askyesno("Close Tab", f"'{tab.title}' has unsaved edits. Close it anyway?"):
+        return
+    tabs.remove(tab)
+    log_notebook.forget(tab.frame)
+    tab.highlighter.shutdown()
+    tab.frame.destroy()
+    if not tabs:
+        create_tab(None)
+    if tab is current_tab:
+        next_tab = next((other for other in tabs if str(other.frame) == log_notebook.select()), tabs[-1])
+        log_notebook.select(next_tab.frame)
+        activate_tab(next_tab)
+    save_previous_file(file_path)
+
+# --- Diagnostics ---
+METRICS_FILE = os.getenv("GEMINI_LOGGER_METRICS_FILE")  # Prometheus text file, rewritten periodically
+METRICS_PORT = os.getenv("GEMINI_LOGGER_METRICS_PORT")  # Serve /metrics on 127.0.0.1 at this port
+METRICS_FILE_INTERVAL = 15000  # ms between metrics file writes
+
+DAEMON_STATS_INTERVAL = 2.0  # seconds between daemon stats requests while Diagnostics is open
+
+class DaemonStatsPoller:
+    """Fetch the logging daemon's stats on a worker thread; `latest` holds the last answer or None"""
+
+    def __init__(self, interval=DAEMON_STATS_INTERVAL):
+        self.interval = interval
+        self.latest = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="daemon-stats", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        address = log_daemon.default_address()
+        while not self.stop_event.is_set():
+            stats = None
+            if not isinstance(address, str) or os.path.exists(address):
+                try:
+                    client = log_daemon.DaemonClient(address, timeout=1.0)
+                    stats = client.stats()
+                    client.close()
+                except Exception:
+                    pass
+            self.latest = stats
+            self.stop_event.wait(self.interval)
+
+def format_metrics_table(daemon_stats=None):
+    """Render the metrics snapshot as fixed-width text for the Diagnostics window"""
+    lines = [f"{'Metric':<52}{'Count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'Max':>10}"]
+    for name, labels, kind, values in metrics.snapshot():
+        label_text = ",".join(f"{key}={value}" for key, value in labels.items())
+        title = f"{name}{{{label_text}}}" if label_text else name
+        if kind == "histogram":
+            # Durations are shown in milliseconds, everything else as recorded
+            scale, unit = (1000, "ms") if name.endswith("_seconds") else (1, "")
+            cells = "".join(f"{values[key] * scale:>8.1f}{unit:<2}" for key in ("p50", "p95", "p99", "max"))
+            lines.append(f"{title:<52}{values['count']:>8}{cells}")
+        else:
+            lines.append(f"{title:<52}{values['value']:>8}")
+
+    totals = translator.usage_totals
+    if totals["entries"]:
+        lines.append("")
+        lines.append("Gemini tokens: {} entries, {:.1f} in / {:.1f} out per entry, {:.2f}s average".format(
+            totals["entries"],
+            totals["prompt_tokens"] / totals["entries"],
+            totals["output_tokens"] / totals["entries"],
+            totals["seconds"] / totals["entries"],
+        ))
+
+    if translator.router is not None:
+        lines.append("")
+        lines.append("Routing (rolling window, hedge after min(p90, 3x p50)):")
+        for name, stats in translator.router.stats().items():
+            if stats["p50"] is None:
+                lines.append(f"  {name}: {stats['samples']} samples, warming up")
+            else:
+                lines.append(f"  {name}: {stats['samples']} samples, p50 {stats['p50'] * 1000:.0f}ms, p95 {stats['p95'] * 1000:.0f}ms, hedge after {stats['hedge_delay'] * 1000:.0f}ms")
+
+    if daemon_stats:
+        lines.append("")
+        lines.append("Logging daemon: " + ", ".join(f"{key}={value}" for key, value in daemon_stats.items()))
+    return "\n".join(lines)
+
+def show_diagnostics():
+    diag_window = tk.Toplevel(root)
+    diag_window.title("Diagnostics - Gemini Workload Logger")
+    diag_window.geometry("800x400")
+
+    diag_text = tk.Text(diag_window, wrap=tk.NONE, font=("TkFixedFont", 9), borderwidth=0)
+    diag_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+
+    # A daemon round trip can take up to its timeout; keep it off the Tk thread and show the last answer
+    daemon_stats = DaemonStatsPoller().start()
+    diag_window.bind("<Destroy>", lambda event: daemon_stats.stop() if event.widget is diag_window else None)
+
+    def refresh():
+        if not diag_window.winfo_exists():
+            return
+        diag_text.config(state=tk.NORMAL)
+        diag_text.delete("1.0", tk.END)
+        diag_text.insert(tk.END, format_metrics_table(daemon_stats.latest))
+        diag_text.config(state=tk.DISABLED)
+        diag_window.after(1000, refresh)
+
+    def write_file():
+        path = filedialog.asksaveasfilename(parent=diag_window, defaultextension=".prom", filetypes=[("Prometheus text", "*.prom"), ("All files", "*.*")])
+        if path:
+            try:
+                metrics.write_prometheus_file(path)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error writing metrics: {e}", parent=diag_window)
+
+    button_frame = tk.Frame(diag_window)
+    button_frame.pack(pady=10)
+    tk.Button(button_frame, text="Write Prometheus File...", command=write_file).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Reset", command=metrics.reset).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Close", command=diag_window.destroy).pack(side=tk.LEFT, padx=5)
+    refresh()
+
+def write_metrics_file_periodically():
+    try:
+        metrics.write_prometheus_file(METRICS_FILE)
+    except Exception as e:
+        print(f"Error writing metrics file: {e}")
+    root.after(METRICS_FILE_INTERVAL, write_metrics_file_periodically)
+
+def start_metrics_exporters():
+    """Start the optional Prometheus file writer and localhost endpoint"""
+    metrics.gauge("compression_queue_depth", function=log_rotation.pending_compressions)
+    metrics.gauge("export_entries", function=lambda: export_job.exported if export_job is not None else 0)
+    if METRICS_FILE:
+        write_metrics_file_periodically()
+    if METRICS_PORT:
+        try:
+            metrics.start_http_server(int(METRICS_PORT))
+        except Exception as e:
+            print(f"Error starting metrics endpoint: {e}")
+
+# --- Stall Watchdog and Profiler ---
+STALL_THRESHOLD = float(os.getenv("GEMINI_LOGGER_STALL_THRESHOLD", "0.5"))  # seconds
+stall_monitor = None
+profiler = None
+
+def start_stall_watchdog():
+    global stall_monitor
+    stall_monitor = stall_watchdog.StallWatchdog(root, STALL_LOG_FILE, threshold=STALL_THRESHOLD).start()
+
+def toggle_profiler():
+    """Start sampling the main thread, or stop and save a flame-graph-compatible dump"""
+    global profiler
+    if is_profiling.get():
+        profiler = stall_watchdog.SamplingProfiler().start()
+        update_status("Profiling main thread...")
+        return
+    if profiler is None:
+        return
+    profiler.stop()
+    elapsed = time.monotonic() - profiler.started
+    default_name = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+    path = filedialog.asksaveasfilename(initialdir=CACHE_DIR, initialfile=default_name, defaultextension=".folded",
+                                        filetypes=[("Folded stacks", "*.folded"), ("All files", "*.*")])
+    if path:
+        try:
+            stacks = profiler.write_folded(path)
+            update_status(f"Saved {profiler.samples} samples ({stacks} stacks, {elapsed:.0f}s) to {os.path.basename(path)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving profile: {e}")
+    else:
+        update_status("Profile discarded")
+    profiler = None
+
+def view_stall_log():
+    if not os.path.exists(STALL_LOG_FILE):
+        messagebox.showinfo("Stall Log", "No stalls have been recorded.")
+        return
+    log_window = tk.Toplevel(root)
+    log_window.title("Stall Log")
+    log_window.geometry("700x400")
+    stall_text = tk.Text(log_window, wrap=tk.NONE, font=("TkFixedFont", 9), borderwidth=0)
+    with open(STALL_LOG_FILE, "r") as f:
+        stall_text.insert(tk.END, f.read())
+    stall_text.see(tk.END)
+    stall_text.config(state=tk.DISABLED)
+    stall_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+# --- Theme Handling ---
+def load_previous_theme():
+    if os.path.exists(THEME_FILE):
+        try:
+            with open(THEME_FILE, "r") as f:
+                cache_data = json.load(f)
+                return cache_data.get("previous_theme", "Windows 11 Blue")
+        except (json.JSONDecodeError, KeyError):
+             return "Windows 11 Blue"
+    return "Windows 11 Blue"
+
+def save_previous_theme(theme_name):
+     try:
+         with open(THEME_FILE, "w") as f:
+            json.dump({"previous_theme": theme_name}, f)
+     except Exception as e:
+          messagebox.showerror("Error", f"Error saving theme to cache: {e}")
+
+def apply_theme(theme_name, animate=False, previous_theme=None):
+    """Apply the selected theme to all UI elements with optional animation"""
+    global current_theme
+    
+    # If animation is requested and we know the previous theme
+    if animate and previous_theme and previous_theme != theme_name:
+        animate_theme_transition(previous_theme, theme_name)
+        return
+    
+    previous_theme = current_theme
+    current_theme = theme_name
+    
+    # Update each UI element with the new theme colors
+    update_ui_colors(theme_name)
+    
+    # Save the theme preference
+    save_previous_theme(theme_name)
+
+def update_ui_colors(theme_name):
+    """Update all UI elements with colors from the specified theme"""
+    # Main window
+    root.configure(bg=themes[theme_name]["bg_color"])
+    
+    # Frames
+    input_frame.config(bg=themes[theme_name]["frame_bg"])
+    file_frame.config(bg=themes[theme_name]["frame_bg"])
+    dark_mode_frame.config(bg=themes[theme_name]["frame_bg"])
+    log_frame.config(bg=themes[theme_name]["bg_color"])
+    
+    # Labels and text
+    file_label.config(bg=themes[theme_name]["frame_bg"], fg=themes[theme_name]["text_color"])
+    for tab in tabs:
+        apply_tab_colors(tab, theme_name)
+    dark_mode_toggle.config(bg=themes[theme_name]["frame_bg"], fg=themes[theme_name]["text_color"],
+                          activebackground=themes[theme_name]["frame_bg"], 
+                          activeforeground=themes[theme_name]["text_color"],
+                          selectcolor=themes[theme_name].get("accent", themes[theme_name]["button_hover"]))
+    
+    # Input elements
+    text_entry.config(bg=themes[theme_name]["entry_bg"], fg=themes[theme_name]["entry_fg"], 
+                     insertbackground=themes[theme_name]["entry_fg"])
+    
+    # Buttons
+    buttons = [update_button, save_file_button, change_file_button, clear_button]
+    for button in buttons:
+        button.config(bg=themes[theme_name]["button_bg"], fg=themes[theme_name]["button_fg"])
+        button.bind("<Enter>", on_button_enter)
+        button.bind("<Leave>", on_button_leave)
+
+def create_theme_menu(menu_bar):
+    theme_menu = tk.Menu(menu_bar, tearoff=0)
+    for theme_name in themes:
+        theme_menu.add_command(label=theme_name, command=lambda name=theme_name: apply_theme(name))
+    menu_bar.add_cascade(label="Theme", menu=theme_menu)
+
+# --- Color Checker Utility ---
+def hex_to_rgb(hex_color):
+    """Convert hex color string to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def calculate_luminance(rgb):
+    """Calculate relative luminance of an RGB color"""
+    # Convert RGB values to sRGB
+    r, g, b = [x/255 for x in rgb]
+    
+    # Adjust values
+    r = r / 12.92 if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
+    g = g / 12.92 if g <= 0.03928 else ((g + 0.055) / 1.055) ** 2.4
+    b = b / 12.92 if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
+    
+    # Calculate luminance
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+def calculate_contrast_ratio(color1, color2):
+    """Calculate contrast ratio between two colors"""
+    lum1 = calculate_luminance(hex_to_rgb(color1))
+    lum2 = calculate_luminance(hex_to_rgb(color2))
+    
+    # Ensure the lighter color is first
+    lighter = max(lum1, lum2)
+    darker = min(lum1, lum2)
+    
+    # Calculate contrast ratio
+    return (lighter + 0.05) / (darker + 0.05)
+
+def verify_contrast_wcag_aa(color1, color2):
+    """Verify if two colors meet WCAG AA contrast ratio of 4.5:1"""
+    ratio = calculate_contrast_ratio(color1, color2)
+    return ratio >= 4.5, ratio
+
+def check_theme_contrast(theme_colors):
+    """Verify contrast ratios for a theme palette"""
+    results = []
+    
+    # Check text on backgrounds
+    text_bg_pairs = [
+        ("text_color", "bg_color", "Text on background"),
+        ("text_color", "frame_bg", "Text on frame"),
+        ("button_fg", "button_bg", "Button text on button"),
+        ("entry_fg", "entry_bg", "Entry text on entry background")
+    ]
+    
+    for fg_key, bg_key, description in text_bg_pairs:
+        passes, ratio = verify_contrast_wcag_aa(
+            theme_colors[fg_key], 
+            theme_colors[bg_key]
+        )
+        results.append({
+            "description": description,
+            "passes": passes,
+            "ratio": ratio,
+            "fg_color": theme_colors[fg_key],
+            "bg_color": theme_colors[bg_key]
+        })
+    
+    return results
+
+# Define a close handler
+def on_close():
+    """Handle window close event properly"""
+    if messagebox.askokcancel("Quit", "Do you want to quit?"):
+        cancel_filter()
+        if instance_server is not None:
+            instance_server.close()  # Later launches start their own window again
+        if sink_pipeline is not None:
+            sink_pipeline.close()  # Give queued entries a moment to reach their sinks
+        root.destroy()
+
+def copy_selected_text():
+    if log_display.tag_ranges(tk.SEL):
+        selected_text = log_display.get(tk.SEL_FIRST, tk.SEL_LAST)
+        root.clipboard_clear()
+        root.clipboard_append(selected_text)
+
+def paste_to_entry():
+    try:
+        text = root.clipboard_get()
+        text_entry.insert(tk.INSERT, text)
+    except Exception as e:
+        print(f"Error pasting text: {e}")
+
+def show_about_dialog():
+    about_window = tk.Toplevel(root)
+    about_window.title("About Gemini Workload Logger")
+    about_window.geometry("400x300")
+    about_window.resizable(False, False)
+    about_window.transient(root)
+    about_window.grab_set()
+    
+    # Icon
+    try:
+        about_window.iconphoto(False, root.iconphoto_get())
+    except:
+        pass
+        
+    # Content frame
+    content_frame = tk.Frame(about_window, padx=20, pady=20)
+    content_frame.pack(fill=tk.BOTH, expand=True)
+    
+    # App title
+    title_label = tk.Label(content_frame, text="Gemini Workload Logger", font=("TkDefaultFont", 16, "bold"))
+    title_label.pack(pady=(0, 10))
+    
+    # Version
+    version_label = tk.Label(content_frame, text=f"Version {APP_VERSION}")
+    version_label.pack(pady=(0, 20))
+    
+    # Description
+    desc_label = tk.Label(content_frame, text="A simple logging tool that uses Gemini to\nconvert text to console-style log entries.", 
+                      justify=tk.CENTER)
+    desc_label.pack(pady=(0, 20))
+    
+    # Copyright
+    copyright_label = tk.Label(content_frame, text="© 2023")
+    copyright_label.pack(pady=(0, 20))
+    
+    # Close button
+    close_button = tk.Button(content_frame, text="Close", command=about_window.destroy)
+    close_button.pack(pady=10)
+
+def show_help():
+    help_window = tk.Toplevel(root)
+    help_window.title("Help - Gemini Workload Logger")
+    help_window.geometry("500x400")
+    help_window.transient(root)
+    help_window.grab_set()
+    
+    # Content frame
+    content_frame = tk.Frame(help_window, padx=20, pady=20)
+    content_frame.pack(fill=tk.BOTH, expand=True)
+    
+    # Help text
+    help_text = tk.Text(content_frame, wrap=tk.WORD, borderwidth=0)
+    help_text.pack(fill=tk.BOTH, expand=True)
+    
+    help_content = """
+Gemini Workload Logger - Help
+
+Basic Usage:
+------------
+1. Type text in the input field and press Enter or click 'Update Log'
+2. The text will be converted to a console-style format using Gemini AI
+3. The formatted text will be saved to the current log file
+
+File Operations:
+---------------
+- Open: Open an existing log file in a new tab (or switch to its tab)
+- Close Tab: Close the current log's tab
+- Save: Save the current log
+- Save As: Save the log to a new file
+- Follow File: Show lines appended to the file by other programs as they arrive
+- Rotation: Roll the log over daily and/or past 10 MB; old segments are gzipped
+  in the background and still shown by View
+- Export: Write the log, optionally filtered by date, tag or text, to JSON Lines,
+  CSV, Markdown or HTML in the background
+- Exit: Close the application
+
+Keyboard Shortcuts:
+-----------------
+- Ctrl+O: Open file
+- Ctrl+S: Save file
+- Ctrl+W: Close tab
+- Ctrl+Tab: Next tab
+- Ctrl+C: Copy selected text
+- Ctrl+V: Paste text
+- Ctrl+L: Clear input field
+- Ctrl+F: Filter log
+- Ctrl+Shift+F: Find similar entries
+- Ctrl+Q: Quit application
+
+Tools:
+-----
+- Speculative Translation: Start translating once you pause typing, so
+  pressing Enter on unchanged text logs it almost instantly
+- Summarize Workload: Summarize the last week, month, year or the whole log.
+  Chunk summaries are cached, so re-running only summarizes what changed
+- Filter Log (Ctrl+F): List every line matching a regular expression in
+  the current log and its rotated segments; double-click a line to show it
+- Find Similar (Ctrl+Shift+F): List past entries resembling the selected
+  text, the input field, or the line at the cursor, found offline
+- Sampling Profiler: Sample the UI thread until unchecked, then save a
+  flame-graph-compatible (folded stacks) profile
+- View Stall Log: Stacks captured whenever the UI froze for longer than
+  half a second
+
+Themes:
+------
+Select a theme from the Theme menu to change the application appearance.
+Toggle Dark Mode using the checkbox in the top-right corner.
+"""
+    
+    help_text.insert(tk.END, help_content)
+    help_text.config(state=tk.DISABLED)
+    
+    # Scrollbar
+    scrollbar = tk.Scrollbar(help_text)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    help_text.config(yscrollcommand=scrollbar.set)
+    scrollbar.config(command=help_text.yview)
+    
+    # Close button
+    close_button = tk.Button(content_frame, text="Close", command=help_window.destroy)
+    close_button.pack(pady=10)
+
+def update_status(message):
+    """Update status bar message"""
+    status_label.config(text=message)
+    root.update_idletasks()
+
+def update_file_status():
+    """Update file status in status bar"""
+    if file_path:
+        file_status_label.config(text=f"File: {os.path.basename(file_path)}")
+    else:
+        file_status_label.config(text="No file")
+
+def test_dark_mode_toggle():
+    """Test function to verify dark mode toggle works across platforms"""
+    # Create a test window
+    test_window = tk.Toplevel(root)
+    test_window.title("Dark Mode Toggle Test")
+    test_window.geometry("500x500")
+    
+    # Get system information
+    system_info = f"OS: {platform.system()} {platform.version()}\n"
+    system_info += f"Python: {sys.version}\n"
+    system_info += f"Tkinter: {tk.TkVersion}\n"
+    
+    # Create info frame
+    info_frame = tk.Frame(test_window)
+    info_frame.pack(fill=tk.X, padx=10, pady=10)
+    
+    info_label = tk.Label(info_frame, text=system_info, justify=tk.LEFT)
+    info_label.pack(anchor=tk.W)
+    
+    # Create test controls
+    control_frame = tk.Frame(test_window)
+    control_frame.pack(fill=tk.X, padx=10, pady=10)
+    
+    # Toggle states
+    toggle_var = tk.BooleanVar()
+    
+    def update_sample_ui():
+        theme = "Dark" if toggle_var.get() else "Windows 11 Blue"
+        # Update test UI with theme colors
+        sample_frame.config(bg=themes[theme]["bg_color"])
+        sample_label.config(bg=themes[theme]["frame_bg"], fg=themes[theme]["text_color"])
+        sample_button.config(bg=themes[theme]["button_bg"], fg=themes[theme]["button_fg"])
+        sample_entry.config(bg=themes[theme]["entry_bg"], fg=themes[theme]["entry_fg"])
+        sample_check.config(bg=themes[theme]["bg_color"], fg=themes[theme]["text_color"],
+                         selectcolor=themes[theme].get("accent", themes[theme]["button_hover"]))
+        results_text.config(bg=themes[theme]["bg_color"], fg=themes[theme]["text_color"])
+    
+    toggle = tk.Checkbutton(control_frame, text="Dark Mode", variable=toggle_var, 
+                         command=update_sample_ui)
+    toggle.pack(side=tk.LEFT, padx=5)
+    
+    # Create sample UI elements to test
+    sample_frame = tk.Frame(test_window, bg=themes["Windows 11 Blue"]["bg_color"], padx=10, pady=10)
+    sample_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    
+    sample_label = tk.Label(sample_frame, text="Sample Text", 
+                         bg=themes["Windows 11 Blue"]["frame_bg"], 
+                         fg=themes["Windows 11 Blue"]["text_color"])
+    sample_label.pack(anchor=tk.W, pady=5)
+    
+    sample_entry = tk.Entry(sample_frame, 
+                         bg=themes["Windows 11 Blue"]["entry_bg"], 
+                         fg=themes["Windows 11 Blue"]["entry_fg"])
+    sample_entry.insert(0, "Sample Entry Text")
+    sample_entry.pack(fill=tk.X, pady=5)
+    
+    sample_button = tk.Button(sample_frame, text="Sample Button", 
+                           bg=themes["Windows 11 Blue"]["button_bg"], 
+                           fg=themes["Windows 11 Blue"]["button_fg"])
+    sample_button.pack(pady=5)
+    
+    sample_check = tk.Checkbutton(sample_frame, text="Sample Checkbox", 
+                               bg=themes["Windows 11 Blue"]["bg_color"], 
+                               fg=themes["Windows 11 Blue"]["text_color"])
+    sample_check.pack(anchor=tk.W, pady=5)
+    
+    # Results area
+    results_text = tk.Text(sample_frame, height=10, width=50, 
+                        bg=themes["Windows 11 Blue"]["bg_color"], 
+                        fg=themes["Windows 11 Blue"]["text_color"])
+    results_text.pack(fill=tk.BOTH, expand=True, pady=5)
+    
+    # Check contrast ratios
+    def check_contrast():
+        theme = "Dark" if toggle_var.get() else "Windows 11 Blue"
+        results = check_theme_contrast(themes[theme])
+        
+        results_text.delete(1.0, tk.END)
+        results_text.insert(tk.END, f"Contrast Ratio Results for {theme} theme:\n\n")
+        
+        for result in results:
+            status = "✓ PASS" if result["passes"] else "✗ FAIL"
+            results_text.insert(tk.END, f"{status} {result['description']}: {result['ratio']:.2f}:1\n")
+            results_text.insert(tk.END, f"  FG: {result['fg_color']} on BG: {result['bg_color']}\n\n")
+    
+    check_button = tk.Button(control_frame, text="Check Contrast Ratios", command=check_contrast)
+    check_button.pack(side=tk.LEFT, padx=5)
+    
+    # System detection
+    def test_system_detection():
+        is_dark = detect_system_dark_mode()
+        messagebox.showinfo("System Theme Detection", 
+                         f"System Dark Mode Detected: {is_dark}\n"
+                         f"This reflects your current system setting.")
+    
+    system_button = tk.Button(control_frame, text="Test System Detection", command=test_system_detection)
+    system_button.pack(side=tk.LEFT, padx=5)
+
+# Bind keyboard shortcuts
+def setup_keyboard_shortcuts():
+    """Setup keyboard shortcuts for common actions"""
+    # File operations
+    root.bind("<Control-o>", lambda event: file_menu_open())
+    root.bind("<Control-s>", lambda event: file_menu_save())
+    root.bind("<Control-w>", lambda event: close_tab())
+    root.bind("<Control-q>", lambda event: on_close())
+    
+    # Edit operations
+    root.bind("<Control-c>", lambda event: copy_selected_text())
+    root.bind("<Control-v>", lambda event: paste_to_entry())
+    
+    # Clear
+    root.bind("<Control-l>", lambda event: clear_text_entry())
+
+    # Search
+    root.bind("<Control-f>", lambda event: show_filter_pane())
+    root.bind("<Control-F>", lambda event: find_similar())
+
+
+def run(args, server=None):
+    """Build the main window and run it until it closes.
+
+    args is the parsed command line (single_instance.parse_launch_args) and
+    server the InstanceServer that later launches are forwarded to, if any.
+    """
+    global launch_args, instance_server, sink_pipeline
+    global root, menu_bar, is_following, rotation_choice, file_menu, tools_menu, is_profiling
+    global is_speculating, is_dark_mode, current_theme, dark_mode_frame, dark_mode_toggle
+    global input_frame, text_entry, update_button, clear_button, file_frame, file_label
+    global save_file_button, change_file_button, log_frame, log_notebook, status_label
+    global file_status_label
+    launch_args = args
+    instance_server = server
+
+    # Check if the API key is set (a replayed cassette or HTTP endpoints alone are enough offline)
+    if not translator.GOOGLE_API_KEY and not translator.ENDPOINTS and not translator.replaying():
+        print("Error: GOOGLE_API_KEY not set in .env file.")
+        return 1
+
+    # Configure Gemini API; translation falls back to a simple format if this fails
+    translator.init_gemini()
+    sink_pipeline = load_sink_pipeline()
+
+    # Verify the dark theme meets contrast requirements
+    dark_theme_contrast = check_theme_contrast(themes["Dark"])
+    for result in dark_theme_contrast:
+        if not result["passes"]:
+            print(f"Warning: {result['description']} fails WCAG AA contrast with ratio {result['ratio']:.2f}")
+
+    # --- GUI Setup ---
+    metrics.instrument_tk(tk)  # Must come before any widget registers a callback
+    root = tk.Tk()
+    root.title("Gemini Workload Logger")
+    root.geometry("600x400")
+    root.configure(borderwidth=0)
+
+    # Set the close handler
+    root.protocol("WM_DELETE_WINDOW", on_close)
+
+    # Create menu bar
+    menu_bar = tk.Menu(root)
+    root.config(menu=menu_bar)
+
+    # Follow Mode and Rotation State Variables
+    is_following = tk.BooleanVar(value=False)
+    rotation_choice = tk.StringVar(value=load_rotation_choice())
+
+    # File menu
+    file_menu = tk.Menu(menu_bar, tearoff=0)
+    file_menu.add_command(label="Open", command=file_menu_open)
+    file_menu.add_command(label="Close Tab", command=close_tab)
+    file_menu.add_command(label="Save", command=file_menu_save)
+    file_menu.add_command(label="View", command=file_menu_view)
+    file_menu.add_checkbutton(label="Follow File", variable=is_following, command=toggle_follow)
+    rotation_menu = tk.Menu(file_menu, tearoff=0)
+    for choice in ROTATION_CHOICES:
+        rotation_menu.add_radiobutton(label=choice, value=choice, variable=rotation_choice, command=apply_rotation_choice)
+    file_menu.add_cascade(label="Rotation", menu=rotation_menu)
+    file_menu.add_separator()
+    file_menu.add_command(label="Export...", command=show_export_dialog)
+    file_menu.add_command(label="Cancel Export", command=cancel_export, state=tk.DISABLED)
+    file_menu.add_separator()
+    file_menu.add_command(label="Exit", command=on_close)
+    menu_bar.add_cascade(label="File", menu=file_menu)
+
+    # Edit menu
+    edit_menu = tk.Menu(menu_bar, tearoff=0)
+
+    edit_menu.add_command(label="Copy", command=copy_selected_text)
+    edit_menu.add_command(label="Paste", command=paste_to_entry)
+    menu_bar.add_cascade(label="Edit", menu=edit_menu)
+
+    # Add theme menu
+    create_theme_menu(menu_bar)
+
+    # Tools menu
+    is_profiling = tk.BooleanVar(value=False)
+    is_speculating = tk.BooleanVar(value=load_speculation_preference())
+    tools_menu = tk.Menu(menu_bar, tearoff=0)
+    tools_menu.add_checkbutton(label="Speculative Translation", variable=is_speculating, command=toggle_speculation)
+    tools_menu.add_command(label="Summarize Workload...", command=show_summary_dialog)
+    tools_menu.add_command(label="Cancel Summary", command=cancel_summary, state=tk.DISABLED)
+    tools_menu.add_command(label="Filter Log...", command=show_filter_pane)
+    tools_menu.add_command(label="Find Similar", command=find_similar)
+    tools_menu.add_separator()
+    tools_menu.add_checkbutton(label="Sampling Profiler", variable=is_profiling, command=toggle_profiler)
+    tools_menu.add_command(label="View Stall Log", command=view_stall_log)
+    menu_bar.add_cascade(label="Tools", menu=tools_menu)
+
+    # Help menu
+    help_menu = tk.Menu(menu_bar, tearoff=0)
+
+    help_menu.add_command(label="Help Topics", command=show_help)
+    help_menu.add_command(label="Diagnostics", command=show_diagnostics)
+    help_menu.add_separator()
+    help_menu.add_command(label="About", command=show_about_dialog)
+    menu_bar.add_cascade(label="Help", menu=help_menu)
+
+    # Dark Mode State Variable (moved here after root is created)
+    is_dark_mode = tk.BooleanVar()
+
+    # Set Icon
+    try:
+        icon_path = os.path.join(os.path.dirname(__file__), "geminiicon.png")
+        if os.path.exists(icon_path):
+            icon = tk.PhotoImage(file=icon_path)
+            root.iconphoto(False, icon)
+        else:
+            # Create a simple fallback icon
+            fallback_icon = tk.PhotoImage(width=64, height=64)
+            for y in range(64):
+                for x in range(64):
+                    # Create a simple gradient icon
+                    r = int(255 * (x / 64))
+                    g = int(255 * (y / 64))
+                    b = 150
+                    color = f'#{r:02x}{g:02x}{b:02x}'
+                    fallback_icon.put(color, (x, y))
+            root.iconphoto(False, fallback_icon)
+    except Exception as e:
+        print(f"Error loading icon: {e}")
+
+    # Load previous theme
+    current_theme = load_previous_theme()
+
+    # Dark Mode Toggle Frame (positioned at the top right)
+    dark_mode_frame = tk.Frame(root, borderwidth=0)
+    dark_mode_frame.pack(anchor=tk.NE, padx=10, pady=10)
+
+    # Set dark mode based on saved preference or system setting
+    system_dark_mode = detect_system_dark_mode()
+    saved_preference = load_dark_mode_preference()
+    # First check saved preference, if none exists, use system setting
+    is_dark_mode.set(saved_preference if saved_preference is not None else system_dark_mode)
+
+    # Dark Mode Toggle with updated event handling
+    dark_mode_toggle = tk.Checkbutton(
+        dark_mode_frame, 
+        text="Dark Mode", 
+        variable=is_dark_mode,
+        command=toggle_dark_mode,
+        borderwidth=0
+    )
+    dark_mode_toggle.pack(side=tk.RIGHT)
+
+    # Input Frame
+    input_frame = tk.Frame(root, borderwidth=0)
+    input_frame.pack(pady=10, padx=10, fill=tk.X)
+
+    text_entry = tk.Entry(input_frame, width=40, borderwidth=0)
+    text_entry.pack(side=tk.LEFT, padx=5)
+    text_entry.bind("<Return>", on_enter_key)
+    text_entry.bind("<KeyRelease>", on_entry_key_release)
+
+    update_button = tk.Button(input_frame, text="Update Log", borderwidth=0)
+    update_button.pack(side=tk.LEFT, padx=5)
+    update_button.bind("<Enter>", on_button_enter)
+    update_button.bind("<Leave>", on_button_leave)
+    update_button.config(command=update_log)
+
+    clear_button = tk.Button(input_frame, text="Clear", borderwidth=0)
+    clear_button.pack(side=tk.LEFT, padx=5)
+    clear_button.bind("<Enter>", on_button_enter)
+    clear_button.bind("<Leave>", on_button_leave)
+    clear_button.config(command=clear_text_entry)
+
+    # File Frame
+    file_frame = tk.Frame(root, borderwidth=0)
+    file_frame.pack(pady=10, padx=10, fill=tk.X)
+
+    file_label = tk.Label(file_frame, text="Current File: None", borderwidth=0)
+    file_label.pack(side=tk.LEFT, expand=True, fill=tk.X)
+
+    save_file_button = tk.Button(file_frame, text="Save as File", borderwidth=0)
+    save_file_button.pack(side=tk.LEFT, padx=5)
+    save_file_button.bind("<Enter>", on_button_enter)
+    save_file_button.bind("<Leave>", on_button_leave)
+    save_file_button.config(command=save_as_file)
+
+    change_file_button = tk.Button(file_frame, text="Change File", borderwidth=0)
+    change_file_button.pack(side=tk.LEFT, padx=5)
+    change_file_button.bind("<Enter>", on_button_enter)
+    change_file_button.bind("<Leave>", on_button_leave)
+    change_file_button.config(command=change_file)
+
+    # Log Display
+    log_frame = tk.Frame(root, borderwidth=0)
+    log_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+
+    # One tab per open log; the globals log_display, scrollbar, log_highlighter,
+    # file_path and follow_tail always refer to the selected tab (see activate_tab)
+    log_notebook = ttk.Notebook(log_frame)
+    log_notebook.pack(fill=tk.BOTH, expand=True)
+    log_notebook.enable_traversal()  # Ctrl+Tab / Ctrl+Shift+Tab switch tabs
+    log_notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+    create_tab(None)
+
+    # Status bar
+    status_bar = tk.Frame(root, borderwidth=1, relief=tk.SUNKEN)
+    status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+
+    status_label = tk.Label(status_bar, text="Ready", anchor=tk.W, padx=5, pady=2)
+    status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    file_status_label = tk.Label(status_bar, text="No file", anchor=tk.E, padx=5, pady=2)
+    file_status_label.pack(side=tk.RIGHT)
+
+    activate_tab(tabs[0])  # Needs the status bar
+
+    # Apply the correct theme based on initial dark mode setting
+    if is_dark_mode.get():
+        apply_theme("Dark")
+    else:
+        apply_theme("Windows 11 Blue")
+
+    # Open the files named on the command line, otherwise offer the previous file
+    for path in launch_args.files:
+        try:
+            open_log_tab(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading file contents: {e}")
+    previous_file = None if launch_args.files else load_previous_file()
+    if previous_file and messagebox.askyesno("Load Previous", f"Load previously opened file '{os.path.basename(previous_file)}'?"):
+        try:
+            open_log_tab(previous_file)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading file contents: {e}")
+        # The other tabs from last time start evicted, so only the selected file is read now
+        for path in load_previous_tabs():
+            if os.path.exists(path) and find_tab(path) is None:
+                create_tab(path).resident = False
+        save_previous_file(file_path)
+
+    # Set focus to text_entry (only once)
+    text_entry.focus_set()
+
+    if instance_server is not None:
+        root.after(INSTANCE_POLL_INTERVAL, poll_instance_requests)
+
+    # Disable test mode for now
+    # root.after(1000, test_dark_mode_toggle)
+    setup_keyboard_shortcuts()
+    start_metrics_exporters()
+    start_stall_watchdog()
+    root.mainloop()
+    return 0
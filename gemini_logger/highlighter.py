@@ -0,0 +1,173 @@
+"""Incremental syntax highlighting for console-style entries in a Tk Text widget.
+
+The tokenizer recognizes console.log/info/warn/debug/error calls, string
+literals, new Error(...), the [Log] fallback prefix and Markdown code
+fences. Every rule is confined to one line, so any line can be highlighted
+without looking at the ones before it.
+
+Highlighter never tags the whole buffer. It tags newly inserted lines (only
+the visible part of a bulk insert such as opening a file) and whatever
+scrolls into view, skipping lines it has already tagged. Tokenizing runs on a
+worker thread; the Tk thread only reads line text and applies the finished
+tags in one tag_add call per tag.
+"""
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+TAGS = ("hl_method", "hl_error", "hl_string", "hl_log", "hl_fence")
+
+_FENCE = re.compile(r"^\s*```.*$")
+_LOG_PREFIX = re.compile(r"^\s*\[Log\]")
+_METHOD = re.compile(r"\bconsole\.(log|info|warn|debug|error)\b")
+_NEW_ERROR = re.compile(r"\bnew\s+\w*Error\b")
+# Closed literals only, and never opened right after a letter: an apostrophe in prose ("didn't") isn't a string
+_STRING = re.compile(r'(?<!\w)(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`(?:[^`\\]|\\.)*`)')
+
+MAX_INSERT_LINES = 200  # Bulk inserts larger than this only get their visible lines tagged
+VIEW_MARGIN = 20  # Lines above and below the viewport tagged ahead of scrolling
+
+
+def tokenize_line(line):
+    """Return [(start, end, tag)] character spans for one line"""
+    if _FENCE.match(line):
+        return [(0, len(line), "hl_fence")]
+    spans = []
+    match = _LOG_PREFIX.match(line)
+    if match:
+        spans.append((match.start(), match.end(), "hl_log"))
+    for match in _METHOD.finditer(line):
+        tag = "hl_error" if match.group(1) == "error" else "hl_method"
+        spans.append((match.start(), match.end(), tag))
+    for match in _NEW_ERROR.finditer(line):
+        spans.append((match.start(), match.end(), "hl_error"))
+    for match in _STRING.finditer(line):
+        spans.append((match.start(), match.end(), "hl_string"))
+    return spans
+
+
+def tokenize_lines(first_line, lines):
+    """Tokenize consecutive lines; returns [(line_number, text, spans)] for lines with spans"""
+    results = []
+    for offset, line in enumerate(lines):
+        spans = tokenize_line(line)
+        if spans:
+            results.append((first_line + offset, line, spans))
+    return results
+
+
+class Highlighter:
+    def __init__(self, widget, colors=None):
+        self.widget = widget
+        self.tagged = set()  # Line numbers already tagged in the current buffer
+        self.generation = 0  # Bumped whenever the buffer is replaced; older results are dropped
+        self.results = queue.Queue()
+        self.pending = 0
+        self.poll_job = None
+        self.view_job = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="highlighter")
+        for tag in TAGS:
+            widget.tag_configure(tag)
+        widget.tag_raise("sel")
+        if colors:
+            self.apply_colors(colors)
+
+    def apply_colors(self, colors):
+        """Take tag colors from a theme palette (keys named like the tags)"""
+        for tag in TAGS:
+            if tag in colors:
+                self.widget.tag_configure(tag, foreground=colors[tag])
+
+    # --- Buffer changes ---
+    def reset(self):
+        """Call after the buffer was cleared or replaced"""
+        self.generation += 1
+        self.tagged.clear()
+        self.schedule_viewport()
+
+    def inserted(self, start, end):
+        """Call after inserting text between the indices `start` and `end`"""
+        first = int(self.widget.index(start).split(".")[0])
+        last = int(self.widget.index(end).split(".")[0])
+        for line in range(first, last + 1):
+            self.tagged.discard(line)
+        if last - first + 1 > MAX_INSERT_LINES:
+            self.schedule_viewport()
+        else:
+            self._submit(first, last)
+
+    def edited(self, index="insert"):
+        """Re-tag the line at `index` after the user typed in it"""
+        line = int(self.widget.index(index).split(".")[0])
+        for tag in TAGS:
+            self.widget.tag_remove(tag, f"{line}.0", f"{line}.end")
+        self.tagged.discard(line)
+        self._submit(line, line)
+
+    # --- Viewport ---
+    def schedule_viewport(self, delay=30):
+        """Tag the visible lines shortly; repeated calls while scrolling coalesce"""
+        if self.view_job is None:
+            self.view_job = self.widget.after(delay, self._tag_viewport)
+
+    def _tag_viewport(self):
+        self.view_job = None
+        first = int(self.widget.index("@0,0").split(".")[0])
+        last = int(self.widget.index(f"@0,{self.widget.winfo_height()}").split(".")[0])
+        end_line = int(self.widget.index("end-1c").split(".")[0])
+        first = max(1, first - VIEW_MARGIN)
+        last = min(end_line, last + VIEW_MARGIN)
+        # Submit only the runs of lines that still need tags
+        run_start = None
+        for line in range(first, last + 2):
+            needs_tags = line <= last and line not in self.tagged
+            if needs_tags and run_start is None:
+                run_start = line
+            elif not needs_tags and run_start is not None:
+                self._submit(run_start, line - 1)
+                run_start = None
+
+    # --- Worker ---
+    def _submit(self, first, last):
+        for line in range(first, last + 1):
+            self.tagged.add(line)
+        lines = self.widget.get(f"{first}.0", f"{last}.end").split("\n")
+        self.pending += 1
+        self.executor.submit(self._work, self.generation, first, lines)
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(10, self._apply_results)
+
+    def _work(self, generation, first, lines):
+        try:
+            self.results.put((generation, tokenize_lines(first, lines)))
+        except Exception as e:
+            print(f"Error highlighting: {e}")
+            self.results.put((generation, []))
+
+    def _apply_results(self):
+        """Apply finished tokenizations on the Tk thread, one tag_add call per tag"""
+        self.poll_job = None
+        ranges = {tag: [] for tag in TAGS}
+        while True:
+            try:
+                generation, results = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if generation != self.generation:
+                continue
+            for line, text, spans in results:
+                # The line may have changed since it was read; it gets re-tagged when seen again
+                if self.widget.get(f"{line}.0", f"{line}.end") != text:
+                    self.tagged.discard(line)
+                    continue
+                for start, end, tag in spans:
+                    ranges[tag].extend((f"{line}.{start}", f"{line}.{end}"))
+        for tag, indices in ranges.items():
+            if indices:
+                self.widget.tag_add(tag, *indices)
+        if self.pending > 0:
+            self.poll_job = self.widget.after(10, self._apply_results)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,537 @@
+"""Local logging daemon that owns the log files and group-commits appends.
+
+GUI and CLI clients send newline-delimited JSON requests over a Unix domain
+socket (localhost TCP where AF_UNIX is unavailable). A single writer thread
+drains every pending append, writes each file once per batch, fsyncs it and
+only then acknowledges the clients, so concurrent writers never interleave
+and share the cost of each flush.
+
+Each connection starts by sending the token the daemon writes, readable by
+the owner only, next to its socket; other local users (and, on the TCP
+fallback, any local process) can't reach the files through it. Appends go
+only to the paths given with --allow or, without any, to .txt/.log/.md files
+outside hidden directories.
+
+Run it with:  python -m gemini_logger.log_daemon [--socket PATH] [--allow PATH ...]
+"""
+import argparse
+import hmac
+import json
+import locale
+import os
+import queue
+import secrets
+import select
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from . import log_rotation
+from . import metrics
+
+DAEMON_DIR = os.path.join(os.path.expanduser("~"), ".gemini-workload-logger")
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+DEFAULT_TCP_ADDRESS = ("127.0.0.1", 47831)
+ENCODING = locale.getpreferredencoding(False)  # Same encoding the GUI writes with
+MAX_BATCH = 4096  # Upper bound on appends committed by one fsync
+MAX_OPEN_FILES = 64
+LOG_EXTENSIONS = (".txt", ".log", ".md")  # Appendable by default when no --allow paths are given
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports a failed request"""
+
+
+class DaemonRefused(DaemonError):
+    """Raised when the daemon rejects the client's token or won't write to the path"""
+
+
+class DaemonTimeout(DaemonError):
+    """Raised when the daemon didn't answer in time; the entries may or may not be written"""
+
+
+class DaemonDisconnected(DaemonTimeout):
+    """Raised when the connection dropped after the entries were sent; they may or may not be written"""
+
+
+def default_address():
+    """Return the socket path (or TCP address) clients and the daemon agree on"""
+    override = os.getenv("GEMINI_LOGGER_SOCKET")
+    if HAS_UNIX_SOCKETS:
+        return override or os.path.join(DAEMON_DIR, "daemon.sock")
+    if override:
+        host, _, port = override.rpartition(":")
+        return (host or "127.0.0.1", int(port))
+    return DEFAULT_TCP_ADDRESS
+
+
+def connect(address, timeout=None):
+    """Open a client connection to a Unix socket path or a (host, port) tuple"""
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def token_path(address):
+    """Return the file holding the token for the daemon at `address`"""
+    if isinstance(address, str):
+        return address + ".token"
+    return os.path.join(DAEMON_DIR, f"daemon-{address[1]}.token")
+
+
+def write_token(address):
+    """Create a fresh token that only the current user can read"""
+    path = token_path(address)
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+    if os.path.exists(path):
+        os.unlink(path)  # So the mode below applies to a new file
+    token = secrets.token_hex(32)
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+        f.write(token)
+    return token
+
+
+def read_token(address):
+    with open(token_path(address), "r") as f:
+        return f.read().strip()
+
+
+def allowed_paths(paths=None):
+    """Resolve --allow paths (or GEMINI_LOGGER_ALLOW, os.pathsep-separated) to real paths"""
+    if paths is None:
+        paths = [path for path in os.getenv("GEMINI_LOGGER_ALLOW", "").split(os.pathsep) if path]
+    return [os.path.realpath(path) for path in paths]
+
+
+def path_allowed(path, allowed):
+    """Check a client-sent path against the allowed logs (symlinks resolved)"""
+    if not isinstance(path, str) or not os.path.isabs(path):
+        return False
+    path = os.path.realpath(path)
+    if allowed:
+        return any(path == entry or path.startswith(entry.rstrip(os.sep) + os.sep) for entry in allowed)
+    # Nothing configured: log-like files only, never dotfiles such as ~/.bashrc or ~/.ssh/*
+    if any(part.startswith(".") for part in path.split(os.sep) if part):
+        return False
+    return os.path.splitext(path)[1].lower() in LOG_EXTENSIONS
+
+
+def is_listening(address):
+    """Check whether something accepts connections at the address"""
+    try:
+        connect(address, timeout=0.5).close()
+        return True
+    except OSError:
+        return False
+
+
+# --- Group Commit Writer ---
+class _Append:
+    __slots__ = ("path", "data", "policy", "future")
+
+    def __init__(self, path, data, policy):
+        self.path = path
+        self.data = data
+        self.policy = policy
+        self.future = Future()
+
+
+class CommitWriter:
+    """Serialize appends on one thread and flush each batch with a single fsync per file"""
+
+    def __init__(self, durable=True):
+        self.durable = durable
+        self.pending = queue.Queue()
+        self.files = OrderedDict()  # path -> open binary append handle, in LRU order
+        self.stats = {"appends": 0, "batches": 0, "bytes": 0, "largest_batch": 0}
+        self.thread = threading.Thread(target=self._run, name="commit-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, path, text, policy=None):
+        """Queue one entry for appending and return a Future resolving to its end offset"""
+        data = (text + "\n").replace("\n", os.linesep).encode(ENCODING, errors="replace")
+        item = _Append(os.path.abspath(path), data, policy)
+        self.pending.put(item)
+        return item.future
+
+    def close(self):
+        """Commit everything already queued, then close the files"""
+        self.pending.put(None)
+        self.thread.join()
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            # Everything that queued up while the previous batch was syncing goes out together
+            batch = [item]
+            stop = False
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        started = time.perf_counter()
+        by_path = OrderedDict()
+        for item in batch:
+            by_path.setdefault(item.path, []).append(item)
+
+        for path, items in by_path.items():
+            data = b"".join(item.data for item in items)
+            try:
+                # The daemon owns the file handles, so it is also the one that rotates
+                if log_rotation.should_rotate(path, items[-1].policy, len(data)):
+                    self._close(path)
+                    log_rotation.rotate(path)
+                if log_rotation.needs_day_marker(path):
+                    data = (log_rotation.day_marker() + os.linesep).encode(ENCODING) + data
+                f = self._open(path)
+                f.write(data)
+                f.flush()
+                if self.durable:
+                    os.fsync(f.fileno())
+                offset = f.tell()
+            except Exception as e:
+                print(f"Error writing {path}: {e}")
+                self._close(path)
+                for item in items:
+                    item.future.set_exception(DaemonError(str(e)))
+                continue
+            for item in items:
+                item.future.set_result(offset)
+
+        self.stats["appends"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["bytes"] += sum(len(item.data) for item in batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        metrics.histogram("daemon_batch_size", buckets=metrics.SIZE_BUCKETS).observe(len(batch))
+        metrics.histogram("daemon_commit_seconds").observe(time.perf_counter() - started)
+
+    def _open(self, path):
+        f = self.files.get(path)
+        if f is not None:
+            self.files.move_to_end(path)
+            return f
+        f = open(path, "ab")
+        self.files[path] = f
+        if len(self.files) > MAX_OPEN_FILES:
+            _, oldest = self.files.popitem(last=False)
+            oldest.close()
+        return f
+
+    def _close(self, path):
+        f = self.files.pop(path, None)
+        if f is not None:
+            try:
+                f.close()
+            except OSError:
+                pass
+
+
+# --- Socket Server ---
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def authenticate(self):
+        """The first request on a connection has to be {"op": "auth", "token": ...}"""
+        try:
+            request = json.loads(self.rfile.readline())
+            token = request.get("token") if request.get("op") == "auth" else None
+        except (ValueError, AttributeError):
+            token = None
+        ok = isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.server.token.encode("utf-8"))
+        reply = {"ok": True} if ok else {"ok": False, "refused": True, "error": "Bad or missing token"}
+        try:
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            self.wfile.flush()
+        except OSError:
+            return False
+        return ok
+
+    def handle(self):
+        if not self.authenticate():
+            return
+        writer = self.server.writer
+        replies = queue.Queue()
+
+        # Replies go out from a per-connection thread, in request order, so a slow
+        # client never holds up the commit writer and one client can pipeline many appends
+        def send_replies():
+            while True:
+                reply = replies.get()
+                if reply is None:
+                    return
+                if isinstance(reply, tuple):
+                    request_id, future = reply
+                    try:
+                        reply = {"id": request_id, "ok": True, "offset": future.result()}
+                    except Exception as e:
+                        reply = {"id": request_id, "ok": False, "error": str(e)}
+                try:
+                    self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except OSError:
+                    pass  # Client went away; its entries are still committed
+
+        sender = threading.Thread(target=send_replies, daemon=True)
+        sender.start()
+        try:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    request_id = request.get("id")
+                except (ValueError, AttributeError) as e:
+                    replies.put({"ok": False, "error": f"Bad request: {e}"})
+                    continue
+                if op == "append":
+                    path = request.get("path")
+                    text = request.get("text")
+                    if not path_allowed(path, self.server.allowed):
+                        replies.put({"id": request_id, "ok": False, "refused": True, "error": f"Not an allowed log: {path}"})
+                        continue
+                    if not isinstance(text, str):
+                        replies.put({"id": request_id, "ok": False, "error": "Bad request: text must be a string"})
+                        continue
+                    try:
+                        policy = log_rotation.RotationPolicy.from_dict(request.get("rotation"))
+                    except (TypeError, ValueError, AttributeError) as e:
+                        replies.put({"id": request_id, "ok": False, "error": f"Bad rotation policy: {e}"})
+                        continue
+                    replies.put((request_id, writer.submit(path, text, policy)))
+                elif op == "ping":
+                    replies.put({"id": request_id, "ok": True, "pid": os.getpid()})
+                elif op == "stats":
+                    replies.put({"id": request_id, "ok": True, "stats": dict(writer.stats)})
+                else:
+                    replies.put({"id": request_id, "ok": False, "error": f"Unknown op: {op}"})
+        finally:
+            replies.put(None)  # Whatever ended the connection, let the reply thread finish
+            sender.join()
+
+
+if HAS_UNIX_SOCKETS:
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+def serve(address=None, durable=True, metrics_port=None, allow=None):
+    """Run the daemon until interrupted; `allow` lists the log files or directories it may append to"""
+    address = address or default_address()
+    if is_listening(address):
+        print(f"Error: a logging daemon is already running at {address}")
+        return 1
+
+    if isinstance(address, str):
+        os.makedirs(os.path.dirname(address) or ".", exist_ok=True)
+        if os.path.exists(address):
+            os.unlink(address)  # Stale socket left by a daemon that did not shut down cleanly
+        server = _UnixServer(address, _RequestHandler)
+        os.chmod(address, 0o600)
+    else:
+        server = _TCPServer(address, _RequestHandler)
+    server.token = write_token(address)
+    server.allowed = allowed_paths(allow)
+    server.writer = CommitWriter(durable=durable)
+    metrics.gauge("daemon_queue_depth", function=server.writer.pending.qsize)
+    if metrics_port:
+        metrics.start_http_server(metrics_port)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Logging daemon listening on {address}, appending to {', '.join(server.allowed) or 'log files outside hidden directories'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.writer.close()
+        log_rotation.wait_for_compression()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+        if os.path.exists(token_path(address)):
+            os.unlink(token_path(address))
+        print(f"Logging daemon stopped: {server.writer.stats}")
+    return 0
+
+
+# --- Client ---
+class DaemonClient:
+    """Blocking client for a running daemon; one connection, reused across calls"""
+
+    def __init__(self, address=None, timeout=30.0):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def _dropped(self):
+        """True if the daemon closed this connection, e.g. because it was restarted"""
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            return bool(readable) and not self.sock.recv(1, socket.MSG_PEEK)
+        except (OSError, ValueError):
+            return True
+
+    def _ensure_connected(self):
+        if self.sock is not None and self._dropped():
+            self.close()
+        if self.sock is None:
+            token = read_token(self.address)
+            self.sock = connect(self.address, timeout=self.timeout)
+            self.reader = self.sock.makefile("rb")
+            self.sock.sendall((json.dumps({"op": "auth", "token": token}) + "\n").encode("utf-8"))
+            line = self.reader.readline()
+            if not line:
+                raise ConnectionError("Logging daemon closed the connection")
+            if not json.loads(line).get("ok"):
+                raise DaemonRefused("Logging daemon rejected the token")
+
+    def _exchange(self, requests):
+        """Send requests and wait for their replies.
+
+        A connection the daemon closed (it was restarted) is reopened first.
+        Failures before the requests go out raise as they are, so the caller
+        can write the entries itself. Once sending starts the daemon may
+        already have committed them: a timeout or a dropped connection then
+        raises DaemonTimeout (or DaemonDisconnected) instead.
+        """
+        with self.lock:
+            try:
+                self._ensure_connected()
+            except (OSError, ValueError, DaemonRefused):
+                self.close()
+                raise
+            ids = []
+            for request in requests:
+                self.next_id += 1
+                request["id"] = self.next_id
+                ids.append(self.next_id)
+            try:
+                self.sock.sendall(b"".join((json.dumps(r) + "\n").encode("utf-8") for r in requests))
+                responses = {}
+                while len(responses) < len(ids):
+                    line = self.reader.readline()
+                    if not line:
+                        raise ConnectionError("Logging daemon closed the connection")
+                    response = json.loads(line)
+                    responses[response.get("id")] = response
+            except socket.timeout:
+                self.close()
+                raise DaemonTimeout(f"No reply from the logging daemon within {self.timeout:g}s")
+            except (OSError, ValueError) as e:
+                self.close()
+                raise DaemonDisconnected(f"Lost the logging daemon before it replied: {e}")
+        results = [responses[i] for i in ids]
+        for response in results:
+            if not response.get("ok"):
+                error = DaemonRefused if response.get("refused") else DaemonError
+                raise error(response.get("error", "unknown error"))
+        return results
+
+    def append(self, path, text, policy=None):
+        """Append one entry and return the file offset once it is on disk"""
+        return self.append_many(path, [text], policy)[0]
+
+    def append_many(self, path, texts, policy=None):
+        """Pipeline several entries in one round trip"""
+        path = os.path.abspath(path)
+        rotation = policy.to_dict() if policy is not None else None
+        requests = [{"op": "append", "path": path, "text": t, "rotation": rotation} for t in texts]
+        return [r["offset"] for r in self._exchange(requests)]
+
+    def ping(self):
+        return self._exchange([{"op": "ping"}])[0]
+
+    def stats(self):
+        return self._exchange([{"op": "stats"}])[0]["stats"]
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.reader.close()
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.reader = None
+
+
+_shared_client = None
+
+
+def try_append(path, text, policy=None):
+    """Append through the daemon if one is running; return False so the caller can write directly.
+
+    A stale connection (the daemon was restarted) is reopened once first.
+    Raises DaemonTimeout when the daemon took the entry but didn't confirm it,
+    because it didn't reply in time or the connection dropped: it is most
+    likely written, so the caller must not write it again.
+    """
+    global _shared_client
+    address = default_address()
+    if isinstance(address, str) and not os.path.exists(address):
+        return False
+    if _shared_client is None:
+        _shared_client = DaemonClient(address)
+    try:
+        _shared_client.append(path, text, policy)
+    except (OSError, DaemonRefused):
+        _shared_client.close()  # Never sent: no daemon, or it wouldn't take the entry
+        return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local daemon that serializes appends to workload logs")
+    parser.add_argument("--socket", help="Unix socket path (or host:port without AF_UNIX)")
+    parser.add_argument("--no-fsync", action="store_true", help="Acknowledge after flush instead of fsync")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on 127.0.0.1 at this port")
+    parser.add_argument("--allow", action="append", metavar="PATH",
+                        help="Log file or directory clients may append to (repeatable; default: .txt/.log/.md files outside hidden directories)")
+    args = parser.parse_args(argv)
+    address = args.socket
+    if address and not HAS_UNIX_SOCKETS:
+        host, _, port = address.rpartition(":")
+        address = (host or "127.0.0.1", int(port))
+    return serve(address, durable=not args.no_fsync, metrics_port=args.metrics_port, allow=args.allow)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
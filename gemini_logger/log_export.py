@@ -0,0 +1,273 @@
+"""Streaming export of workload logs to JSON Lines, CSV, Markdown and HTML.
+
+The export is a generator pipeline:
+
+    read_entries()  ->  filter_entries()  ->  FORMATS[fmt]()  ->  write_chunks()
+
+Every stage handles one entry at a time, so memory use stays flat whatever
+the size of the log and its rotated segments. ExportJob runs the pipeline on
+a background thread and can be cancelled between entries.
+"""
+import csv
+import datetime
+import html
+import io
+import json
+import os
+import re
+import threading
+
+from . import log_rotation
+
+CHUNK_SIZE = 64 * 1024  # Characters buffered before each write to the output
+DATE_PATTERN = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+TAG_PATTERN = re.compile(r"(?<![\w#])#([A-Za-z][\w-]*)")
+FENCE = "```"
+
+FORMATS = {}  # name -> function turning entries into text chunks, filled in below
+EXTENSIONS = {".jsonl": "jsonl", ".json": "jsonl", ".csv": "csv", ".md": "markdown", ".markdown": "markdown", ".html": "html", ".htm": "html"}
+
+
+class ExportCancelled(Exception):
+    """Raised inside the pipeline when the export was cancelled"""
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD string (or pass through a date/None)"""
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def format_for_path(path, default="jsonl"):
+    """Pick an export format from the output file extension"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+# --- Source ---
+def _make_entry(index, source, lines, fallback_date, dated):
+    text = "".join(lines).rstrip("\n")
+    match = None if dated else DATE_PATTERN.search(text)
+    entry_date = fallback_date
+    if match:
+        try:
+            entry_date = datetime.date(*(int(part) for part in match.groups()))
+            dated = True
+        except ValueError:
+            pass
+    return {
+        "index": index,
+        "date": entry_date.isoformat(),
+        "dated": dated,
+        "source": os.path.basename(source),
+        "tags": TAG_PATTERN.findall(text),
+        "text": text,
+    }
+
+
+def group_lines(lines):
+    """Yield each entry's lines: one non-blank line, or a whole Markdown code fence"""
+    fenced = []
+    for line in lines:
+        if fenced:
+            fenced.append(line)
+            if line.strip().startswith(FENCE):
+                yield fenced
+                fenced = []
+        elif line.strip().startswith(FENCE):
+            fenced = [line]
+        elif line.strip():
+            yield [line]
+    if fenced:  # Unterminated fence at the end of a file
+        yield fenced
+
+
+def _until_cancelled(lines, cancel):
+    for line in lines:
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+        yield line
+
+
+def read_entries(path, include_segments=True, cancel=None):
+    """Yield log entries oldest first.
+
+    An entry is one non-blank line, or a whole Markdown code fence as Gemini
+    often wraps multi-line output in one. Its date is the day marker written
+    before it, else the rotation time of its segment, else the first
+    YYYY-MM-DD in its text; a date the text merely mentions doesn't move an
+    entry out of the day it was logged. Entries with none of those (the
+    active file's from before day markers) get the file's mtime and
+    "dated": False, as that moves with every append.
+    """
+    index = 0
+    for source in log_rotation.log_sources(path, include_segments):
+        stamp = log_rotation.segment_stamp(source)
+        fallback_date = stamp.date() if stamp is not None else None
+        modified = log_rotation.segment_time(source).date()
+        for lines in group_lines(_until_cancelled(log_rotation.iter_source_lines(source), cancel)):
+            marker = log_rotation.parse_day_marker(lines[0]) if len(lines) == 1 else None
+            if marker is not None:
+                fallback_date = marker
+                continue
+            index += 1
+            yield _make_entry(index, source, lines, fallback_date or modified, fallback_date is not None)
+
+
+def filter_entries(entries, since=None, until=None, tags=None, search=None):
+    """Keep entries within [since, until] that carry all the given tags and contain the search text.
+
+    Undated entries are left out of date ranges, since their date is only a guess.
+    """
+    since = parse_date(since)
+    until = parse_date(until)
+    wanted_tags = {tag.lstrip("#").lower() for tag in tags or []}
+    pattern = re.compile(re.escape(search), re.IGNORECASE) if search else None
+    for entry in entries:
+        entry_date = parse_date(entry["date"])
+        if (since or until) and not entry.get("dated", True):
+            continue
+        if since and entry_date < since:
+            continue
+        if until and entry_date > until:
+            continue
+        if wanted_tags and not wanted_tags <= {tag.lower() for tag in entry["tags"]}:
+            continue
+        if pattern and not pattern.search(entry["text"]):
+            continue
+        yield entry
+
+
+# --- Formats ---
+def to_jsonl(entries):
+    for entry in entries:
+        yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+def to_csv(entries):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["index", "date", "source", "tags", "text"])
+    for entry in entries:
+        writer.writerow([entry["index"], entry["date"], entry["source"], " ".join(entry["tags"]), entry["text"]])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()  # Header only, when nothing matched
+
+
+def to_markdown(entries):
+    yield "# Workload Log\n"
+    current_date = None
+    for entry in entries:
+        if entry["date"] != current_date:
+            current_date = entry["date"]
+            yield f"\n## {current_date}\n\n"
+        text = entry["text"]
+        if text.startswith(FENCE):
+            yield text + "\n\n"
+        else:
+            yield f"- {text}\n"
+
+
+def to_html(entries):
+    yield (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>Workload Log</title>\n"
+        "<style>body{font-family:sans-serif}td{vertical-align:top;padding:2px 8px}"
+        "pre{margin:0;white-space:pre-wrap}</style>\n</head>\n<body>\n<table>\n"
+        "<tr><th>#</th><th>Date</th><th>Tags</th><th>Entry</th></tr>\n"
+    )
+    for entry in entries:
+        yield "<tr><td>{}</td><td>{}</td><td>{}</td><td><pre>{}</pre></td></tr>\n".format(
+            entry["index"], entry["date"], html.escape(" ".join(entry["tags"])), html.escape(entry["text"])
+        )
+    yield "</table>\n</body>\n</html>\n"
+
+
+FORMATS.update({"jsonl": to_jsonl, "csv": to_csv, "markdown": to_markdown, "html": to_html})
+
+
+# --- Sink ---
+def write_chunks(chunks, f, chunk_size=CHUNK_SIZE):
+    """Write text chunks through a fixed-size buffer"""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= chunk_size:
+            f.write("".join(buffer))
+            buffer = []
+            buffered = 0
+    if buffer:
+        f.write("".join(buffer))
+
+
+def export_log(path, output, fmt=None, since=None, until=None, tags=None, search=None,
+               include_segments=True, cancel=None, progress=None):
+    """Export a log to `output` and return the number of entries written.
+
+    The output only appears once the export is complete; a cancelled or failed
+    export leaves no partial file behind.
+    """
+    fmt = fmt or format_for_path(output)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    counted = {"entries": 0}
+
+    def count(entries):
+        for entry in entries:
+            counted["entries"] += 1
+            if progress is not None:
+                progress(counted["entries"])
+            yield entry
+
+    entries = count(filter_entries(read_entries(path, include_segments, cancel), since, until, tags, search))
+    temp = output + ".part"
+    try:
+        # CSV needs newline="" so the csv module controls line endings itself
+        with open(temp, "w", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+            write_chunks(FORMATS[fmt](entries), f)
+        os.replace(temp, output)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    return counted["entries"]
+
+
+class ExportJob:
+    """Run export_log on a background thread; poll `done` and `exported`, call cancel() to stop"""
+
+    def __init__(self, path, output, **options):
+        self.path = path
+        self.output = output
+        self.options = options
+        self.exported = 0
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="log-export", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def _progress(self, count):
+        self.exported = count
+
+    def _run(self):
+        try:
+            self.result = export_log(self.path, self.output, cancel=self.cancel_event, progress=self._progress, **self.options)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
@@ -0,0 +1,262 @@
+"""Parallel regex filter over large logs and their rotated segments.
+
+Each plain file is split into chunks of about CHUNK_SIZE bytes. A chunk owns
+every line that starts inside it, so no line is split or scanned twice.
+Worker processes memory-map the file, copy out just their chunk and scan it
+with a bytes regex. Compressed segments can't be mapped and are scanned as one task that
+streams the decompressed data. Results come back in file order, with line
+numbers, while later chunks are still being scanned.
+
+The GUI doesn't host the process pool itself: FilterProcess runs this module
+as a script and reads its JSON Lines output. That keeps spawn-based platforms
+from re-running the GUI script in every worker and makes cancelling a
+terminate() away.
+
+    python -m gemini_logger.log_filter 'console\\.error' worklog.txt -i
+"""
+import argparse
+import gzip
+import json
+import mmap
+import os
+import queue
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from . import log_rotation
+
+CHUNK_SIZE = 8 * 1024 * 1024
+GZIP_BLOCK = 4 * 1024 * 1024  # Decompressed bytes read at a time from a .gz segment
+
+_patterns = {}  # Compiled patterns, per worker process
+
+
+class FilterCancelled(Exception):
+    """Raised when a scan was cancelled"""
+
+
+def _compile(pattern, ignore_case):
+    key = (pattern, ignore_case)
+    compiled = _patterns.get(key)
+    if compiled is None:
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        compiled = _patterns[key] = re.compile(pattern.encode(log_rotation.ENCODING), flags)
+    return compiled
+
+
+def plan_tasks(path, include_segments=True, chunk_size=CHUNK_SIZE):
+    """Return [(source, start, end)] in file order; end is None for a whole compressed segment"""
+    tasks = []
+    for source in log_rotation.log_sources(path, include_segments):
+        if source.endswith(".gz"):
+            tasks.append((source, 0, None))
+            continue
+        size = os.path.getsize(source)
+        for start in range(0, size, chunk_size):
+            tasks.append((source, start, min(start + chunk_size, size)))
+    return tasks
+
+
+def _scan_bytes(data, begin, stop, regex):
+    """Return (newlines in data[begin:stop], [(line index, line text)]) with one hit per line"""
+    hits = []
+    counted_to = begin
+    line_index = 0
+    position = begin
+    while position < stop:
+        match = regex.search(data, position, stop)
+        if match is None:
+            break
+        if match.start() == stop and (stop == begin or data[stop - 1:stop] == b"\n"):
+            break  # ^ and $ also match at endpos, after the chunk's last line
+        line_start = data.rfind(b"\n", begin, match.start()) + 1 or begin
+        line_end = data.find(b"\n", match.start(), stop)
+        if line_end == -1:
+            line_end = stop
+        line_index += data.count(b"\n", counted_to, line_start)
+        counted_to = line_start
+        hits.append((line_index, data[line_start:line_end].rstrip(b"\r").decode(log_rotation.ENCODING, errors="replace")))
+        position = line_end + 1
+    newlines = line_index + data.count(b"\n", counted_to, stop)
+    return newlines, hits
+
+
+def _scan_plain(source, start, end, regex):
+    with open(source, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = min(end, size)
+            # Lines belong to the chunk they start in
+            begin = 0 if start == 0 else data.find(b"\n", start - 1, end) + 1
+            if begin == 0 and start != 0:
+                return 0, []  # No line starts inside this chunk
+            stop = data.find(b"\n", end - 1) + 1 if end < size else size
+            if stop == 0:
+                stop = size
+            # Copy out only this chunk; mmap has no count() before Python 3.13
+            chunk = data[begin:stop]
+    return _scan_bytes(chunk, 0, len(chunk), regex)
+
+
+def _scan_gzip(source, regex):
+    newlines = 0
+    hits = []
+    carry = b""
+    with gzip.open(source, "rb") as f:
+        while True:
+            block = f.read(GZIP_BLOCK)
+            data = carry + block
+            if not block:
+                cut = len(data)
+            else:
+                cut = data.rfind(b"\n") + 1
+            if cut:
+                block_newlines, block_hits = _scan_bytes(data, 0, cut, regex)
+                hits.extend((newlines + index, text) for index, text in block_hits)
+                newlines += block_newlines
+            carry = data[cut:]
+            if not block:
+                return newlines, hits
+
+
+def scan_task(task, pattern, ignore_case=False):
+    """Scan one task in a worker; returns (newline count, [(line index within task, text)])"""
+    source, start, end = task
+    regex = _compile(pattern, ignore_case)
+    if end is None:
+        return _scan_gzip(source, regex)
+    return _scan_plain(source, start, end, regex)
+
+
+def scan(path, pattern, ignore_case=False, include_segments=True, jobs=None, chunk_size=CHUNK_SIZE, cancel=None):
+    """Yield {"source", "line", "text"} for every matching line, in file order"""
+    _compile(pattern, ignore_case)  # Raise re.error here rather than in every worker
+    tasks = plan_tasks(path, include_segments, chunk_size)
+    jobs = jobs or os.cpu_count() or 1
+    window = jobs * 2  # Tasks in flight; bounds memory held by finished, not yet yielded chunks
+    line_base = {}  # source -> lines before the next chunk to yield
+    executor = ProcessPoolExecutor(max_workers=min(jobs, max(1, len(tasks))))
+    futures = []
+    try:
+        next_task = 0
+        while next_task < len(tasks) or futures:
+            while next_task < len(tasks) and len(futures) < window:
+                futures.append((tasks[next_task], executor.submit(scan_task, tasks[next_task], pattern, ignore_case)))
+                next_task += 1
+            task, future = futures.pop(0)
+            while True:
+                if cancel is not None and cancel.is_set():
+                    raise FilterCancelled()
+                try:
+                    newlines, hits = future.result(timeout=0.1)
+                    break
+                except TimeoutError:
+                    continue
+            source = task[0]
+            base = line_base.get(source, 0)
+            for index, text in hits:
+                yield {"source": source, "line": base + index + 1, "text": text}
+            line_base[source] = base + newlines
+    finally:
+        for _, future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class FilterProcess:
+    """Run a scan in a child process; hits arrive on `results`, poll `done`, call cancel() to stop"""
+
+    def __init__(self, path, pattern, ignore_case=False, include_segments=True, jobs=None):
+        self.path = path
+        self.pattern = pattern
+        self.results = queue.Queue()
+        self.count = 0
+        self.error = None
+        self.cancelled = False
+        self.started = time.perf_counter()
+        self.elapsed = None
+        command = [sys.executable, "-m", "gemini_logger.log_filter", pattern, path, "--jsonl"]
+        if ignore_case:
+            command.append("-i")
+        if not include_segments:
+            command.append("--active-only")
+        if jobs:
+            command += ["--jobs", str(jobs)]
+        # Its own process group on POSIX, so cancel() reaches the pool workers too; left
+        # running they would keep stdout open and the reader would never see EOF
+        # The package may be running from a checkout rather than installed
+        package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_parent, os.getenv("PYTHONPATH")])))
+        self.process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, start_new_session=os.name == "posix")
+        self.thread = threading.Thread(target=self._read, name="log-filter", daemon=True)
+        self.thread.start()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self.results.put(json.loads(line))
+            self.count += 1
+        self.process.wait()
+        self.elapsed = time.perf_counter() - self.started
+        if self.process.returncode != 0 and not self.cancelled:
+            message = self.process.stderr.read().decode(errors="replace").strip().splitlines()
+            self.error = message[-1] if message else f"exit status {self.process.returncode}"
+
+    def cancel(self):
+        if self.process.poll() is None:
+            self.cancelled = True
+            if os.name == "posix":
+                os.killpg(self.process.pid, signal.SIGTERM)
+            else:
+                self.process.terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the lines of a log (and its rotated segments) matching a regex")
+    parser.add_argument("pattern", help="Python regular expression")
+    parser.add_argument("log", help="Log file to search")
+    parser.add_argument("-i", "--ignore-case", action="store_true", help="Case-insensitive match")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--active-only", action="store_true", help="Skip rotated segments")
+    parser.add_argument("--jsonl", action="store_true", help="Write one JSON object per hit")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    count = 0
+    try:
+        for hit in scan(args.log, args.pattern, args.ignore_case, not args.active_only, args.jobs):
+            if args.jsonl:
+                sys.stdout.write(json.dumps(hit, ensure_ascii=False) + "\n")
+                sys.stdout.flush()  # The GUI shows hits as they arrive
+            else:
+                sys.stdout.write(f"{os.path.basename(hit['source'])}:{hit['line']}:{hit['text']}\n")
+            count += 1
+    except re.error as e:
+        print(f"Error: invalid pattern: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # The reader went away (| head); don't let the final flush complain about it
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    print(f"{count} matching lines in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Size/time-based rotation of log files with background gzip compression.
+
+A log file such as worklog.txt rolls over to segments named
+worklog.20261019-181500.txt (stamped with the time of their last write),
+which a background thread then compresses to worklog.20261019-181500.txt.gz.
+Readers use iter_log_lines()/read_all() to see the segments and the active
+file as one continuous log.
+"""
+import datetime
+import gzip
+import locale
+import os
+import queue
+import re
+import shutil
+import threading
+
+SEGMENT_STAMP = "%Y%m%d-%H%M%S"
+ENCODING = locale.getpreferredencoding(False)  # Same encoding the GUI writes with
+
+DAY_MARKER_PREFIX = "// "
+DAY_MARKER_PATTERN = re.compile(r"^// (\d{4}-\d{2}-\d{2})\s*$")
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+
+class RotationPolicy:
+    """When the active log file should roll over: past max_bytes, on a new day, or both"""
+
+    def __init__(self, max_bytes=None, daily=False):
+        self.max_bytes = max_bytes
+        self.daily = daily
+
+    @property
+    def enabled(self):
+        return bool(self.max_bytes) or self.daily
+
+    def to_dict(self):
+        return {"max_bytes": self.max_bytes, "daily": self.daily}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        return cls(max_bytes=data.get("max_bytes"), daily=bool(data.get("daily")))
+
+    def __repr__(self):
+        return f"RotationPolicy(max_bytes={self.max_bytes!r}, daily={self.daily!r})"
+
+
+def _split(path):
+    directory, name = os.path.split(os.path.abspath(path))
+    stem, ext = os.path.splitext(name)
+    return directory, stem, ext
+
+
+def _segment_regex(path):
+    _, stem, ext = _split(path)
+    return re.compile(r"^%s\.(\d{8}-\d{6})(?:-(\d+))?%s(\.gz)?$" % (re.escape(stem), re.escape(ext)))
+
+
+def should_rotate(path, policy, incoming=0):
+    """Check whether appending `incoming` more bytes should first roll the file over"""
+    if policy is None or not policy.enabled:
+        return False
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size == 0:
+        return False
+    if policy.max_bytes and stat.st_size + incoming > policy.max_bytes:
+        return True
+    if policy.daily and datetime.date.fromtimestamp(stat.st_mtime) != datetime.date.today():
+        return True
+    return False
+
+
+def rotate(path, compress=True):
+    """Rename the active file to a timestamped segment and queue it for compression"""
+    directory, stem, ext = _split(path)
+    stamp = datetime.datetime.fromtimestamp(os.stat(path).st_mtime).strftime(SEGMENT_STAMP)
+    segment = os.path.join(directory, f"{stem}.{stamp}{ext}")
+    counter = 1
+    while os.path.exists(segment) or os.path.exists(segment + ".gz"):
+        segment = os.path.join(directory, f"{stem}.{stamp}-{counter}{ext}")
+        counter += 1
+    os.replace(path, segment)
+    if compress:
+        compress_in_background(segment)
+    return segment
+
+
+def rotate_if_needed(path, policy, incoming=0):
+    """Rotate before an append when the policy calls for it; return the new segment or None"""
+    if should_rotate(path, policy, incoming):
+        return rotate(path)
+    return None
+
+
+def list_segments(path):
+    """Return the rotated segments of a log, oldest first"""
+    directory, _, _ = _split(path)
+    pattern = _segment_regex(path)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+
+    found = {}
+    for name in names:
+        match = pattern.match(name)
+        if not match:
+            continue
+        key = (match.group(1), int(match.group(2) or 0))
+        # While compression finishes both copies exist briefly; the plain one is complete
+        if key not in found or not match.group(3):
+            found[key] = os.path.join(directory, name)
+    return [found[key] for key in sorted(found)]
+
+
+def open_segment(segment, mode="rt"):
+    """Open a plain or gzip-compressed segment for reading"""
+    if segment.endswith(".gz"):
+        if "b" in mode:
+            return gzip.open(segment, mode)
+        return gzip.open(segment, mode, encoding=ENCODING, errors="replace")
+    if "b" in mode:
+        return open(segment, mode)
+    return open(segment, mode, encoding=ENCODING, errors="replace")
+
+
+def log_sources(path, include_segments=True):
+    """Return the files that make up a log: rotated segments oldest first, then the active file"""
+    sources = list_segments(path) if include_segments else []
+    if os.path.exists(path):
+        sources.append(path)
+    return sources
+
+
+def segment_stamp(segment):
+    """Return the rotation time in a segment's name, or None for the active file"""
+    match = re.search(r"\.(\d{8}-\d{6})(?:-\d+)?\.[^.]*(?:\.gz)?$", os.path.basename(segment))
+    if match:
+        return datetime.datetime.strptime(match.group(1), SEGMENT_STAMP)
+    return None
+
+
+def segment_time(segment):
+    """Return when a segment was last written, from its name or else its mtime"""
+    stamp = segment_stamp(segment)
+    if stamp is not None:
+        return stamp
+    try:
+        return datetime.datetime.fromtimestamp(os.stat(segment).st_mtime)
+    except OSError:
+        return datetime.datetime.now()
+
+
+def day_marker(day=None):
+    """The line written before the first entry of each day, so entries keep the date they were logged"""
+    return DAY_MARKER_PREFIX + (day or datetime.date.today()).isoformat()
+
+
+def parse_day_marker(line):
+    """Return the date of a day marker line, or None for any other line"""
+    match = DAY_MARKER_PATTERN.match(line)
+    if match is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(match.group(1))
+    except ValueError:
+        return None
+
+
+def needs_day_marker(path):
+    """Check whether the next append is the first to `path` today (by its last write)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return True
+    return stat.st_size == 0 or datetime.date.fromtimestamp(stat.st_mtime) != datetime.date.today()
+
+
+def iter_source_lines(source):
+    """Yield the lines of one segment or active file"""
+    try:
+        with open_segment(source) as f:
+            for line in f:
+                yield line
+    except FileNotFoundError:
+        # Compressed and removed between listing and opening
+        if not os.path.exists(source + ".gz"):
+            raise
+        with open_segment(source + ".gz") as f:
+            for line in f:
+                yield line
+
+
+def iter_log_lines(path, include_segments=True):
+    """Yield every line of a log, oldest rotated segment first and the active file last"""
+    for source in log_sources(path, include_segments):
+        for line in iter_source_lines(source):
+            yield line
+
+
+def read_all(path, include_segments=True):
+    """Return the whole log, including rotated segments, as one string"""
+    return "".join(iter_log_lines(path, include_segments))
+
+
+# --- Background Compression ---
+_compress_queue = queue.Queue()
+_compress_thread = None
+_compress_lock = threading.Lock()
+_queued = set()
+
+
+def _compress(segment):
+    temp = segment + ".gz.tmp"
+    with open(segment, "rb") as source, gzip.open(temp, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    os.replace(temp, segment + ".gz")
+    os.remove(segment)
+
+
+def _compress_worker():
+    while True:
+        segment = _compress_queue.get()
+        try:
+            if os.path.exists(segment):
+                _compress(segment)
+        except Exception as e:
+            print(f"Error compressing {segment}: {e}")
+        finally:
+            with _compress_lock:
+                _queued.discard(segment)
+            _compress_queue.task_done()
+
+
+def compress_in_background(segment):
+    """Queue a rotated segment for gzip compression on the background thread"""
+    global _compress_thread
+    with _compress_lock:
+        if segment in _queued:
+            return
+        _queued.add(segment)
+        if _compress_thread is None:
+            _compress_thread = threading.Thread(target=_compress_worker, name="log-compressor", daemon=True)
+            _compress_thread.start()
+    _compress_queue.put(segment)
+
+
+def compress_pending_segments(path):
+    """Queue any segments left uncompressed, e.g. by a previous run that exited mid-way"""
+    for segment in list_segments(path):
+        if not segment.endswith(".gz"):
+            compress_in_background(segment)
+
+
+def pending_compressions():
+    """Number of segments waiting to be compressed"""
+    return _compress_queue.unfinished_tasks
+
+
+def wait_for_compression():
+    """Block until every queued segment has been compressed"""
+    _compress_queue.join()
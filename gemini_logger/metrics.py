@@ -0,0 +1,324 @@
+"""In-process metrics: counters, gauges and histograms with Prometheus text output.
+
+    metrics.counter("file_io_bytes_total", op="save_log").inc(len(data))
+    with metrics.timed("file_io_seconds", op="save_log"):
+        ...
+
+Metrics live in one process-wide registry. The Diagnostics window reads
+snapshot(); render_prometheus() feeds write_prometheus_file() and the
+localhost-only endpoint started by start_http_server().
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:  # Python 3.7 has no ThreadingHTTPServer
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+HELP = {
+    "translation_seconds": "Time spent translating one entry with Gemini",
+    "translation_failures_total": "Translations that fell back to the plain format",
+    "translation_prompt_tokens": "Prompt tokens per translation request",
+    "translation_output_tokens": "Output tokens per translation response",
+    "translation_budget_retries_total": "Translations retried because the output budget was too small",
+    "file_io_seconds": "Duration of log file reads and writes",
+    "file_io_bytes_total": "Bytes read from or written to log files",
+    "tk_callback_seconds": "Time spent inside Tk event callbacks",
+    "compression_queue_depth": "Rotated segments waiting to be compressed",
+    "export_entries": "Entries written by the running or last export",
+    "daemon_batch_size": "Appends committed together by one daemon batch",
+    "daemon_commit_seconds": "Time to write and fsync one daemon batch",
+    "daemon_queue_depth": "Appends waiting for the daemon's commit writer",
+    "routing_requests_total": "Translation requests by the backend they were routed to",
+    "routing_hedges_total": "Hedged duplicate requests by the backend they were sent to",
+    "routing_hedge_wins_total": "Hedged requests by the backend that answered first",
+    "routing_seconds": "Latency of completed requests per routing backend",
+    "summary_digests_total": "Summary digests by step (map, reduce) and outcome (cached, summarized)",
+    "sink_queue_depth": "Entries waiting in each sink's queue",
+    "sink_sent_total": "Entries delivered to each sink",
+    "sink_dropped_total": "Entries a sink dropped, by reason (queue_full, send_failed)",
+    "sink_retries_total": "Sink batches retried after a failed send",
+    "sink_send_seconds": "Time to deliver one batch to a sink",
+    "tab_resident_chars": "Characters of log text held by all open tabs",
+    "tab_evictions_total": "Background tabs whose text was dropped to stay within the memory budget",
+    "tab_rehydrate_seconds": "Time to reload an evicted tab when it is selected",
+    "filter_seconds": "Time to scan a log and its segments for a filter pattern",
+    "filter_hits_total": "Lines matched by log filter scans",
+    "similarity_entries_indexed_total": "Entries vectorized into a similarity index",
+    "similarity_query_seconds": "Time to rank indexed entries against one batch of queries",
+    "speculation_total": "Speculative translations by outcome (used, discarded, cancelled, ...)",
+    "ui_stalls_total": "Times the Tk event loop stopped answering heartbeats",
+    "ui_stall_seconds": "How long each event loop stall lasted",
+}
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def clear(self):
+        with self.lock:
+            self.value = 0
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Gauge:
+    """A value that goes up and down; pass `function` to read it lazily on every snapshot"""
+    kind = "gauge"
+
+    def __init__(self, function=None):
+        self.value = 0
+        self.function = function
+
+    def set(self, value):
+        self.value = value
+
+    def clear(self):
+        pass  # Gauges report current state, there is nothing to reset
+
+    def snapshot(self):
+        if self.function is not None:
+            try:
+                self.value = self.function()
+            except Exception as e:
+                print(f"Error reading gauge: {e}")
+        return {"value": self.value}
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def clear(self):
+        with self.lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+
+    def percentile(self, fraction):
+        """Estimate a percentile by interpolating inside the bucket that holds it"""
+        with self.lock:
+            counts = list(self.counts)
+            total = self.count
+            largest = self.max
+        if not total:
+            return 0.0
+        rank = fraction * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else largest
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, largest)
+            seen += bucket_count
+        return largest
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+# --- Registry ---
+_metrics = {}  # (name, sorted label items) -> metric
+_registry_lock = threading.Lock()
+
+
+def _get(cls, name, labels, **kwargs):
+    key = (name, tuple(sorted(labels.items())))
+    metric = _metrics.get(key)
+    if metric is None:
+        with _registry_lock:
+            metric = _metrics.get(key)
+            if metric is None:
+                metric = _metrics[key] = cls(**kwargs)
+    return metric
+
+
+def counter(name, **labels):
+    return _get(Counter, name, labels)
+
+
+def gauge(name, function=None, **labels):
+    metric = _get(Gauge, name, labels)
+    if function is not None:
+        metric.function = function
+    return metric
+
+
+def histogram(name, buckets=LATENCY_BUCKETS, **labels):
+    return _get(Histogram, name, labels, buckets=buckets)
+
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the duration of the with-block in seconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(name, **labels).observe(time.perf_counter() - started)
+
+
+def reset():
+    """Zero every counter and histogram; metric objects stay registered so holders keep working"""
+    with _registry_lock:
+        items = list(_metrics.values())
+    for metric in items:
+        metric.clear()
+
+
+def snapshot():
+    """Return [(name, labels, kind, values)] sorted by name and labels"""
+    with _registry_lock:
+        items = sorted(_metrics.items())
+    return [(name, dict(labels), metric.kind, metric.snapshot()) for (name, labels), metric in items]
+
+
+# --- Prometheus Exposition ---
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+
+def render_prometheus(prefix="gemini_logger_"):
+    """Render every metric in the Prometheus text exposition format"""
+    with _registry_lock:
+        items = sorted(_metrics.items())
+    lines = []
+    described = set()
+    for (name, labels), metric in items:
+        labels = dict(labels)
+        full_name = prefix + name
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {full_name} {metric.kind}")
+        if metric.kind == "histogram":
+            with metric.lock:
+                counts = list(metric.counts)
+                total, value_sum = metric.count, metric.sum
+            cumulative = 0
+            for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{full_name}_bucket{_format_labels(labels, {'le': bound})} {cumulative}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {value_sum}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {total}")
+        else:
+            lines.append(f"{full_name}{_format_labels(labels)} {metric.snapshot()['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_file(path):
+    """Atomically write the metrics for node_exporter's textfile collector or similar"""
+    temp = path + ".tmp"
+    with open(temp, "w") as f:
+        f.write(render_prometheus())
+    os.replace(temp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the console
+
+
+def start_http_server(port):
+    """Serve /metrics on 127.0.0.1 only, from a daemon thread; return the server"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# --- Tk Instrumentation ---
+def _callback_name(func):
+    name = getattr(func, "__name__", type(func).__name__)
+    if name == "callit" and getattr(func, "__closure__", None):
+        # Misc.after() wraps the real callback in a closure named callit
+        for cell in func.__closure__:
+            inner = cell.cell_contents
+            if callable(inner) and getattr(inner, "__name__", None) not in (None, "callit"):
+                return inner.__name__
+    return name
+
+
+def instrument_tk(tkinter_module):
+    """Time every Tk callback (commands, bindings and after() jobs) into tk_callback_seconds.
+
+    Must run before widgets are created: tkinter wraps callbacks in CallWrapper
+    when they are registered.
+    """
+    base = tkinter_module.CallWrapper
+    if getattr(base, "_timed", False):
+        return
+
+    class TimedCallWrapper(base):
+        _timed = True
+
+        def __init__(self, func, subst, widget):
+            base.__init__(self, func, subst, widget)
+            self.metric = histogram("tk_callback_seconds", callback=_callback_name(func))
+
+        def __call__(self, *args):
+            started = time.perf_counter()
+            try:
+                return base.__call__(self, *args)
+            finally:
+                self.metric.observe(time.perf_counter() - started)
+
+    tkinter_module.CallWrapper = TimedCallWrapper
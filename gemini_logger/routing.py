@@ -0,0 +1,275 @@
+"""Latency-based model routing with hedged requests.
+
+Router keeps a rolling window of latencies per backend. Short inputs go to
+whichever backend is currently fastest; longer ones go to the first
+configured (primary) backend. If the chosen backend has not answered by its
+hedge delay, a duplicate "hedge" request goes to the fastest other backend,
+the first answer wins and the loser is cancelled. If it fails instead, the
+request fails over to the next backend straight away.
+
+The hedge delay is the backend's rolling p90, capped at 3x its p50. A p95
+alone stops helping once more than 5% of requests are slow, as the p95 then
+is the slow latency; the cap keeps hedging at a few times the typical
+latency until about half of the requests are slow. Past that the p50 is
+slow too, so hedging no longer cuts the tail, but short inputs are routed
+to another backend anyway. Up to about 10% of requests (more with a heavier
+tail) are sent twice.
+
+Backends are Gemini models (GeminiBackend) or HTTP endpoints speaking the
+stand-in server's protocol (HttpBackend, see standin_server.py).
+"""
+import http.client
+import json
+import socket
+import threading
+import time
+import types
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from . import metrics
+
+WINDOW = 200  # Latencies remembered per backend
+MIN_SAMPLES = 10  # Below this the default hedge delay is used instead of the p95
+MAX_EXPLORATIONS = 3  # Times a backend with too few samples is chosen just to measure it
+DEFAULT_HEDGE_DELAY = 1.0  # seconds
+HEDGE_PERCENTILE = 0.90
+HEDGE_CAP = 3.0  # Hedge no later than this many times the backend's p50
+MIN_HEDGE_DELAY = 0.05  # Never hedge sooner than this, whatever the percentiles say
+SHORT_INPUT_CHARS = 80
+
+
+class CallCancelled(Exception):
+    """Raised by a backend whose request was cancelled because another one won"""
+
+
+class Call:
+    """Cancellation handle passed to a backend for one request"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self.cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class LatencyTracker:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, fraction, default=None, min_samples=MIN_SAMPLES):
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered or len(ordered) < min_samples:
+            return default
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# --- Backends ---
+class GeminiBackend:
+    """A Gemini model; requests can't be aborted, so a cancelled loser's answer is just dropped"""
+
+    def __init__(self, name, model):
+        self.name = name
+        self.model = model
+
+    def generate(self, text, max_output_tokens, call):
+        return self.model.generate_content(text, generation_config={"max_output_tokens": max_output_tokens})
+
+
+class HttpBackend:
+    """An endpoint that takes {"text", "max_output_tokens"} and answers {"text", "usage", "finish_reason"}"""
+
+    def __init__(self, name, url, timeout=60.0):
+        self.name = name
+        self.url = url
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/generate"
+        self.timeout = timeout
+
+    def generate(self, text, max_output_tokens, call):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+        def abort():
+            # Shutting the socket down wakes the thread blocked reading the response
+            if connection.sock is not None:
+                try:
+                    connection.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+        call.on_cancel(abort)
+        try:
+            body = json.dumps({"text": text, "max_output_tokens": max_output_tokens})
+            connection.request("POST", self.path, body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"{self.name} answered HTTP {response.status}")
+        except (OSError, http.client.HTTPException):
+            if call.cancelled.is_set():
+                raise CallCancelled()
+            raise
+        finally:
+            connection.close()
+        data = json.loads(payload)
+        usage = data.get("usage", {})
+        return types.SimpleNamespace(
+            text=data["text"],
+            usage_metadata=types.SimpleNamespace(
+                prompt_token_count=usage.get("prompt_tokens", 0),
+                candidates_token_count=usage.get("output_tokens", 0),
+            ),
+            candidates=[types.SimpleNamespace(finish_reason=data.get("finish_reason", "STOP"))],
+        )
+
+
+# --- Router ---
+class Router:
+    def __init__(self, backends, hedge=True, short_input_chars=SHORT_INPUT_CHARS, max_workers=16):
+        if not backends:
+            raise ValueError("Router needs at least one backend")
+        self.backends = list(backends)
+        self.hedge = hedge and len(self.backends) > 1
+        self.short_input_chars = short_input_chars
+        self.latency = {backend.name: LatencyTracker() for backend in self.backends}
+        self.explorations = {backend.name: 0 for backend in self.backends}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+
+    def _typical(self, backend):
+        tracker = self.latency[backend.name]
+        if len(tracker) >= MIN_SAMPLES:
+            return tracker.percentile(0.50)
+        # Backends without enough samples count as fast a few times so they get measured,
+        # then are judged on what they have (lost hedges count as lower bounds)
+        if self.explorations[backend.name] < MAX_EXPLORATIONS:
+            return 0.0
+        return tracker.percentile(0.50, default=float("inf"), min_samples=1)
+
+    def choose(self, text):
+        """Pick the backend for a request: the fastest for short inputs, else the primary"""
+        if len(text) > self.short_input_chars:
+            return self.backends[0]
+        with self.lock:
+            backend = min(self.backends, key=self._typical)
+            if len(self.latency[backend.name]) < MIN_SAMPLES:
+                self.explorations[backend.name] += 1
+        return backend
+
+    def hedge_delay(self, backend):
+        tracker = self.latency[backend.name]
+        delay = tracker.percentile(HEDGE_PERCENTILE, default=DEFAULT_HEDGE_DELAY)
+        typical = tracker.percentile(0.50)
+        if typical is not None:
+            delay = min(delay, HEDGE_CAP * typical)
+        return max(MIN_HEDGE_DELAY, delay)
+
+    def _start(self, backend, text, max_output_tokens, calls):
+        call = Call()
+        future = self.executor.submit(self._run, backend, text, max_output_tokens, call)
+        calls[future] = (backend, call, time.perf_counter())
+        return future
+
+    def _untried(self, calls):
+        """The fastest backend this request hasn't been sent to, or None"""
+        tried = [backend for backend, _, _ in calls.values()]
+        others = [backend for backend in self.backends if backend not in tried]
+        return min(others, key=self._typical) if others else None
+
+    def _run(self, backend, text, max_output_tokens, call):
+        started = time.perf_counter()
+        response = backend.generate(text, max_output_tokens, call)
+        elapsed = time.perf_counter() - started
+        if not call.cancelled.is_set():
+            self.latency[backend.name].record(elapsed)
+            metrics.histogram("routing_seconds", backend=backend.name).observe(elapsed)
+        return response
+
+    def generate(self, text, max_output_tokens):
+        """Return the first successful response, hedging if the chosen backend is slow
+        and failing over to the next one if it errors"""
+        primary = self.choose(text)
+        metrics.counter("routing_requests_total", backend=primary.name).inc()
+        calls = {}  # future -> (backend, call, started)
+        pending = {self._start(primary, text, max_output_tokens, calls)}
+        hedge_at = time.perf_counter() + self.hedge_delay(primary) if self.hedge else None
+        hedged = False
+        error = None
+        try:
+            while pending:
+                timeout = None if hedge_at is None else max(0.0, hedge_at - time.perf_counter())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    hedge_at = None
+                    secondary = self._untried(calls)
+                    if secondary is not None:
+                        metrics.counter("routing_hedges_total", backend=secondary.name).inc()
+                        pending.add(self._start(secondary, text, max_output_tokens, calls))
+                        hedged = True
+                    continue
+                for finished in done:
+                    try:
+                        response = finished.result()
+                    except Exception as e:
+                        error = e  # Keep waiting for the other request, if any
+                        continue
+                    winner = calls[finished][0]
+                    if hedged:
+                        metrics.counter("routing_hedge_wins_total", backend=winner.name).inc()
+                    return response
+                if not pending:
+                    # Everything sent so far failed; don't wait for the hedge delay to try another
+                    fallback = self._untried(calls)
+                    if fallback is not None:
+                        metrics.counter("routing_failovers_total", backend=fallback.name).inc()
+                        pending.add(self._start(fallback, text, max_output_tokens, calls))
+                        hedge_at = None
+            raise error
+        finally:
+            for unfinished in pending:
+                loser, loser_call, started = calls[unfinished]
+                unfinished.cancel()
+                loser_call.cancel()
+                # It would have taken at least this long; without it a backend that always
+                # loses would never be measured and would keep looking untried
+                self.latency[loser.name].record(time.perf_counter() - started)
+
+    def stats(self):
+        """Rolling p50/p95 and the current hedge delay per backend, for diagnostics"""
+        return {
+            backend.name: {
+                "samples": len(self.latency[backend.name]),
+                "p50": self.latency[backend.name].percentile(0.50),
+                "p95": self.latency[backend.name].percentile(0.95),
+                "hedge_delay": self.hedge_delay(backend),
+            }
+            for backend in self.backends
+        }
@@ -0,0 +1,350 @@
+"""Offline "find similar entries" from hashed character n-gram vectors.
+
+Every entry becomes a DIMENSIONS-wide vector: its character 3- to 5-grams
+(lower-cased, console.log(...) wrapping stripped) hashed into signed buckets,
+dampened with log1p and L2-normalized. Entries about the same task share most
+of their n-grams even when phrased differently, so cosine similarity finds
+them. Nothing is downloaded and no request leaves the machine.
+
+Each log has its own index folder under the cache directory:
+
+    vectors.f32     the matrix, one float32 row (1 KB) per entry, appended in place
+    entries.jsonl   {"key", "text"} for each row, in the same order
+
+Rows are keyed by a hash of the entry text, so rotation, compression and
+renames don't invalidate anything. add() appends one entry as it is logged;
+sync() catches up with the log on disk, vectorizing only entries it hasn't
+seen and skipping rows whose entry was edited away. Queries score a batch of
+texts against the whole matrix in one product.
+
+NumPy is optional for the rest of the app; without it available() is False.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # Only this feature needs NumPy
+    np = None
+
+from . import log_export
+from . import metrics
+
+INDEX_VERSION = "1"  # Bump when vectorizing changes so old matrices are rebuilt
+DIMENSIONS = 256
+NGRAM_SIZES = (3, 4, 5)
+VECTORIZE_BATCH = 2000  # Entries vectorized together while syncing
+COMPACT_MIN_STALE = 1000  # Stale rows tolerated before the files are rewritten without them
+
+_BOILERPLATE = re.compile(r"console\.\w+\(|\)\s*;?\s*$|\[Log\]|```\w*|[\"'`]", re.MULTILINE)
+
+
+class SimilarityCancelled(Exception):
+    """Raised between batches when indexing was cancelled"""
+
+
+def available():
+    return np is not None
+
+
+def default_cache_dir():
+    """The GUI's cache folder if it exists here, else the per-user one"""
+    base = "cache" if os.path.isdir("cache") else os.path.join(os.path.expanduser("~"), ".gemini-workload-logger")
+    return os.path.join(base, "similarity")
+
+
+def index_dir(cache_dir, log_path):
+    digest = hashlib.sha256(os.path.abspath(log_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(log_path)}-{digest}")
+
+
+def entry_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def split_entries(text):
+    """Split newly logged text into entries the same way the log is read back"""
+    return ["".join(lines).rstrip("\n") for lines in log_export.group_lines(text.splitlines(True))]
+
+
+# --- Vectors ---
+def _u64(value):
+    return np.uint64(value)
+
+
+def _mix(h):
+    """splitmix64 finalizer, so similar n-grams land in unrelated buckets"""
+    h = h ^ (h >> _u64(30))
+    h = h * _u64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> _u64(27))
+    h = h * _u64(0x94D049BB133111EB)
+    return h ^ (h >> _u64(31))
+
+
+def vectorize(texts):
+    """Return a (len(texts), DIMENSIONS) float32 matrix of unit rows (all-zero for empty texts)"""
+    texts = [" " + " ".join(_BOILERPLATE.sub(" ", text).lower().split()) + " " for text in texts]
+    counts = np.zeros(len(texts) * DIMENSIONS, dtype=np.float64)
+    if texts:
+        codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), [len(text) for text in texts])
+        for n in NGRAM_SIZES:
+            count = len(codes) - n + 1
+            if count <= 0:
+                continue
+            h = _u64(n)
+            for offset in range(n):
+                h = h * _u64(1000003) + codes[offset:offset + count]
+            h = _mix(h)
+            inside = rows[:count] == rows[n - 1:]  # Drop n-grams spanning two entries
+            buckets = rows[:count][inside] * DIMENSIONS + (h[inside] % _u64(DIMENSIONS)).astype(np.int64)
+            signs = 1.0 - 2.0 * (h[inside] >> _u64(63)).astype(np.float64)
+            counts += np.bincount(buckets, weights=signs, minlength=len(counts))
+    matrix = counts.reshape(len(texts), DIMENSIONS)
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+# --- Index ---
+class SimilarityIndex:
+    """The vectors of one log's entries; safe to add to from one thread while another queries"""
+
+    def __init__(self, directory):
+        if np is None:
+            raise RuntimeError("Finding similar entries needs NumPy (pip install numpy)")
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, "vectors.f32")
+        self.entries_path = os.path.join(directory, "entries.jsonl")
+        self.version_path = os.path.join(directory, "version")
+        self.lock = threading.RLock()
+        self.keys = []  # row -> entry key
+        self.texts = []  # row -> entry text
+        self.rows = {}  # entry key -> row
+        self.matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)  # Capacity grows by doubling
+        self.live = np.zeros(0, dtype=bool)  # False for rows whose entry left the log
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _load(self):
+        try:
+            with open(self.version_path, "r") as f:
+                current = f.read().strip() == f"{INDEX_VERSION}:{DIMENSIONS}"
+        except OSError:
+            current = False
+        if not current:
+            self._rewrite([], [], np.zeros((0, DIMENSIONS), dtype=np.float32))
+            return
+        keys, texts = [], []
+        try:
+            with open(self.entries_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn final line
+                    keys.append(record["key"])
+                    texts.append(record["text"])
+        except OSError:
+            pass
+        try:
+            matrix = np.fromfile(self.matrix_path, dtype=np.float32)
+        except (OSError, ValueError):
+            matrix = np.zeros(0, dtype=np.float32)
+        count = min(len(keys), len(matrix) // DIMENSIONS)
+        if count != len(keys) or count * DIMENSIONS != len(matrix):
+            # A write was cut short; keep the rows both files agree on
+            self._rewrite(keys[:count], texts[:count], matrix[:count * DIMENSIONS].reshape(count, DIMENSIONS))
+            return
+        self._set(keys, texts, matrix.reshape(count, DIMENSIONS))
+
+    def _set(self, keys, texts, matrix):
+        self.keys = list(keys)
+        self.texts = list(texts)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.matrix = np.array(matrix, dtype=np.float32)
+        self.live = np.ones(len(self.keys), dtype=bool)
+
+    def _rewrite(self, keys, texts, matrix):
+        """Replace both files with these rows, e.g. to drop stale ones"""
+        with open(self.entries_path + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n" for key, text in zip(keys, texts))
+        with open(self.matrix_path + ".tmp", "wb") as f:
+            f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        os.replace(self.entries_path + ".tmp", self.entries_path)
+        os.replace(self.matrix_path + ".tmp", self.matrix_path)
+        with open(self.version_path, "w") as f:
+            f.write(f"{INDEX_VERSION}:{DIMENSIONS}")
+        self._set(keys, texts, matrix)
+
+    def _append(self, texts, vectors):
+        """Append rows for entries not in the index yet; the caller holds the lock"""
+        keys = [entry_key(text) for text in texts]
+        with open(self.entries_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n" for key, text in zip(keys, texts))
+        with open(self.matrix_path, "ab") as f:
+            f.write(vectors.tobytes())
+        start = len(self.keys)
+        end = start + len(keys)
+        if end > len(self.matrix):
+            capacity = max(end, 2 * len(self.matrix), 1024)
+            matrix = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+            matrix[:start] = self.matrix[:start]
+            live = np.zeros(capacity, dtype=bool)
+            live[:start] = self.live[:start]
+            self.matrix, self.live = matrix, live
+        self.matrix[start:end] = vectors
+        self.live[start:end] = True
+        for row, key in enumerate(keys, start):
+            self.rows[key] = row
+        self.keys.extend(keys)
+        self.texts.extend(texts)
+        metrics.counter("similarity_entries_indexed_total").inc(len(keys))
+
+    def add(self, text):
+        """Index newly logged text (one or more entries); returns how many rows were added"""
+        with self.lock:
+            texts = [entry for entry in dict.fromkeys(split_entries(text)) if entry_key(entry) not in self.rows]
+        if not texts:
+            return 0
+        vectors = vectorize(texts)
+        with self.lock:
+            fresh = [row for row, text in enumerate(texts) if entry_key(text) not in self.rows]
+            if fresh:
+                self._append([texts[row] for row in fresh], vectors[fresh])
+            return len(fresh)
+
+    def sync(self, entries, cancel=None, progress=None):
+        """Bring the index in line with `entries` (texts, oldest first); returns stats"""
+        seen = set()
+        pending = []
+        stats = {"entries": 0, "added": 0, "stale": 0}
+
+        def flush():
+            if cancel is not None and cancel.is_set():
+                raise SimilarityCancelled()
+            vectors = vectorize(pending)
+            with self.lock:
+                self._append(pending, vectors)
+            stats["added"] += len(pending)
+            del pending[:]
+            if progress is not None:
+                progress(stats["entries"], stats["added"])
+
+        for text in entries:
+            key = entry_key(text)
+            stats["entries"] += 1
+            if key in seen:
+                continue
+            seen.add(key)
+            with self.lock:
+                known = key in self.rows
+            if not known:
+                pending.append(text)
+                if len(pending) >= VECTORIZE_BATCH:
+                    flush()
+        if pending:
+            flush()
+
+        with self.lock:
+            count = len(self.keys)
+            live = np.fromiter((key in seen for key in self.keys), dtype=bool, count=count)
+            self.live[:count] = live
+            stats["stale"] = int(count - live.sum())
+            if stats["stale"] >= max(COMPACT_MIN_STALE, count // 4):
+                keep = np.flatnonzero(live)
+                self._rewrite([self.keys[row] for row in keep], [self.texts[row] for row in keep], self.matrix[keep])
+        return stats
+
+    def query(self, texts, k=10):
+        """Return, for each text, up to k (score, entry text) pairs with a positive score, best first; the text itself is skipped"""
+        started = time.perf_counter()
+        queries = vectorize(texts)
+        with self.lock:
+            count = len(self.keys)
+            matrix = self.matrix[:count]  # A view; rows appended later don't affect it
+            live = self.live[:count].copy()
+            entry_texts = self.texts  # Only ever appended to; compaction swaps in a new list
+            own_rows = [self.rows.get(entry_key(text)) for text in texts]
+        scores = np.dot(matrix, queries.T).T  # (queries, rows); multiplying in this order is faster
+        scores[:, ~live] = -np.inf
+        results = []
+        for index, own_row in enumerate(own_rows):
+            row_scores = scores[index]
+            if own_row is not None:
+                row_scores[own_row] = -np.inf
+            top = min(k, count)
+            if top == 0:
+                results.append([])
+                continue
+            best = np.argpartition(-row_scores, top - 1)[:top]
+            best = best[np.argsort(-row_scores[best])]
+            results.append([(float(row_scores[row]), entry_texts[row]) for row in best if row_scores[row] > 0])
+        metrics.histogram("similarity_query_seconds").observe(time.perf_counter() - started)
+        return results
+
+
+def open_index(log_path, cache_dir=None):
+    return SimilarityIndex(index_dir(cache_dir or default_cache_dir(), log_path))
+
+
+def sync_log(index, log_path, include_segments=True, cancel=None, progress=None):
+    """Index every entry of a log and its rotated segments that isn't indexed yet"""
+    entries = (entry["text"] for entry in log_export.read_entries(log_path, include_segments, cancel))
+    try:
+        return index.sync(entries, cancel, progress)
+    except log_export.ExportCancelled:
+        raise SimilarityCancelled()
+
+
+class SimilarityJob:
+    """Open and sync a log's index on a background thread, then run the queries; poll `done`"""
+
+    def __init__(self, log_path, texts, k=10, cache_dir=None, index=None, sync=True):
+        self.log_path = log_path
+        self.sync = sync
+        self.texts = texts
+        self.k = k
+        self.cache_dir = cache_dir
+        self.index = index
+        self.progress = (0, 0)
+        self.result = None
+        self.stats = None
+        self.error = None
+        self.cancelled = False
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="similarity", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def _progress(self, entries, added):
+        self.progress = (entries, added)
+
+    def _run(self):
+        try:
+            if self.index is None:
+                self.index = open_index(self.log_path, self.cache_dir)
+            if self.sync:
+                self.stats = sync_log(self.index, self.log_path, cancel=self.cancel_event, progress=self._progress)
+            self.result = self.index.query(self.texts, self.k)
+        except SimilarityCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
@@ -0,0 +1,245 @@
+"""Single-instance mode: later launches hand their command to the running GUI.
+
+The first GUI listens on a local socket (a Unix socket next to the daemon's,
+localhost TCP where AF_UNIX is unavailable). A later launch of the GUI
+(gemini_logger.app), `gemini-logger open` or `gemini-logger log` connects to
+it before importing Tk or the Gemini SDK, sends one request and exits. The
+running window queues the request and carries it out on the Tk thread, with
+its model, caches and tabs already warm:
+
+    {"op": "focus"}                                raise the window
+    {"op": "open", "path": ...}                    open a log in a tab
+    {"op": "log", "text": ..., "path": optional}   log an entry as if it was typed
+
+Requests are acknowledged once queued. Pass --new-instance, or set
+GEMINI_LOGGER_SINGLE_INSTANCE=0, to start an independent window instead.
+
+As with the logging daemon, a connection first has to send the token the
+window writes, readable by the owner only, next to its socket. Paths must be
+existing files outside hidden directories, and only .txt/.log/.md files can
+be logged to, so a request can't make the window write anywhere else.
+"""
+import argparse
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import threading
+
+# Only the standard library: this module is imported on every launch, before anything heavy
+INSTANCE_DIR = os.path.join(os.path.expanduser("~"), ".gemini-workload-logger")  # Shared with the daemon
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+DEFAULT_TCP_ADDRESS = ("127.0.0.1", 47832)
+OPS = ("focus", "open", "log")
+LOG_EXTENSIONS = (".txt", ".log", ".md")  # What "log" requests may append to, as for the daemon
+
+
+class InstanceError(Exception):
+    """Raised when the running instance rejects a request"""
+
+
+def enabled():
+    return os.getenv("GEMINI_LOGGER_SINGLE_INSTANCE", "1") != "0"
+
+
+def default_address():
+    """Return the socket path (or TCP address) of the running GUI"""
+    override = os.getenv("GEMINI_LOGGER_GUI_SOCKET")
+    if HAS_UNIX_SOCKETS:
+        return override or os.path.join(INSTANCE_DIR, "gui.sock")
+    if override:
+        host, _, port = override.rpartition(":")
+        return (host or "127.0.0.1", int(port))
+    return DEFAULT_TCP_ADDRESS
+
+
+def token_path(address):
+    if isinstance(address, str):
+        return address + ".token"
+    return os.path.join(INSTANCE_DIR, f"gui-{address[1]}.token")
+
+
+def check_path(op, path):
+    """Return why a request's path is refused, or None if the window may use it"""
+    if not isinstance(path, str) or not os.path.isabs(path):
+        return f"Not an absolute path: {path}"
+    real = os.path.realpath(path)
+    if any(part.startswith(".") for part in real.split(os.sep) if part):
+        return f"Refusing a hidden path: {path}"
+    if not os.path.isfile(real):
+        return f"No such file: {path}"
+    if op == "log" and os.path.splitext(real)[1].lower() not in LOG_EXTENSIONS:
+        return f"Not a log file: {path}"
+    return None
+
+
+def parse_launch_args(argv):
+    parser = argparse.ArgumentParser(prog="workload-logger", description="Gemini Workload Logger")
+    parser.add_argument("files", nargs="*", help="Log files to open in tabs")
+    parser.add_argument("--new-instance", action="store_true", help="Start a separate window even if one is running")
+    return parser.parse_args(argv)
+
+
+# --- Client ---
+def _connect(address, timeout):
+    sock = socket.socket(socket.AF_UNIX if isinstance(address, str) else socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def send(requests, address=None, timeout=5.0):
+    """Hand requests to the running instance; returns its replies, or None if no instance is running"""
+    address = address or default_address()
+    if isinstance(address, str) and not os.path.exists(address):
+        return None
+    try:
+        with open(token_path(address), "r") as f:
+            token = f.read().strip()
+        sock = _connect(address, timeout)
+    except OSError:
+        return None  # Nothing listening, e.g. a socket file left by a crash
+    with sock, sock.makefile("rb") as reader:
+        sock.sendall((json.dumps({"op": "auth", "token": token}) + "\n").encode("utf-8"))
+        sock.sendall(b"".join((json.dumps(request) + "\n").encode("utf-8") for request in requests))
+        replies = []
+        for _ in range(len(requests) + 1):
+            line = reader.readline()
+            if not line:
+                if replies and not replies[0].get("ok"):
+                    break  # Token refused; reported below
+                raise ConnectionError("The running instance closed the connection")
+            replies.append(json.loads(line))
+    for reply in replies:
+        if not reply.get("ok"):
+            raise InstanceError(reply.get("error", "unknown error"))
+    return replies[1:]
+
+
+def forward_launch(files):
+    """Ask a running instance to open `files` (or just come to the front); True if one took over"""
+    requests = [{"op": "open", "path": os.path.abspath(path)} for path in files] or [{"op": "focus"}]
+    try:
+        return send(requests) is not None
+    except (OSError, ValueError, InstanceError) as e:
+        print(f"Error handing the launch to the running instance: {e}")
+        return False
+
+
+# --- Server ---
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def reply(self, reply):
+        try:
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            return True
+        except OSError:
+            return False  # The launcher already exited
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            token = request.get("token") if request.get("op") == "auth" else None
+        except (ValueError, AttributeError):
+            token = None
+        if not (isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.server.token.encode("utf-8"))):
+            self.reply({"ok": False, "error": "Bad or missing token"})
+            return
+        if not self.reply({"ok": True}):
+            return
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+            except (ValueError, AttributeError) as e:
+                reply = {"ok": False, "error": f"Bad request: {e}"}
+            else:
+                refused = check_path(op, request["path"]) if op in ("open", "log") and "path" in request else None
+                if op not in OPS:
+                    reply = {"ok": False, "error": f"Unknown op: {op}"}
+                elif refused:
+                    reply = {"ok": False, "error": refused}
+                elif op == "log" and not isinstance(request.get("text"), str):
+                    reply = {"ok": False, "error": "A log request needs text"}
+                else:
+                    self.server.requests.put(request)
+                    reply = {"ok": True, "pid": os.getpid()}
+            if not self.reply(reply):
+                return
+
+
+if HAS_UNIX_SOCKETS:
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class InstanceServer:
+    """Accept requests from later launches; the GUI drains `requests` on the Tk thread"""
+
+    def __init__(self, address=None):
+        self.address = address or default_address()
+        self.requests = queue.Queue()
+        self.server = None
+
+    def start(self):
+        """Start listening; returns False if another instance already is"""
+        try:
+            _connect(self.address, 0.5).close()
+            return False
+        except OSError:
+            pass  # Nobody is listening
+        if isinstance(self.address, str):
+            os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # Stale socket left by an instance that crashed
+            self.server = _UnixServer(self.address, _RequestHandler)
+            os.chmod(self.address, 0o600)
+        else:
+            self.server = _TCPServer(self.address, _RequestHandler)
+        self.server.requests = self.requests
+        self.server.token = self._write_token()
+        threading.Thread(target=self.server.serve_forever, name="single-instance", daemon=True).start()
+        return True
+
+    def _write_token(self):
+        path = token_path(self.address)
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)  # So the mode below applies to a new file
+        token = secrets.token_hex(32)
+        with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+            f.write(token)
+        return token
+
+    def close(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        if os.path.exists(token_path(self.address)):
+            os.unlink(token_path(self.address))
+
+
+def listen():
+    """Become the instance later launches forward to; None if that isn't possible"""
+    server = InstanceServer()
+    try:
+        return server if server.start() else None
+    except OSError as e:
+        print(f"Error starting single-instance server: {e}")
+        return None
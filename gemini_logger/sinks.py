@@ -0,0 +1,348 @@
+"""Asynchronous fan-out of logged entries to secondary sinks.
+
+    publish()  ->  bounded publish queue  ->  dispatcher  ->  one queue + worker per sink
+
+publish() never blocks: if the publish queue is full the entry is dropped and
+counted. Each sink drains its own bounded queue on its own thread, sending
+entries in batches with retry and backoff, so a slow or failing sink only
+ever delays itself. What happens when a sink's queue is full is its policy:
+
+    drop_newest   discard the entry that doesn't fit
+    drop_oldest   discard the oldest queued entry to make room
+    block         wait up to block_timeout for room, then drop the entry; the
+                  wait happens on the sink's own feeder thread, behind an
+                  inbox of queue_size more entries, so the other sinks never wait
+
+Sinks are configured in sinks.json:
+
+    {"sinks": [
+        {"type": "jsonl", "path": "cache/archive.jsonl"},
+        {"type": "syslog", "address": "127.0.0.1:514"},
+        {"type": "webhook", "url": "http://127.0.0.1:8765/webhook",
+         "policy": "drop_oldest", "queue_size": 1000, "batch_size": 50}
+    ]}
+"""
+import datetime
+import http.client
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from . import metrics
+
+POLICIES = ("drop_newest", "drop_oldest", "block")
+PUBLISH_QUEUE_SIZE = 10000
+_STOP = object()
+
+
+# --- Sinks ---
+class Sink:
+    """Base class: subclasses implement send(batch), raising to have the batch retried"""
+
+    def __init__(self, name, policy="drop_oldest", queue_size=1000, batch_size=20, linger=0.2,
+                 retries=3, backoff=0.5, block_timeout=1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown sink policy: {policy}")
+        self.name = name
+        self.policy = policy
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.linger = linger  # seconds to wait for a batch to fill before sending it anyway
+        self.retries = retries
+        self.backoff = backoff
+        self.block_timeout = block_timeout
+
+    def send(self, batch):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlSink(Sink):
+    """Structured archive: one JSON object per entry"""
+
+    def __init__(self, path, **options):
+        Sink.__init__(self, options.pop("name", "jsonl"), **options)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = None
+
+    def send(self, batch):
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch))
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class SyslogSink(Sink):
+    """RFC 5424 datagrams to a syslog socket: a path (/dev/log) or host:port over UDP"""
+
+    def __init__(self, address="127.0.0.1:514", facility=16, app_name="gemini-logger", **options):
+        Sink.__init__(self, options.pop("name", "syslog"), **options)
+        if address.startswith("/"):
+            self.address = address
+            self.family = socket.AF_UNIX
+        else:
+            host, _, port = address.rpartition(":")
+            self.address = (host or "127.0.0.1", int(port))
+            self.family = socket.AF_INET
+        self.facility = facility  # 16 = local0
+        self.app_name = app_name
+        self.hostname = socket.gethostname()
+        self.socket = None
+
+    def send(self, batch):
+        if self.socket is None:
+            self.socket = socket.socket(self.family, socket.SOCK_DGRAM)
+        priority = self.facility * 8 + 6  # informational
+        for entry in batch:
+            message = f"<{priority}>1 {entry['time']} {self.hostname} {self.app_name} {os.getpid()} - - {entry['text']}"
+            try:
+                self.socket.sendto(message.encode("utf-8"), self.address)
+            except OSError:
+                self.close()  # Reconnect on the retry
+                raise
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+
+class WebhookSink(Sink):
+    """POST each batch as {"entries": [...]} to an HTTP endpoint"""
+
+    def __init__(self, url, headers=None, timeout=10.0, **options):
+        Sink.__init__(self, options.pop("name", "webhook"), **options)
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported webhook URL: {url}")
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.headers = dict(headers or {}, **{"Content-Type": "application/json"})
+        self.timeout = timeout
+        self.connection = None
+
+    def send(self, batch):
+        if self.connection is None:
+            self.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        try:
+            self.connection.request("POST", self.path, json.dumps({"entries": batch}), self.headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.status >= 300:
+            raise RuntimeError(f"Webhook answered HTTP {response.status}")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+SINK_TYPES = {"jsonl": JsonlSink, "syslog": SyslogSink, "webhook": WebhookSink}
+
+
+# --- Workers ---
+class SinkWorker:
+    """A sink's bounded queue and the thread that drains it in batches"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.closing = False
+        self.thread = threading.Thread(target=self._run, name=f"sink-{sink.name}", daemon=True)
+        self.inbox = None
+        self.feeder = None
+        if sink.policy == "block":
+            # Waiting for room happens on this thread, never on the dispatcher shared by all sinks
+            self.inbox = queue.Queue(maxsize=sink.queue_size)
+            self.feeder = threading.Thread(target=self._feed, name=f"sink-{sink.name}-feeder", daemon=True)
+        metrics.gauge("sink_queue_depth", lambda: len(self.items), sink=sink.name)
+
+    def start(self):
+        self.thread.start()
+        if self.feeder is not None:
+            self.feeder.start()
+
+    def _dropped(self, reason, count=1):
+        metrics.counter("sink_dropped_total", sink=self.sink.name, reason=reason).inc(count)
+
+    def offer(self, entry):
+        """Queue an entry according to the sink's policy without waiting"""
+        if self.inbox is not None:
+            try:
+                self.inbox.put_nowait(entry)
+            except queue.Full:
+                self._dropped("queue_full")
+            return
+        self._put(entry)
+
+    def _feed(self):
+        while True:
+            entry = self.inbox.get()
+            if entry is _STOP:
+                return
+            self._put(entry)
+
+    def _put(self, entry):
+        """Add an entry to the batch queue; with "block", waits for room on the feeder thread"""
+        with self.condition:
+            if len(self.items) >= self.sink.queue_size:
+                if self.sink.policy == "drop_newest":
+                    self._dropped("queue_full")
+                    return
+                if self.sink.policy == "drop_oldest":
+                    self.items.popleft()
+                    self._dropped("queue_full")
+                else:
+                    deadline = time.monotonic() + self.sink.block_timeout
+                    while len(self.items) >= self.sink.queue_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or self.closing:
+                            self._dropped("queue_full")
+                            return
+                        self.condition.wait(remaining)
+            self.items.append(entry)
+            self.condition.notify_all()
+
+    def _next_batch(self):
+        with self.condition:
+            while not self.items and not self.closing:
+                self.condition.wait()
+            # Linger briefly so bursts go out in one batch
+            deadline = time.monotonic() + self.sink.linger
+            while len(self.items) < self.sink.batch_size and not self.closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            batch = [self.items.popleft() for _ in range(min(self.sink.batch_size, len(self.items)))]
+            self.condition.notify_all()  # Room for blocked offers
+            return batch
+
+    def _send(self, batch):
+        for attempt in range(self.sink.retries + 1):
+            try:
+                with metrics.timed("sink_send_seconds", sink=self.sink.name):
+                    self.sink.send(batch)
+                metrics.counter("sink_sent_total", sink=self.sink.name).inc(len(batch))
+                return
+            except Exception as e:
+                if attempt == self.sink.retries or self.closing:
+                    print(f"Error sending to sink {self.sink.name}: {e}", file=sys.stderr)
+                    self._dropped("send_failed", len(batch))
+                    return
+                metrics.counter("sink_retries_total", sink=self.sink.name).inc()
+                time.sleep(self.sink.backoff * 2 ** attempt)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                break  # Closing and drained
+            self._send(batch)
+        self.sink.close()
+
+    def close(self, timeout=0.0):
+        """Stop once the queue is drained; a feeder first gets `timeout` seconds to hand over its inbox"""
+        if self.feeder is not None and self.feeder.is_alive():
+            deadline = time.monotonic() + timeout
+            try:
+                self.inbox.put(_STOP, timeout=timeout)
+                self.feeder.join(max(0, deadline - time.monotonic()))
+            except queue.Full:
+                pass
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+
+
+class SinkPipeline:
+    """Publish entries once; every sink receives them independently"""
+
+    def __init__(self, sinks, queue_size=PUBLISH_QUEUE_SIZE):
+        self.workers = [SinkWorker(sink) for sink in sinks]
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dispatcher = threading.Thread(target=self._dispatch, name="sink-dispatcher", daemon=True)
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        self.dispatcher.start()
+        return self
+
+    def publish(self, text, **fields):
+        """Hand an entry to every sink without waiting; returns False if it had to be dropped"""
+        entry = {"time": datetime.datetime.now().astimezone().isoformat(timespec="milliseconds"), "text": text}
+        entry.update(fields)
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            metrics.counter("sink_dropped_total", sink="publish", reason="queue_full").inc()
+            return False
+
+    def _dispatch(self):
+        while True:
+            entry = self.queue.get()
+            if entry is _STOP:
+                break
+            for worker in self.workers:
+                worker.offer(entry)
+
+    def close(self, timeout=2.0):
+        """Stop accepting entries and give the sinks up to `timeout` seconds to drain"""
+        deadline = time.monotonic() + timeout
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self.dispatcher.join(max(0, deadline - time.monotonic()))
+        for worker in self.workers:
+            worker.close(max(0, deadline - time.monotonic()))
+        for worker in self.workers:
+            worker.thread.join(max(0, deadline - time.monotonic()))
+
+
+def build_sink(spec):
+    options = dict(spec)
+    kind = options.pop("type", None)
+    if kind not in SINK_TYPES:
+        raise ValueError(f"Unknown sink type: {kind}")
+    if not options.pop("enabled", True):
+        return None
+    return SINK_TYPES[kind](**options)
+
+
+def load_pipeline(path):
+    """Build and start the pipeline described by a sinks.json file; None if it has no sinks"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        config = json.load(f)
+    sinks = [sink for sink in (build_sink(spec) for spec in config.get("sinks", [])) if sink is not None]
+    if not sinks:
+        return None
+    return SinkPipeline(sinks, config.get("queue_size", PUBLISH_QUEUE_SIZE)).start()
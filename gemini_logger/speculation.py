@@ -0,0 +1,88 @@
+"""Speculative translation of the entry text while the user is still typing.
+
+The GUI calls speculate() once typing pauses and take() when Enter is pressed.
+If the text is unchanged, take() returns the finished (or in-flight) result
+instead of starting a new request. Only one speculation runs at a time, stale
+ones are cancelled while queued or discarded once done, and a per-minute cap
+bounds the requests that can be wasted.
+"""
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+
+
+class Speculator:
+    def __init__(self, translate, min_chars=3, max_per_minute=12):
+        self.translate = translate
+        self.min_chars = min_chars
+        self.max_per_minute = max_per_minute
+        self.executor = None
+        self.text = None
+        self.future = None
+        self.issued = deque()  # monotonic times of recent speculative requests
+
+    def _outcome(self, outcome):
+        metrics.counter("speculation_total", outcome=outcome).inc()
+
+    def speculate(self, text):
+        """Start translating `text` in the background unless it is already being translated"""
+        if self.future is not None and self.text == text:
+            return
+        self.discard()
+        if len(text.strip()) < self.min_chars:
+            return
+
+        now = time.monotonic()
+        while self.issued and now - self.issued[0] > 60:
+            self.issued.popleft()
+        if len(self.issued) >= self.max_per_minute:
+            self._outcome("rate_limited")
+            return
+        self.issued.append(now)
+
+        if self.executor is None:
+            # One worker: a stale speculation is never running alongside a newer one
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculation")
+        self.text = text
+        self.future = self.executor.submit(self.translate, text)
+
+    def discard_if_stale(self, text):
+        """Drop the current speculation as soon as the text it was made for changes"""
+        if self.future is not None and self.text != text:
+            self.discard()
+
+    def discard(self):
+        if self.future is None:
+            return
+        if self.future.cancel():
+            self._outcome("cancelled")
+        else:
+            self._outcome("discarded")  # Already running or done: the request is wasted
+        self.text = None
+        self.future = None
+
+    def take(self, text, timeout=None):
+        """Return the speculative result for exactly this text, or None if there is none"""
+        if self.future is None:
+            return None
+        if self.text != text:
+            self.discard()
+            return None
+        future = self.future
+        self.text = None
+        self.future = None
+        try:
+            result = future.result(timeout)  # Usually done; otherwise already partly waited for
+        except Exception as e:
+            print(f"Error in speculative translation: {e}")
+            self._outcome("failed")
+            return None
+        self._outcome("used")
+        return result
+
+    def shutdown(self):
+        self.discard()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,133 @@
+"""Main-thread stall watchdog and sampling profiler for the Tk event loop.
+
+StallWatchdog heartbeats the event loop through root.after(); when the loop
+stops answering for longer than the threshold, a background thread captures
+the main thread's stack and appends it, timestamped, to a stall log.
+
+SamplingProfiler samples the main thread's stack at a fixed interval and
+writes the counts in the folded "frame;frame;frame count" format read by
+flamegraph.pl, speedscope and similar tools.
+"""
+import datetime
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from . import metrics
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StallWatchdog:
+    """Log the main thread's stack whenever the Tk event loop stalls beyond `threshold` seconds"""
+
+    def __init__(self, root, log_path, threshold=0.5, heartbeat_ms=100):
+        self.root = root
+        self.log_path = log_path
+        self.threshold = threshold
+        self.heartbeat_ms = heartbeat_ms
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self._heartbeat()
+        self.thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def _heartbeat(self):
+        self.last_beat = time.monotonic()
+        if not self.stopped.is_set():
+            self.root.after(self.heartbeat_ms, self._heartbeat)
+
+    def _watch(self):
+        stall_started = None
+        check_interval = min(self.threshold / 4, 0.1)
+        while not self.stopped.wait(check_interval):
+            beat = self.last_beat
+            lag = time.monotonic() - beat
+            if stall_started is None and lag > self.threshold:
+                stall_started = beat
+                self._record_stack(lag)
+            elif stall_started is not None and beat > stall_started:
+                # The loop answered again; the stall lasted until that heartbeat
+                duration = beat - stall_started
+                metrics.counter("ui_stalls_total").inc()
+                metrics.histogram("ui_stall_seconds").observe(duration)
+                self._write(f"Stall ended after {duration:.3f}s\n\n")
+                stall_started = None
+
+    def _record_stack(self, lag):
+        frame = sys._current_frames().get(self.main_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "  (main thread stack unavailable)\n"
+        timestamp = datetime.datetime.now().isoformat(timespec="milliseconds")
+        self._write(f"[{timestamp}] Event loop stalled for {lag:.3f}s; main thread stack:\n{stack}")
+
+    def _write(self, text):
+        try:
+            with open(self.log_path, "a") as f:
+                f.write(text)
+        except Exception as e:
+            print(f"Error writing stall log: {e}")
+
+
+class SamplingProfiler:
+    """Sample one thread's stack every `interval` seconds and count identical stacks"""
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self.started = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        self.counts.clear()
+        self.samples = 0
+        self.started = time.monotonic()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        """Write one "root;...;leaf count" line per distinct stack, most frequent first"""
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return len(self.counts)
@@ -0,0 +1,147 @@
+"""Local stand-in for a translation endpoint and a webhook, for testing routing and sinks offline.
+
+POST /generate with {"text", "max_output_tokens"} sleeps for a latency drawn
+from the configured distribution and answers with a fallback-style
+console.log line in the shape HttpBackend expects. POST /webhook accepts
+sink batches ({"entries": [...]}) after the same latency and counts them;
+GET /webhook reports the count. POST /latency with {"latency": "<spec>"}
+swaps the distribution while the server runs.
+
+Latency specs (seconds):
+    fixed:0.2
+    uniform:0.1,0.5
+    lognormal:-1.6,0.6        (mu and sigma of the underlying normal)
+    pareto:0.1,1.5            (scale and shape; heavy tail)
+    tail:0.1,0.05,2.0         (0.1s, but 5% of requests take 2.0s)
+
+    python -m gemini_logger.standin_server --port 8765 --latency lognormal:-1.6,0.6
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+
+
+def parse_latency(spec):
+    """Turn a latency spec into a function returning one sample in seconds"""
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(value) for value in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency parameters: {spec}")
+    shapes = {
+        "fixed": (1, lambda v: lambda: v[0]),
+        "uniform": (2, lambda v: lambda: random.uniform(v[0], v[1])),
+        "lognormal": (2, lambda v: lambda: random.lognormvariate(v[0], v[1])),
+        "pareto": (2, lambda v: lambda: v[0] * random.paretovariate(v[1])),
+        "tail": (3, lambda v: lambda: v[2] if random.random() < v[1] else v[0]),
+    }
+    if kind not in shapes:
+        raise ValueError(f"Unknown latency distribution: {kind}")
+    count, build = shapes[kind]
+    if len(values) != count:
+        raise ValueError(f"{kind} takes {count} parameter(s): {spec}")
+    return build(values)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client was a hedge loser and hung up
+
+    def do_POST(self):
+        try:
+            request = self._read_json()
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+        if self.path == "/latency":
+            try:
+                self.server.latency = parse_latency(request["latency"])
+            except (KeyError, ValueError) as e:
+                self._reply(400, {"error": str(e)})
+                return
+            self._reply(200, {"ok": True})
+        elif self.path == "/webhook":
+            time.sleep(max(0.0, self.server.latency()))
+            with self.server.lock:
+                self.server.webhook_batches += 1
+                self.server.webhook_entries += len(request.get("entries", []))
+            self._reply(200, {"ok": True})
+        elif self.path == "/generate":
+            time.sleep(max(0.0, self.server.latency()))
+            text = str(request.get("text", "")).strip()
+            output = "console.log(" + json.dumps(text) + ")"
+            self._reply(200, {
+                "text": output,
+                "usage": {"prompt_tokens": max(1, len(text) // 4), "output_tokens": max(1, len(output) // 4)},
+                "finish_reason": "STOP",
+            })
+        else:
+            self.send_error(404)
+
+    def do_GET(self):
+        if self.path != "/webhook":
+            self.send_error(404)
+            return
+        with self.server.lock:
+            self._reply(200, {"batches": self.server.webhook_batches, "entries": self.server.webhook_entries})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _create_server(port, latency):
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StandInHandler)
+    server.latency = parse_latency(latency)
+    server.lock = threading.Lock()
+    server.webhook_batches = 0
+    server.webhook_entries = 0
+    return server
+
+
+def start(port=DEFAULT_PORT, latency="fixed:0.1"):
+    """Serve on 127.0.0.1 from a daemon thread and return the server (handy in scripts)"""
+    server = _create_server(port, latency)
+    threading.Thread(target=server.serve_forever, name="standin-http", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in translation and webhook endpoints with injectable latency")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port on 127.0.0.1 (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency", default="fixed:0.1", help="Latency distribution, e.g. lognormal:-1.6,0.6")
+    args = parser.parse_args(argv)
+    try:
+        server = _create_server(args.port, args.latency)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Stand-in endpoints on http://127.0.0.1:{args.port}/generate and /webhook ({args.latency})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
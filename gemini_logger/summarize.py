@@ -0,0 +1,269 @@
+"""Map-reduce workload summaries with cached chunk digests.
+
+    entries  ->  chunk_entries()  ->  map: summarize each chunk in parallel
+             ->  reduce: summarize groups of digests until one is left
+
+Chunks are aligned to calendar periods (ISO weeks by default) and split by
+size inside a period, so appending entries only changes the last chunk.
+Undated entries (see log_export.read_entries) join the period before them
+and leave their guessed date out of the chunk, so it doesn't change the
+input of every chunk they are in each time the log is written.
+Every digest, map or reduce, is cached on disk under the sha256 of its input,
+so re-running a report after new entries only summarizes the changed tail
+chunk and the reduce steps above it.
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import log_export
+from . import metrics
+
+CACHE_VERSION = "1"  # Bump when the prompts change so old digests are not reused
+MAX_CHUNK_CHARS = 12000  # Entry text per map request
+FAN_IN = 8  # Digests combined per reduce request
+PERIODS = ("day", "week", "month")
+
+
+class SummaryCancelled(Exception):
+    """Raised between requests when the summary was cancelled"""
+
+
+def default_cache_dir():
+    """The GUI's cache folder if it exists here, else the per-user one"""
+    base = "cache" if os.path.isdir("cache") else os.path.join(os.path.expanduser("~"), ".gemini-workload-logger")
+    return os.path.join(base, "summaries")
+
+
+def _period_key(date_text, period):
+    day = datetime.date.fromisoformat(date_text)
+    if period == "day":
+        return day.isoformat()
+    if period == "month":
+        return day.strftime("%Y-%m")
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def chunk_entries(entries, period="week", max_chars=MAX_CHUNK_CHARS):
+    """Group entries into chunks that never cross a period boundary or exceed max_chars.
+
+    Yields dicts with "period", "first_date", "last_date", "count" and "text";
+    the dates are None for a chunk of undated entries only.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    current_key = None
+    lines = []
+    size = 0
+    dates = []
+
+    def make_chunk():
+        return {
+            "period": current_key,
+            "first_date": min(dates) if dates else None,
+            "last_date": max(dates) if dates else None,
+            "count": len(lines),
+            "text": "\n".join(lines),
+        }
+
+    for entry in entries:
+        if entry.get("dated", True):
+            key = _period_key(entry["date"], period)
+            line = f"{entry['date']}: {entry['text']}"
+        else:
+            key = current_key
+            line = entry["text"]
+        if lines and (key != current_key or size + len(line) > max_chars):
+            yield make_chunk()
+            lines, size, dates = [], 0, []
+        current_key = key
+        lines.append(line)
+        size += len(line) + 1
+        if entry.get("dated", True):
+            dates.append(entry["date"])
+    if lines:
+        yield make_chunk()
+
+
+def _span(first_date, last_date):
+    return "undated entries" if first_date is None else f"{first_date} to {last_date}"
+
+
+def _chunk_heading(chunk):
+    if chunk["first_date"] is None:
+        return "Undated entries"
+    return f"Entries from {chunk['first_date']} to {chunk['last_date']}"
+
+
+class DigestCache:
+    """One small JSON file per digest, named by the sha256 of its input"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(kind, text):
+        return hashlib.sha256(f"{CACHE_VERSION}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)["digest"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, digest):
+        path = self._path(key)
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest}, f)
+        os.replace(temp, path)
+
+
+class Summarizer:
+    """Summarize a log with `summarize(text) -> str`, caching every digest in `cache_dir`"""
+
+    def __init__(self, summarize, cache_dir=None, jobs=4, fan_in=FAN_IN, retries=2, cancel=None, progress=None):
+        self.summarize = summarize
+        self.retries = retries
+        self.cache = DigestCache(cache_dir or default_cache_dir())
+        self.jobs = jobs
+        self.fan_in = fan_in
+        self.cancel = cancel
+        self.progress = progress  # Called with (done, total) after each map or reduce step
+        self.stats = {"chunks": 0, "cached": 0, "summarized": 0, "reduce_cached": 0, "reduce_summarized": 0}
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+
+    def _check_cancel(self):
+        if self.cancel is not None and self.cancel.is_set():
+            raise SummaryCancelled()
+
+    def _step_done(self):
+        with self._lock:
+            self._done += 1
+            done, total = self._done, self._total
+        if self.progress is not None:
+            self.progress(done, total)
+
+    def _digest(self, kind, text):
+        """Return (digest, was_cached) for one map or reduce input"""
+        key = self.cache.key(kind, text)
+        digest = self.cache.get(key)
+        if digest is not None:
+            metrics.counter("summary_digests_total", kind=kind, outcome="cached").inc()
+            return digest, True
+        for attempt in range(self.retries + 1):
+            self._check_cancel()
+            try:
+                digest = self.summarize(text)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+        self.cache.put(key, digest)
+        metrics.counter("summary_digests_total", kind=kind, outcome="summarized").inc()
+        return digest, False
+
+    def _run_all(self, kind, inputs, executor):
+        """Digest inputs in parallel, keeping their order"""
+        prefix = "" if kind == "map" else "reduce_"
+
+        def work(text):
+            digest, cached = self._digest(kind, text)
+            with self._lock:
+                self.stats[prefix + ("cached" if cached else "summarized")] += 1
+            self._step_done()
+            return digest
+
+        return list(executor.map(work, inputs))
+
+    def run(self, entries, period="week", max_chars=MAX_CHUNK_CHARS):
+        """Return the summary text for `entries`, or None if there are none"""
+        chunks = list(chunk_entries(entries, period, max_chars))
+        self.stats["chunks"] = len(chunks)
+        if not chunks:
+            return None
+        # Reduce steps: ceil(n / fan_in) per level until one digest is left
+        remaining, total = len(chunks), len(chunks)
+        while remaining > 1:
+            remaining = -(-remaining // self.fan_in)
+            total += remaining
+        self._total = total
+
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="summarize") as executor:
+            map_inputs = [
+                f"{_chunk_heading(chunk)} ({chunk['count']} entries):\n{chunk['text']}"
+                for chunk in chunks
+            ]
+            digests = self._run_all("map", map_inputs, executor)
+            ranges = [(chunk["first_date"], chunk["last_date"]) for chunk in chunks]
+            while len(digests) > 1:
+                self._check_cancel()
+                reduce_inputs = []
+                next_ranges = []
+                for start in range(0, len(digests), self.fan_in):
+                    group = list(zip(ranges[start:start + self.fan_in], digests[start:start + self.fan_in]))
+                    reduce_inputs.append("\n\n".join(f"Summary of {_span(first, last)}:\n{digest}" for (first, last), digest in group))
+                    firsts = [first for (first, _), _ in group if first is not None]
+                    lasts = [last for (_, last), _ in group if last is not None]
+                    next_ranges.append((min(firsts) if firsts else None, max(lasts) if lasts else None))
+                digests = self._run_all("reduce", reduce_inputs, executor)
+                ranges = next_ranges
+        return digests[0]
+
+
+def summarize_log(path, summarize, since=None, until=None, period="week", include_segments=True, cancel=None, **options):
+    """Summarize the entries of a log between `since` and `until`; returns (summary, stats)"""
+    entries = log_export.read_entries(path, include_segments, cancel)
+    entries = log_export.filter_entries(entries, since=since, until=until)
+    summarizer = Summarizer(summarize, cancel=cancel, **options)
+    return summarizer.run(entries, period), summarizer.stats
+
+
+class SummaryJob:
+    """Run summarize_log on a background thread; poll `done` and `progress`, call cancel() to stop"""
+
+    def __init__(self, path, summarize, **options):
+        self.path = path
+        self.summarize = summarize
+        self.options = options
+        self.progress = (0, 0)
+        self.result = None
+        self.stats = None
+        self.error = None
+        self.cancelled = False
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="log-summary", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def _progress(self, done, total):
+        self.progress = (done, total)
+
+    def _run(self):
+        try:
+            self.result, self.stats = summarize_log(
+                self.path, self.summarize, cancel=self.cancel_event, progress=self._progress, **self.options)
+        except (SummaryCancelled, log_export.ExportCancelled):
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
@@ -0,0 +1,275 @@
+"""Gemini translation shared by the GUI and the headless CLI"""
+import json
+import os
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from . import cassette
+from . import metrics
+from . import routing
+
+try:
+    import google.generativeai as genai
+except ImportError:  # Replaying a cassette doesn't need the SDK
+    genai = None
+
+load_dotenv()
+
+# Get the Gemini API key from the environment variable
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+MODEL_NAME = "gemini-1.5-flash"
+
+# Extra backends for latency-based routing and hedging; the first one listed is the
+# primary. GEMINI_LOGGER_MODELS="gemini-1.5-flash,gemini-1.5-flash-8b" adds models,
+# GEMINI_LOGGER_ENDPOINTS="standin=http://127.0.0.1:8765/generate" adds HTTP endpoints.
+MODEL_NAMES = [name.strip() for name in os.getenv("GEMINI_LOGGER_MODELS", MODEL_NAME).split(",") if name.strip()]
+ENDPOINTS = [
+    tuple(item.strip().split("=", 1)) if "=" in item else (item.strip(), item.strip())
+    for item in os.getenv("GEMINI_LOGGER_ENDPOINTS", "").split(",")
+    if item.strip()
+]
+HEDGE = os.getenv("GEMINI_LOGGER_HEDGE", "1") != "0"
+
+# Record/replay of Gemini traffic (see cassette.py); replay needs no API key or network
+CASSETTE_PATH = os.getenv("GEMINI_LOGGER_CASSETTE")
+CASSETTE_MODE = os.getenv("GEMINI_LOGGER_CASSETTE_MODE", "replay")
+REPLAY_SPEED = float(os.getenv("GEMINI_LOGGER_REPLAY_SPEED", "1"))
+
+# The formatting contract is sent once as the model's system instruction, so each
+# request carries only the user's text instead of an ad-hoc prompt plus chat history
+SYSTEM_INSTRUCTION = """Rewrite the user's work note as JavaScript console log lines.
+Rules:
+- Output only the log lines. No prose, no Markdown fences.
+- Notes under 30 characters: exactly one console.log("...") line.
+- Longer notes: one console.log line per distinct task, at most 5 lines.
+- Notes containing "bad news": console.error(new Error("...")) instead.
+- Keep the user's wording; never invent details."""
+
+# Instruction for workload summaries (summarize.py); the map and reduce steps share it
+SUMMARY_INSTRUCTION = """Summarize work log entries for a workload report.
+Rules:
+- Plain text bullet points starting with "- ", at most 8, grouped by project or task.
+- Keep names, numbers and dates exact; mention dates when they matter.
+- Input may itself be earlier summaries: merge them, don't list them separately.
+- No preamble and no closing remarks."""
+SUMMARY_MAX_OUTPUT_TOKENS = 600
+
+# --- Gemini Model Configuration ---
+generation_config = {
+    "temperature": 1.0,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 2048,  # Ceiling; the first attempt asks for output_budget() and a cut-off answer retries with this
+}
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with Gemini's tokenizer
+MIN_OUTPUT_TOKENS = 48
+OUTPUT_TOKENS_PER_INPUT_TOKEN = 3  # console.log(...) wrapping roughly triples short notes
+
+USAGE_LOG = None  # JSON Lines file that receives one token accounting row per entry, if set
+
+model = None
+router = None  # Set when more than one backend is configured
+summary_model = None  # Created on first summarize() call
+tape = None  # Open cassette.Cassette while recording or replaying
+usage_totals = {"entries": 0, "prompt_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+last_usage = None
+_usage_lock = threading.Lock()
+
+
+def configure_cassette(path, mode="replay", speed=1.0):
+    """Record to or replay from `path`; call before init_gemini()"""
+    global CASSETTE_PATH, CASSETTE_MODE, REPLAY_SPEED
+    CASSETTE_PATH, CASSETTE_MODE, REPLAY_SPEED = path, mode, speed
+
+
+def replaying():
+    return bool(CASSETTE_PATH) and CASSETTE_MODE == "replay"
+
+
+def _create_model(name, system_instruction=SYSTEM_INSTRUCTION):
+    global tape
+    if CASSETTE_PATH and tape is None:
+        tape = cassette.Cassette(CASSETTE_PATH, CASSETTE_MODE, REPLAY_SPEED)
+    if replaying():
+        return cassette.CassetteModel(tape, name, system_instruction)
+    created = genai.GenerativeModel(
+        model_name=name,
+        generation_config=generation_config,
+        system_instruction=system_instruction,
+    )
+    if tape is not None:
+        return cassette.CassetteModel(tape, name, system_instruction, created)
+    return created
+
+
+def init_gemini():
+    """Configure Gemini and create the model(s) once; return False if translation is unavailable"""
+    global model, router
+    if is_available():
+        return True
+    backends = []
+    if GOOGLE_API_KEY or replaying():
+        try:
+            if not replaying():
+                if genai is None:
+                    raise RuntimeError("google-generativeai is not installed")
+                genai.configure(api_key=GOOGLE_API_KEY)
+            # Use a model name that's widely available
+            names = MODEL_NAMES or [MODEL_NAME]
+            model = _create_model(names[0])
+            backends.append(routing.GeminiBackend(names[0], model))
+            for name in names[1:]:
+                backends.append(routing.GeminiBackend(name, _create_model(name)))
+            if tape is not None:
+                print(f"Gemini model initialized ({CASSETTE_MODE} cassette {CASSETTE_PATH})", file=sys.stderr)
+            else:
+                print("Gemini model initialized successfully", file=sys.stderr)
+        except Exception as e:
+            print(f"Warning: Could not initialize Gemini model: {e}", file=sys.stderr)
+            print("The application will continue without Gemini integration.", file=sys.stderr)
+            model = None
+            backends = []
+    backends += [routing.HttpBackend(name, url) for name, url in ENDPOINTS]
+    if len(backends) > 1 or (backends and model is None):
+        router = routing.Router(backends, hedge=HEDGE)
+        print(f"Routing between {', '.join(backend.name for backend in backends)}", file=sys.stderr)
+    return is_available()
+
+
+def is_available():
+    return model is not None or router is not None
+
+
+# --- Token Accounting ---
+def estimate_tokens(text):
+    """Estimate input tokens locally; a count_tokens call would cost a full round trip"""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def output_budget(input_tokens):
+    """Size max_output_tokens to the input instead of always allowing the ceiling"""
+    budget = MIN_OUTPUT_TOKENS + input_tokens * OUTPUT_TOKENS_PER_INPUT_TOKEN
+    return min(budget, generation_config["max_output_tokens"])
+
+
+def _hit_token_limit(response):
+    try:
+        reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError, TypeError):
+        return False
+    return getattr(reason, "name", reason) in ("MAX_TOKENS", 2)
+
+
+def record_usage(response, mode, estimated_tokens=None, budget=None, seconds=None):
+    """Record the token counts reported with a Gemini response, per entry and in total"""
+    global last_usage
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    prompt_tokens = usage.prompt_token_count
+    output_tokens = usage.candidates_token_count
+    metrics.histogram("translation_prompt_tokens", buckets=metrics.SIZE_BUCKETS, mode=mode).observe(prompt_tokens)
+    metrics.histogram("translation_output_tokens", buckets=metrics.SIZE_BUCKETS, mode=mode).observe(output_tokens)
+
+    row = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": mode,
+        "estimated_tokens": estimated_tokens,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "max_output_tokens": budget,
+        "seconds": round(seconds, 3) if seconds is not None else None,
+    }
+    with _usage_lock:
+        last_usage = row
+        usage_totals["entries"] += 1
+        usage_totals["prompt_tokens"] += prompt_tokens
+        usage_totals["output_tokens"] += output_tokens
+        usage_totals["seconds"] += seconds or 0.0
+        if USAGE_LOG:
+            try:
+                with open(USAGE_LOG, "a") as f:
+                    f.write(json.dumps(row) + "\n")
+            except Exception as e:
+                print(f"Error writing token usage: {e}")
+
+
+# --- Translation ---
+def _send(text, budget):
+    if router is not None:
+        return router.generate(text, budget)
+    return model.generate_content(text, generation_config={"max_output_tokens": budget})
+
+
+def generate(text, mode):
+    """Send one entry to Gemini with an output budget sized to it; raises on failure"""
+    if not is_available():
+        raise RuntimeError("Gemini model is not initialized")
+    estimated = estimate_tokens(text)
+    budget = output_budget(estimated)
+    started = time.perf_counter()
+    try:
+        with metrics.timed("translation_seconds", mode=mode):
+            response = _send(text, budget)
+            if _hit_token_limit(response) and budget < generation_config["max_output_tokens"]:
+                # Rare long answer: retry once with the full ceiling rather than keep a cut-off entry
+                metrics.counter("translation_budget_retries_total", mode=mode).inc()
+                budget = generation_config["max_output_tokens"]
+                response = _send(text, budget)
+    except Exception:
+        metrics.counter("translation_failures_total", mode=mode).inc()
+        raise
+    record_usage(response, mode, estimated, budget, time.perf_counter() - started)
+    return response.text.strip()
+
+
+def fallback_format(text):
+    """Format used whenever Gemini can't be reached"""
+    return f"[Log] {text}"
+
+
+def translate_to_console_style(text):
+    """Translate user text to console style, falling back to a simple format on errors"""
+    if not is_available():
+        return fallback_format(text)
+    try:
+        return generate(text, "gui")
+    except Exception as e:
+        print(f"Error in translation: {e}")
+        return fallback_format(text)  # Fallback to simple format
+
+
+def summarize(text):
+    """Summarize a block of entries or earlier summaries; raises on failure.
+
+    Always uses the primary Gemini model: routed backends carry the console-log
+    instruction, which would fight the summary one.
+    """
+    global summary_model
+    if model is None:
+        raise RuntimeError("Gemini model is not initialized")
+    if summary_model is None:
+        summary_model = _create_model((MODEL_NAMES or [MODEL_NAME])[0], SUMMARY_INSTRUCTION)
+    started = time.perf_counter()
+    try:
+        with metrics.timed("translation_seconds", mode="summary"):
+            response = summary_model.generate_content(
+                text, generation_config={"max_output_tokens": SUMMARY_MAX_OUTPUT_TOKENS})
+    except Exception:
+        metrics.counter("translation_failures_total", mode="summary").inc()
+        raise
+    record_usage(response, "summary", estimate_tokens(text), SUMMARY_MAX_OUTPUT_TOKENS, time.perf_counter() - started)
+    return response.text.strip()
+
+
+def translate_entry(text):
+    """Translate one entry; safe to call from many threads at once.
+
+    Raises on failure so batch callers can retry or count the fallback themselves.
+    """
+    return generate(text, "batch")
@@ -8,10 +8,14 @@ setup(
     author_email="your.email@example.com",
     url="https://github.com/yourusername/gemini-workload-logger",
     packages=find_packages(),
+    package_data={"gemini_logger": ["geminiicon.png"]},
     install_requires=[
-        "google-generativeai>=0.3.0",
+        "google-generativeai>=0.5.0",
         "python-dotenv>=1.0.0",
     ],
+    extras_require={
+        "similarity": ["numpy>=1.16"],  # Tools > Find Similar and `gemini-logger similar`
+    },
     python_requires=">=3.7",
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -27,7 +31,10 @@ setup(
     keywords="gemini, logger, tkinter, gui, ai",
     entry_points={
         "console_scripts": [
-            "gemini-logger=gemini-logger:main",
+            "gemini-logger=gemini_logger.cli:main",
+        ],
+        "gui_scripts": [
+            "gemini-workload-logger=gemini_logger.app:main",
         ],
     },
 ) 
\ No newline at end of file
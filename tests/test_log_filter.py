@@ -0,0 +1,51 @@
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from gemini_logger import log_filter
+
+LINES = ["", "first", "", "", "second entry", "   ", "third", "", "x" * 40, ""]
+
+
+def naive_scan(path, pattern):
+    """Line-by-line reference for scan(): [(line, text)]"""
+    regex = re.compile(pattern)
+    with open(path, encoding="utf-8") as f:
+        return [(number, line.rstrip("\n")) for number, line in enumerate(f, 1) if regex.search(line.rstrip("\n"))]
+
+
+class ScanTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "worklog.txt")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("\n".join(LINES * 20) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_empty_matches_agree_with_a_line_scan(self):
+        for pattern in ("^$", r"^\s*$", "x*"):
+            for chunk_size in (7, 64, 1000):
+                hits = [(hit["line"], hit["text"]) for hit in log_filter.scan(self.path, pattern, jobs=2, chunk_size=chunk_size)]
+                self.assertEqual(hits, naive_scan(self.path, pattern), (pattern, chunk_size))
+
+    def test_gzip_blocks_add_no_empty_lines(self):
+        segment = os.path.join(self.folder, "worklog.20250101-000000.txt.gz")
+        with open(self.path, "rb") as src, gzip.open(segment, "wb") as dst:
+            dst.write(src.read())
+        block = log_filter.GZIP_BLOCK
+        log_filter.GZIP_BLOCK = 16
+        try:
+            newlines, hits = log_filter.scan_task((segment, 0, None), "^$")
+        finally:
+            log_filter.GZIP_BLOCK = block
+        self.assertEqual(newlines, len(LINES) * 20)
+        self.assertEqual([(index + 1, text) for index, text in hits], naive_scan(self.path, "^$"))
+
+
+if __name__ == "__main__":
+    unittest.main()